@@ -0,0 +1,108 @@
+import argparse
+import json
+import sys
+from datetime import datetime, timedelta
+import banco
+from banco import FUSO_HORARIO, TABELAS_ARQUIVADAS, obter_conexao, transacao
+from consultas import SQL_VENDAS_ARQUIVAVEIS
+from esquema import preparar_banco
+
+
+# Arquivamento: as vendas quitadas mais antigas que IDADE_PADRAO_DIAS, com
+# seus itens e pagamentos, saem do loja_ju.db para o banco de arquivo
+# (banco.CAMINHO_ARQUIVO), de LOTE em LOTE vendas. As telas do caixa só leem
+# o banco principal, que fica do tamanho do movimento recente; relatórios,
+# exportações e a reconstrução dos resumos usam as visões do histórico
+# completo (banco.TABELAS_ARQUIVADAS). Os resumos diários não mudam: as
+# vendas arquivadas continuam somadas neles.
+#
+# Em WAL uma transação que escreve nos dois arquivos não é atômica entre
+# eles, por isso cada lote é copiado numa transação e só depois apagado do
+# banco principal, em outra. Se o processo parar entre as duas, o lote fica
+# repetido nas visões até a próxima execução, que o copia de novo (INSERT OR
+# REPLACE) e termina de apagar. As conexões abertas antes de o arquivo
+# existir (com o banco vazio em memória no lugar dele) passam a enxergá-lo
+# ao serem reabertas.
+IDADE_PADRAO_DIAS = 365
+LOTE = 2000
+
+# Coluna que liga cada tabela arquivada à venda
+COLUNA_VENDA = {"vendas": "id", "itens_venda": "venda_id", "pagamentos": "venda_id"}
+
+def preparar_arquivo():
+    """Anexa à conexão da thread o banco de arquivo em disco, criando-o se preciso"""
+    banco.gerenciador.anexar_arquivo(obter_conexao(), criar=True)
+
+def _copiar(conn, ids):
+    for tabela, (_, colunas) in TABELAS_ARQUIVADAS.items():
+        lista = ", ".join(colunas)
+        conn.execute(f"""
+            INSERT OR REPLACE INTO arquivo.{tabela} ({lista})
+            SELECT {lista} FROM main.{tabela}
+            WHERE {COLUNA_VENDA[tabela]} IN (SELECT value FROM json_each(?))
+        """, (ids,))
+
+def _apagar(conn, ids):
+    # As vendas primeiro: o gatilho de exclusão de pagamentos, que refaz
+    # vendas.valor_pago, não encontra mais a venda e não faz nada
+    for tabela in ("vendas", "itens_venda", "pagamentos"):
+        conn.execute(f"""
+            DELETE FROM main.{tabela}
+            WHERE {COLUNA_VENDA[tabela]} IN (SELECT value FROM json_each(?))
+              AND {COLUNA_VENDA[tabela]} IN (SELECT id FROM arquivo.vendas)
+        """, (ids,))
+
+def arquivar(dias=IDADE_PADRAO_DIAS, lote=LOTE, ao_progredir=None):
+    """Move as vendas quitadas há mais de `dias` dias para o banco de arquivo.
+
+    Retorna o número de vendas movidas; `ao_progredir(vendas)` é chamado a
+    cada lote.
+    """
+    preparar_arquivo()
+    limite = datetime.now(FUSO_HORARIO) - timedelta(days=dias)
+    total = 0
+    while True:
+        ids = [linha[0] for linha in obter_conexao().execute(SQL_VENDAS_ARQUIVAVEIS, (limite, lote))]
+        if not ids:
+            break
+        lista = json.dumps(ids)
+        with transacao() as conn:
+            _copiar(conn, lista)
+        with transacao("IMMEDIATE") as conn:
+            _apagar(conn, lista)
+        total += len(ids)
+        if ao_progredir:
+            ao_progredir(total)
+    return total
+
+def compactar():
+    """Devolve ao sistema o espaço liberado no banco principal (VACUUM; pede o banco sem uso)"""
+    conn = obter_conexao()
+    conn.execute("PRAGMA main.wal_checkpoint(TRUNCATE)")
+    conn.execute("VACUUM main")
+
+def main(argumentos):
+    parser = argparse.ArgumentParser(prog="python arquivamento.py",
+                                     description="Move as vendas quitadas antigas para o banco de arquivo")
+    parser.add_argument("--dias", type=int, default=IDADE_PADRAO_DIAS,
+                        help=f"idade mínima, em dias, das vendas arquivadas (padrão: {IDADE_PADRAO_DIAS})")
+    parser.add_argument("--banco", default=banco.CAMINHO_BANCO, help="banco principal")
+    parser.add_argument("--arquivo", default=banco.CAMINHO_ARQUIVO,
+                        help="banco de arquivo (padrão: o nome do banco com _arquivo)")
+    parser.add_argument("--compactar", action="store_true",
+                        help="executa VACUUM no banco principal ao final (com os caixas fechados)")
+    opcoes = parser.parse_args(argumentos)
+
+    banco.gerenciador = banco.GerenciadorConexoes(opcoes.banco, opcoes.arquivo)
+    preparar_banco()
+    movidas = arquivar(opcoes.dias, ao_progredir=lambda n: print(f"  {n} venda(s) arquivada(s)..."))
+    print(f"{movidas} venda(s) quitada(s) com mais de {opcoes.dias} dias movida(s) para "
+          f"{banco.gerenciador.caminho_arquivo}.")
+    if opcoes.compactar:
+        compactar()
+        print(f"{opcoes.banco} compactado.")
+    banco.fechar_conexoes()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,475 @@
+import functools
+import os
+import random
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, date
+from tempo import FUSO_HORARIO, para_epoch, para_datetime, dia_local
+from rastreamento import Rastreador, LIMIAR_PADRAO_MS, ARQUIVO_PADRAO, LIMITE_RESUMO
+
+
+# Vários caixas no mesmo computador usam o mesmo arquivo; LOJA_BANCO aponta
+# para outro caminho. Em pasta de rede o WAL não funciona (depende de memória
+# compartilhada entre os processos), e LOJA_JOURNAL=DELETE volta ao journal
+# tradicional.
+CAMINHO_BANCO = os.environ.get('LOJA_BANCO', 'loja_ju.db')
+MODO_JOURNAL = os.environ.get('LOJA_JOURNAL', 'WAL')
+
+# Escritas que encontram o banco ocupado por outro caixa mesmo depois do
+# busy_timeout são repetidas até TENTATIVAS_ESCRITA vezes, com espera
+# crescente a partir de ESPERA_INICIAL segundos (ver repetir_se_ocupado)
+TENTATIVAS_ESCRITA = 5
+ESPERA_INICIAL = 0.05
+
+# LOJA_RASTREAR=1 liga o rastreamento de SQL (rastreamento.py): tempo,
+# linhas e origem de cada comando, resumo dos mais custosos e log rotativo
+# (LOJA_LOG_LENTAS) dos que passam de LOJA_LENTO_MS milissegundos
+RASTREAR = os.environ.get('LOJA_RASTREAR', '') not in ('', '0')
+LIMIAR_LENTO_MS = float(os.environ.get('LOJA_LENTO_MS', LIMIAR_PADRAO_MS))
+ARQUIVO_LENTAS = os.environ.get('LOJA_LOG_LENTAS', ARQUIVO_PADRAO)
+
+# Vendas quitadas antigas são movidas pelo arquivamento (arquivamento.py)
+# para um segundo arquivo, anexado a toda conexão como "arquivo". Enquanto
+# ele não existe, o anexado é um banco vazio em memória com as mesmas
+# tabelas, e as consultas do histórico completo funcionam do mesmo jeito.
+# LOJA_ARQUIVO aponta para outro caminho; sem ele, é o nome do banco com
+# "_arquivo" (loja_ju_arquivo.db).
+CAMINHO_ARQUIVO = os.environ.get('LOJA_ARQUIVO')
+
+# Tabelas que o arquivamento divide entre os dois arquivos: a visão
+# temporária que junta as duas partes (o histórico completo, para
+# relatórios) e as colunas copiadas. As telas do caixa continuam lendo só
+# as tabelas do banco principal.
+TABELAS_ARQUIVADAS = {
+    "vendas": ("todas_vendas",
+               ("id", "cliente_id", "valor_total", "data_venda", "valor_pago", "saldo")),
+    "itens_venda": ("todos_itens_venda",
+                    ("id", "venda_id", "produto_id", "quantidade", "valor_unitario", "custo_unitario")),
+    "pagamentos": ("todos_pagamentos",
+                   ("id", "cliente_id", "venda_id", "valor_pago", "data_pagamento")),
+}
+
+ESQUEMA_ARQUIVO = (
+    """CREATE TABLE IF NOT EXISTS arquivo.vendas
+       (id INTEGER PRIMARY KEY,
+        cliente_id TEXT,
+        valor_total REAL,
+        data_venda TIMESTAMP,
+        valor_pago REAL NOT NULL DEFAULT 0,
+        saldo REAL NOT NULL DEFAULT 0)""",
+    """CREATE TABLE IF NOT EXISTS arquivo.itens_venda
+       (id INTEGER PRIMARY KEY,
+        venda_id INTEGER,
+        produto_id INTEGER,
+        quantidade INTEGER,
+        valor_unitario REAL,
+        custo_unitario REAL)""",
+    """CREATE TABLE IF NOT EXISTS arquivo.pagamentos
+       (id INTEGER PRIMARY KEY,
+        cliente_id TEXT,
+        venda_id INTEGER,
+        valor_pago REAL,
+        data_pagamento DATETIME)""",
+    # Os índices do banco principal usados pelos relatórios
+    "CREATE INDEX IF NOT EXISTS arquivo.idx_vendas_data ON vendas (data_venda)",
+    "CREATE INDEX IF NOT EXISTS arquivo.idx_vendas_cliente ON vendas (cliente_id)",
+    """CREATE INDEX IF NOT EXISTS arquivo.idx_itens_venda_cobertura
+       ON itens_venda (venda_id, produto_id, quantidade, valor_unitario, custo_unitario)""",
+    "CREATE INDEX IF NOT EXISTS arquivo.idx_pagamentos_venda ON pagamentos (venda_id)",
+    "CREATE INDEX IF NOT EXISTS arquivo.idx_pagamentos_data ON pagamentos (data_pagamento)",
+)
+
+# Pragmas aplicados uma única vez, quando a conexão da thread é aberta
+PRAGMAS = (
+    f"PRAGMA journal_mode = {MODO_JOURNAL}",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA cache_size = -16000",       # ~16 MB de cache de páginas
+    "PRAGMA mmap_size = 268435456",     # 256 MB mapeados em memória
+)
+
+# Datas e horas são gravadas como segundos UTC (inteiro): comparações e
+# ordenação são numéricas e os índices ficam compactos. As colunas seguem
+# declaradas como TIMESTAMP/DATETIME para que o conversor seja aplicado;
+# listagens grandes leem o inteiro e formatam a coluna de uma vez (tempo.py).
+def adapt_datetime(dt):
+    """Converte datetime para segundos UTC; sem fuso, vale o fuso da loja"""
+    return para_epoch(dt)
+
+def adapt_date(d):
+    return d.isoformat()
+
+def convert_epoch(valor):
+    """Converte segundos UTC lidos do banco para datetime no fuso da loja"""
+    return para_datetime(int(valor))
+
+def convert_date(s):
+    return date.fromisoformat(s.decode())
+
+# Registrar os adaptadores e conversores
+sqlite3.register_adapter(datetime, adapt_datetime)
+sqlite3.register_adapter(date, adapt_date)
+sqlite3.register_converter("datetime", convert_epoch)
+sqlite3.register_converter("date", convert_date)
+sqlite3.register_converter("timestamp", convert_epoch)
+
+
+class CursorContado(sqlite3.Cursor):
+    """Cursor que contabiliza comandos executados e o tempo gasto"""
+
+    def execute(self, sql, parametros=()):
+        inicio = time.perf_counter()
+        try:
+            return super().execute(sql, parametros)
+        finally:
+            self.connection.gerenciador._registrar_comando(time.perf_counter() - inicio)
+
+    def executemany(self, sql, sequencia_parametros):
+        inicio = time.perf_counter()
+        try:
+            return super().executemany(sql, sequencia_parametros)
+        finally:
+            self.connection.gerenciador._registrar_comando(time.perf_counter() - inicio)
+
+    def executescript(self, script):
+        inicio = time.perf_counter()
+        try:
+            return super().executescript(script)
+        finally:
+            self.connection.gerenciador._registrar_comando(time.perf_counter() - inicio)
+
+
+class CursorRastreado(CursorContado):
+    """CursorContado do modo de rastreamento: acompanha cada comando até a última linha lida.
+
+    Num SELECT, o execute só traz a primeira linha; o resto do tempo está
+    nos fetch. O comando é concluído quando as linhas acabam, quando o
+    cursor executa outro comando ou quando é fechado ou descartado.
+    """
+
+    _registro = None
+
+    def execute(self, sql, parametros=()):
+        registro = self._iniciar(sql, parametros)
+        inicio = time.perf_counter()
+        try:
+            return super().execute(sql, parametros)
+        finally:
+            self._depois_de_executar(registro, time.perf_counter() - inicio)
+
+    def executemany(self, sql, sequencia_parametros):
+        # O primeiro conjunto de parâmetros serve para o plano, no log de lentos
+        sequencia_parametros = list(sequencia_parametros)
+        registro = self._iniciar(sql, sequencia_parametros[0] if sequencia_parametros else ())
+        inicio = time.perf_counter()
+        try:
+            return super().executemany(sql, sequencia_parametros)
+        finally:
+            self._depois_de_executar(registro, time.perf_counter() - inicio)
+
+    def executescript(self, script):
+        registro = self._iniciar(script)
+        inicio = time.perf_counter()
+        try:
+            return super().executescript(script)
+        finally:
+            registro.duracao += time.perf_counter() - inicio
+            self._concluir()
+
+    def fetchone(self):
+        inicio = time.perf_counter()
+        linha = super().fetchone()
+        self._ler(time.perf_counter() - inicio, 0 if linha is None else 1)
+        return linha
+
+    def fetchmany(self, size=None):
+        tamanho = self.arraysize if size is None else size
+        inicio = time.perf_counter()
+        linhas = super().fetchmany(tamanho)
+        self._ler(time.perf_counter() - inicio, len(linhas), len(linhas) < tamanho)
+        return linhas
+
+    def fetchall(self):
+        inicio = time.perf_counter()
+        linhas = super().fetchall()
+        self._ler(time.perf_counter() - inicio, len(linhas), True)
+        return linhas
+
+    def __next__(self):
+        inicio = time.perf_counter()
+        try:
+            linha = super().__next__()
+        except StopIteration:
+            self._ler(time.perf_counter() - inicio, 0)
+            raise
+        self._ler(time.perf_counter() - inicio, 1)
+        return linha
+
+    def close(self):
+        self._concluir()
+        super().close()
+
+    def __del__(self):
+        try:
+            self._concluir()
+        except sqlite3.Error:
+            pass
+
+    def _iniciar(self, sql, parametros=()):
+        self._concluir()
+        self._registro = self.connection.gerenciador.rastreador.iniciar(self.connection, sql, parametros)
+        return self._registro
+
+    def _depois_de_executar(self, registro, duracao):
+        registro.duracao += duracao
+        # Sem colunas de resultado (INSERT, UPDATE...) o comando terminou
+        if self.description is None:
+            registro.linhas = self.rowcount
+            self._concluir()
+
+    def _ler(self, duracao, linhas, fim=False):
+        registro = self._registro
+        if registro is None:
+            return
+        registro.duracao += duracao
+        registro.linhas += linhas
+        if fim or not linhas:
+            self._concluir()
+
+    def _concluir(self):
+        registro, self._registro = self._registro, None
+        if registro is not None:
+            self.connection.gerenciador.rastreador.concluir(self.connection, registro)
+
+
+class ConexaoContada(sqlite3.Connection):
+    """Conexão cujos cursores são sempre CursorContado (CursorRastreado no modo de rastreamento)"""
+
+    gerenciador = None
+    registro_atual = None
+
+    def cursor(self, factory=None):
+        if factory is None:
+            factory = CursorRastreado if self.gerenciador.rastreador else CursorContado
+        return super().cursor(factory)
+
+    def commit(self):
+        self._finalizar(super().commit, "COMMIT")
+
+    def rollback(self):
+        self._finalizar(super().rollback, "ROLLBACK")
+
+    def _finalizar(self, metodo, nome):
+        # COMMIT e ROLLBACK não passam por cursor; no rastreamento são medidos aqui
+        rastreador = self.gerenciador.rastreador if self.gerenciador else None
+        if rastreador is None:
+            return metodo()
+        inicio = time.perf_counter()
+        try:
+            return metodo()
+        finally:
+            rastreador.registrar(self, nome, time.perf_counter() - inicio)
+
+    # Os atalhos da conexão criam cursores internamente sem passar pelo
+    # método execute do cursor, por isso são redefinidos aqui
+    def execute(self, sql, parametros=()):
+        return self.cursor().execute(sql, parametros)
+
+    def executemany(self, sql, sequencia_parametros):
+        return self.cursor().executemany(sql, sequencia_parametros)
+
+    def executescript(self, script):
+        return self.cursor().executescript(script)
+
+
+class GerenciadorConexoes:
+    """Mantém uma conexão persistente por thread com o banco da loja.
+
+    As conexões ficam em modo autocommit; escritas devem ser feitas dentro
+    de transacao(), que abre BEGIN e faz COMMIT ou ROLLBACK ao sair.
+    """
+
+    def __init__(self, caminho=CAMINHO_BANCO, caminho_arquivo=None):
+        self.caminho = caminho
+        if caminho_arquivo is None and caminho != ':memory:':
+            caminho_arquivo = os.path.splitext(caminho)[0] + '_arquivo.db'
+        self.caminho_arquivo = caminho_arquivo
+        self._local = threading.local()
+        self._trava = threading.Lock()
+        self._conexoes = []
+        self.conexoes_abertas = 0
+        self.comandos_executados = 0
+        self.tempo_total = 0.0
+        self.repeticoes = 0
+        self.rastreador = Rastreador(LIMIAR_LENTO_MS, ARQUIVO_LENTAS) if RASTREAR else None
+
+    def conexao(self):
+        """Retorna a conexão da thread atual, abrindo-a na primeira chamada"""
+        conn = getattr(self._local, 'conexao', None)
+        if conn is None:
+            conn = self._abrir()
+            self._local.conexao = conn
+        return conn
+
+    def _abrir(self):
+        conn = sqlite3.connect(self.caminho,
+                               detect_types=sqlite3.PARSE_DECLTYPES|sqlite3.PARSE_COLNAMES,
+                               isolation_level=None,
+                               factory=ConexaoContada)
+        conn.gerenciador = self
+        if self.rastreador:
+            self.rastreador.instrumentar(conn)
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        conn.create_function("dia_local", 1, dia_local, deterministic=True)
+        self.anexar_arquivo(conn)
+        with self._trava:
+            self._conexoes.append(conn)
+            self.conexoes_abertas += 1
+        return conn
+
+    def anexar_arquivo(self, conn, criar=False):
+        """Anexa o banco de arquivo à conexão como "arquivo" e cria as visões do histórico completo.
+
+        Sem `criar`, um arquivo que ainda não existe é substituído por um
+        banco vazio em memória; com `criar`, ele é criado (arquivamento.py).
+        Retorna se o anexado é o arquivo em disco.
+        """
+        em_disco = bool(self.caminho_arquivo) and (criar or os.path.exists(self.caminho_arquivo))
+        if any(nome == 'arquivo' for _, nome, _ in conn.execute("PRAGMA database_list")):
+            conn.execute("DETACH DATABASE arquivo")
+        conn.execute("ATTACH DATABASE ? AS arquivo", (self.caminho_arquivo if em_disco else ':memory:',))
+        for comando in ESQUEMA_ARQUIVO:
+            conn.execute(comando)
+        for tabela, (visao, colunas) in TABELAS_ARQUIVADAS.items():
+            lista = ", ".join(colunas)
+            conn.execute(f"""
+                CREATE TEMP VIEW IF NOT EXISTS {visao} AS
+                SELECT {lista} FROM main.{tabela} UNION ALL SELECT {lista} FROM arquivo.{tabela}
+            """)
+        return em_disco
+
+    @contextmanager
+    def transacao(self, modo="DEFERRED"):
+        """Executa o bloco dentro de uma transação na conexão da thread.
+
+        Se já houver uma transação aberta, o bloco participa dela e o
+        COMMIT fica a cargo de quem a abriu.
+        """
+        conn = self.conexao()
+        if conn.in_transaction:
+            yield conn
+            return
+
+        conn.execute(f"BEGIN {modo}")
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        else:
+            conn.commit()
+
+    def _registrar_comando(self, duracao):
+        with self._trava:
+            self.comandos_executados += 1
+            self.tempo_total += duracao
+
+    def estatisticas(self):
+        """Retorna os contadores de uso do banco"""
+        with self._trava:
+            return {
+                'conexoes_abertas': self.conexoes_abertas,
+                'comandos_executados': self.comandos_executados,
+                'tempo_total': self.tempo_total,
+                'repeticoes': self.repeticoes,
+            }
+
+    def _registrar_repeticao(self):
+        with self._trava:
+            self.repeticoes += 1
+
+    def fechar_conexao_da_thread(self):
+        """Fecha a conexão da thread atual, se houver (threads que terminam antes do programa)"""
+        conn = getattr(self._local, 'conexao', None)
+        if conn is None:
+            return
+        self._local.conexao = None
+        with self._trava:
+            self._conexoes.remove(conn)
+        conn.close()
+
+    def fechar_todas(self):
+        """Fecha todas as conexões abertas por este gerenciador"""
+        with self._trava:
+            conexoes, self._conexoes = self._conexoes, []
+        for conn in conexoes:
+            try:
+                conn.close()
+            except sqlite3.ProgrammingError:
+                # Conexão criada em outra thread; será fechada pelo coletor
+                pass
+        self._local = threading.local()
+        if self.rastreador:
+            self.rastreador.fechar()
+
+
+gerenciador = GerenciadorConexoes(CAMINHO_BANCO, CAMINHO_ARQUIVO)
+
+def obter_conexao():
+    """Retorna a conexão persistente da thread atual"""
+    return gerenciador.conexao()
+
+def transacao(modo="DEFERRED"):
+    """Atalho para gerenciador.transacao()"""
+    return gerenciador.transacao(modo)
+
+def banco_ocupado(erro):
+    """Indica se o erro é de banco bloqueado por outra conexão"""
+    mensagem = str(erro).lower()
+    return isinstance(erro, sqlite3.OperationalError) and ('locked' in mensagem or 'busy' in mensagem)
+
+def repetir_se_ocupado(funcao):
+    """Repete a transação inteira quando outro caixa mantém o banco ocupado.
+
+    Para funções que abrem a própria transação (de preferência IMMEDIATE) e
+    podem ser executadas de novo do início. Entre as tentativas a espera
+    dobra, com uma variação aleatória para que dois caixas não voltem juntos.
+    Dentro de uma transação já aberta não há repetição: quem a abriu decide.
+    """
+    @functools.wraps(funcao)
+    def envolvida(*args, **kwargs):
+        for tentativa in range(TENTATIVAS_ESCRITA):
+            try:
+                return funcao(*args, **kwargs)
+            except sqlite3.OperationalError as e:
+                ultima = tentativa == TENTATIVAS_ESCRITA - 1
+                if ultima or not banco_ocupado(e) or obter_conexao().in_transaction:
+                    raise
+                gerenciador._registrar_repeticao()
+                time.sleep(ESPERA_INICIAL * 2 ** tentativa * random.uniform(0.5, 1.5))
+    return envolvida
+
+def resumo_estatisticas():
+    """Retorna um texto curto com os contadores de uso do banco"""
+    est = gerenciador.estatisticas()
+    return (f"Banco: {est['conexoes_abertas']} conexões abertas, "
+            f"{est['comandos_executados']} comandos, "
+            f"{est['tempo_total'] * 1000:.1f} ms em SQL, "
+            f"{est['repeticoes']} escritas repetidas por banco ocupado")
+
+def resumo_rastreamento(limite=LIMITE_RESUMO):
+    """Retorna os comandos SQL que mais somaram tempo, ou '' fora do modo de rastreamento"""
+    if gerenciador.rastreador is None:
+        return ""
+    return gerenciador.rastreador.resumo(limite)
+
+def fechar_conexao_da_thread():
+    """Atalho para gerenciador.fechar_conexao_da_thread()"""
+    gerenciador.fechar_conexao_da_thread()
+
+def fechar_conexoes():
+    """Fecha as conexões persistentes ao encerrar o programa"""
+    gerenciador.fechar_todas()
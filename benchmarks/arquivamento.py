@@ -0,0 +1,88 @@
+import os
+import sys
+import tempfile
+import time
+import banco
+from esquema import preparar_banco
+from consultas import SQL_TOTAL_A_RECEBER, montar_consulta_historico_vendas, montar_consulta_contas
+from arquivamento import arquivar, compactar
+from resumos import reconstruir_resumos
+from benchmarks.gerador import gerar_dados
+
+
+# Uso: python -m benchmarks.arquivamento
+# Gera três anos de movimento, mede o tamanho do banco principal e as
+# leituras das telas do caixa, arquiva as vendas quitadas com mais de
+# IDADE_DIAS dias e mede de novo. Falha se o histórico completo (visões
+# todas_*) ou os resumos diários reconstruídos mudarem com o arquivamento.
+DIAS = 3 * 365
+VENDAS_POR_DIA = 100
+IDADE_DIAS = 90
+REPETICOES = 20
+
+def contagens(conn):
+    """Linhas do histórico completo, somas de conferência e resumos diários"""
+    return (
+        conn.execute("SELECT COUNT(*), ROUND(SUM(valor_total), 2) FROM todas_vendas").fetchone(),
+        conn.execute("SELECT COUNT(*), SUM(quantidade) FROM todos_itens_venda").fetchone(),
+        conn.execute("SELECT COUNT(*), ROUND(SUM(valor_pago), 2) FROM todos_pagamentos").fetchone(),
+        conn.execute("SELECT * FROM resumo_diario ORDER BY dia").fetchall(),
+    )
+
+def medir_leituras(conn):
+    """Mediana, em milissegundos, de cada leitura das telas"""
+    leituras = {
+        "historico_vendas": montar_consulta_historico_vendas(limite=100),
+        "contas": montar_consulta_contas(limite=100),
+        "total_a_receber": (SQL_TOTAL_A_RECEBER, ()),
+    }
+    medianas = {}
+    for nome, (sql, params) in leituras.items():
+        tempos = []
+        for _ in range(REPETICOES):
+            inicio = time.perf_counter()
+            conn.execute(sql, params).fetchall()
+            tempos.append((time.perf_counter() - inicio) * 1000)
+        tempos.sort()
+        medianas[nome] = tempos[len(tempos) // 2]
+    return medianas
+
+def main():
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, 'loja_ju.db')
+        banco.gerenciador = banco.GerenciadorConexoes(caminho)
+        preparar_banco()
+        with banco.transacao() as conn:
+            quantidades = gerar_dados(conn, dias=DIAS, vendas_por_dia=VENDAS_POR_DIA)
+        reconstruir_resumos()
+        print("Dados gerados: " + ", ".join(f"{n} {tabela}" for tabela, n in quantidades.items()))
+
+        conn = banco.obter_conexao()
+        compactar()
+        antes = contagens(conn)
+        tamanho_antes = os.path.getsize(caminho)
+        leituras_antes = medir_leituras(conn)
+
+        inicio = time.perf_counter()
+        movidas = arquivar(IDADE_DIAS)
+        segundos = time.perf_counter() - inicio
+        compactar()
+        reconstruir_resumos()
+        depois = contagens(conn)
+        tamanho_depois = os.path.getsize(caminho)
+        tamanho_arquivo = os.path.getsize(banco.gerenciador.caminho_arquivo)
+        leituras_depois = medir_leituras(conn)
+        banco.fechar_conexoes()
+
+    print(f"{movidas} vendas arquivadas em {segundos:.1f} s ({movidas / segundos:.0f} vendas/s)")
+    print(f"Banco principal: {tamanho_antes / 2**20:.1f} MB -> {tamanho_depois / 2**20:.1f} MB "
+          f"(arquivo: {tamanho_arquivo / 2**20:.1f} MB)")
+    for nome, mediana in leituras_antes.items():
+        print(f"  {nome:<20} mediana {mediana:7.3f} ms -> {leituras_depois[nome]:7.3f} ms")
+    if antes != depois:
+        print("[FALHA] o histórico completo ou os resumos mudaram com o arquivamento")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+import os
+import sys
+import tempfile
+import time
+import banco
+from esquema import preparar_banco
+from consultas import SQL_BUSCAR_CLIENTES, SQL_BUSCAR_PRODUTOS, parametros_busca
+from benchmarks.gerador import gerar_dados
+
+
+# Uso: python -m benchmarks.busca
+# Gera 100 mil produtos e 20 mil clientes em um banco temporário e mede as
+# buscas textuais das telas de cadastro, que devem ficar em milissegundos.
+CLIENTES = 20_000
+PRODUTOS = 100_000
+ORCAMENTO_MS = 50
+BUSCAS = (
+    (SQL_BUSCAR_CLIENTES, ("ana", "julia silva", "araujo", "maria", "9123", "(11) 9")),
+    (SQL_BUSCAR_PRODUTOS, ("blusa", "calca azul", "vestido preto gg", "macacao", "ve", "rosa p")),
+)
+REPETICOES = 5
+
+def main():
+    with tempfile.TemporaryDirectory() as pasta:
+        banco.gerenciador = banco.GerenciadorConexoes(os.path.join(pasta, 'loja_ju.db'))
+        preparar_banco()
+        inicio = time.perf_counter()
+        with banco.transacao() as conn:
+            gerar_dados(conn, clientes=CLIENTES, produtos=PRODUTOS, dias=1, vendas_por_dia=1)
+        print(f"{CLIENTES} clientes e {PRODUTOS} produtos gerados e indexados em "
+              f"{time.perf_counter() - inicio:.1f} s")
+
+        cursor = banco.obter_conexao().cursor()
+        pior = 0.0
+        for sql, textos in BUSCAS:
+            for texto in textos:
+                tempos = []
+                for _ in range(REPETICOES):
+                    inicio = time.perf_counter()
+                    cursor.execute(sql, parametros_busca(texto))
+                    linhas = cursor.fetchall()
+                    tempos.append((time.perf_counter() - inicio) * 1000)
+                pior = max(pior, max(tempos))
+                print(f"  {texto!r:<22} {len(linhas):4d} linhas, "
+                      f"mediana {sorted(tempos)[len(tempos) // 2]:6.2f} ms")
+        banco.fechar_conexoes()
+
+    print(f"Pior busca: {pior:.1f} ms (orçamento: {ORCAMENTO_MS} ms)")
+    if pior > ORCAMENTO_MS:
+        print("Orçamento de latência estourado!")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+import banco
+from esquema import preparar_banco
+from consultas import SQL_ESTOQUE_E_PRECO
+from resumos import registrar_venda
+from vendas import SQL_INSERIR_VENDA, gravar_venda
+from benchmarks.gerador import gerar_dados
+
+
+# Uso: python -m benchmarks.checkout
+# Mede o tempo de gravação (até o COMMIT) de vendas com 30 itens, comparando
+# a gravação item a item usada antes (leitura de estoque, INSERT e UPDATE
+# por item) com a gravação em conjunto de vendas.gravar_venda.
+ITENS_POR_VENDA = 30
+VENDAS = 200
+
+def gravar_venda_item_a_item(cliente_id, itens):
+    """Reprodução do caminho anterior, só para comparação"""
+    with banco.transacao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(SQL_INSERIR_VENDA, (cliente_id, 0, datetime.now(banco.FUSO_HORARIO)))
+        venda_id = cursor.lastrowid
+        valor_total = 0
+        for produto_id, quantidade in itens:
+            cursor.execute(SQL_ESTOQUE_E_PRECO, (produto_id,))
+            estoque, valor_unitario = cursor.fetchone()
+            if estoque < quantidade:
+                raise ValueError(f"Estoque insuficiente para o produto ID {produto_id}")
+            cursor.execute("""
+                INSERT INTO itens_venda (venda_id, produto_id, quantidade, valor_unitario)
+                VALUES (?, ?, ?, ?)
+            """, (venda_id, produto_id, quantidade, valor_unitario))
+            cursor.execute("UPDATE produtos SET quantidade = quantidade - ? WHERE id = ?",
+                           (quantidade, produto_id))
+            valor_total += quantidade * valor_unitario
+        cursor.execute("UPDATE vendas SET valor_total = ? WHERE id = ?", (round(valor_total, 2), venda_id))
+        registrar_venda(conn, venda_id)
+    return venda_id, valor_total
+
+def medir(nome, gravar, vendas):
+    tempos = []
+    for cliente_id, itens in vendas:
+        inicio = time.perf_counter()
+        gravar(cliente_id, itens)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    tempos.sort()
+    print(f"{nome:<14} mediana {tempos[len(tempos) // 2]:6.2f} ms, "
+          f"p95 {tempos[int(len(tempos) * 0.95)]:6.2f} ms por venda de {ITENS_POR_VENDA} itens")
+    return tempos[len(tempos) // 2]
+
+def main():
+    aleatorio = random.Random(42)
+    with tempfile.TemporaryDirectory() as pasta:
+        banco.gerenciador = banco.GerenciadorConexoes(os.path.join(pasta, 'loja_ju.db'))
+        preparar_banco()
+        with banco.transacao() as conn:
+            gerar_dados(conn, dias=30)
+            produtos = [linha[0] for linha in conn.execute("SELECT id FROM produtos")]
+            clientes = [str(linha[0]) for linha in conn.execute("SELECT codigo_cliente FROM clientes")]
+
+        vendas = [(aleatorio.choice(clientes),
+                   [(produto_id, aleatorio.randint(1, 3))
+                    for produto_id in aleatorio.sample(produtos, ITENS_POR_VENDA)])
+                  for _ in range(VENDAS)]
+
+        antes = medir("item a item", gravar_venda_item_a_item, vendas)
+        depois = medir("em conjunto", gravar_venda, vendas)
+        banco.fechar_conexoes()
+
+    print(f"Gravação em conjunto {antes / depois:.1f}x mais rápida (mediana)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
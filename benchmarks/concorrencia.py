@@ -0,0 +1,116 @@
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+import banco
+from esquema import preparar_banco
+
+
+# Uso: python -m benchmarks.concorrencia [processos] [segundos]
+# Vários processos, como caixas separados, vendem ao mesmo tempo os mesmos
+# poucos produtos de um banco compartilhado até o estoque acabar. No fim
+# confere que nenhum estoque ficou negativo e que cada unidade baixada
+# corresponde a um item vendido, e informa as vendas por segundo.
+PROCESSOS = 4
+DURACAO = 5.0
+PRODUTOS = 20
+ESTOQUE_INICIAL = 1000
+CLIENTES = 10
+
+def caixa(caminho, numero, duracao, resultados):
+    # Cada processo tem seu próprio gerenciador e, portanto, suas conexões
+    banco.gerenciador = banco.GerenciadorConexoes(caminho)
+    from vendas import gravar_venda
+
+    aleatorio = random.Random(numero)
+    contagem = {'vendas': 0, 'sem_estoque': 0, 'bloqueios': 0}
+    inicio = time.perf_counter()
+    fim = inicio + duracao
+    while time.perf_counter() < fim:
+        itens = [(produto_id, aleatorio.randint(1, 3))
+                 for produto_id in aleatorio.sample(range(1, PRODUTOS + 1), aleatorio.randint(1, 5))]
+        try:
+            gravar_venda(str(aleatorio.randint(1, CLIENTES)), itens)
+            contagem['vendas'] += 1
+        except ValueError:
+            contagem['sem_estoque'] += 1
+            # Quando todos os produtos acabam não há mais o que vender
+            conn = banco.obter_conexao()
+            if conn.execute("SELECT MAX(quantidade) FROM produtos").fetchone()[0] == 0:
+                break
+        except banco.sqlite3.OperationalError as e:
+            if not banco.banco_ocupado(e):
+                raise
+            contagem['bloqueios'] += 1
+    contagem['segundos'] = time.perf_counter() - inicio
+    contagem['repeticoes'] = banco.gerenciador.estatisticas()['repeticoes']
+    banco.fechar_conexoes()
+    resultados.put(contagem)
+
+def main(argumentos):
+    processos = int(argumentos[0]) if argumentos else PROCESSOS
+    duracao = float(argumentos[1]) if len(argumentos) > 1 else DURACAO
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, 'loja_ju.db')
+        banco.gerenciador = banco.GerenciadorConexoes(caminho)
+        preparar_banco()
+        with banco.transacao("IMMEDIATE") as conn:
+            conn.executemany("INSERT INTO clientes (nome, telefone) VALUES (?, '-')",
+                             [(f"Cliente {i}",) for i in range(CLIENTES)])
+            conn.executemany("""
+                INSERT INTO produtos (tipo, cor, tamanho, preco_custo, preco_venda, quantidade)
+                VALUES ('Blusa', 'Azul', 'M', 5, 10, ?)
+            """, [(ESTOQUE_INICIAL,)] * PRODUTOS)
+        banco.fechar_conexoes()
+
+        contexto = multiprocessing.get_context("spawn")
+        resultados = contexto.Queue()
+        filhos = [contexto.Process(target=caixa, args=(caminho, numero, duracao, resultados))
+                  for numero in range(processos)]
+        for filho in filhos:
+            filho.start()
+        contagens = [resultados.get() for _ in filhos]
+        for filho in filhos:
+            filho.join()
+        # Tempo de venda, sem contar a criação dos processos
+        decorrido = max(c['segundos'] for c in contagens)
+
+        banco.gerenciador = banco.GerenciadorConexoes(caminho)
+        conn = banco.obter_conexao()
+        negativos = conn.execute("SELECT COUNT(*) FROM produtos WHERE quantidade < 0").fetchone()[0]
+        divergentes = conn.execute("""
+            SELECT COUNT(*)
+            FROM produtos p
+            WHERE ? - p.quantidade != (SELECT COALESCE(SUM(iv.quantidade), 0)
+                                       FROM itens_venda iv WHERE iv.produto_id = p.id)
+        """, (ESTOQUE_INICIAL,)).fetchone()[0]
+        vendas_gravadas = conn.execute("SELECT COUNT(*) FROM vendas").fetchone()[0]
+        restante = conn.execute("SELECT SUM(quantidade) FROM produtos").fetchone()[0]
+        banco.fechar_conexoes()
+
+    total = {chave: sum(c[chave] for c in contagens) for chave in contagens[0]}
+    print(f"{processos} processos em {decorrido:.1f} s: {total['vendas']} vendas "
+          f"({total['vendas'] / decorrido:.0f} vendas/s), {total['sem_estoque']} recusadas por estoque, "
+          f"{total['repeticoes']} repetições, {total['bloqueios']} falhas por banco ocupado")
+    print(f"Estoque restante: {restante} de {PRODUTOS * ESTOQUE_INICIAL} unidades")
+
+    problemas = []
+    if negativos:
+        problemas.append(f"{negativos} produto(s) com estoque negativo")
+    if divergentes:
+        problemas.append(f"{divergentes} produto(s) com baixa diferente dos itens vendidos")
+    if vendas_gravadas != total['vendas']:
+        problemas.append(f"{vendas_gravadas} vendas gravadas para {total['vendas']} confirmadas")
+    if total['bloqueios']:
+        problemas.append(f"{total['bloqueios']} venda(s) perdidas por banco ocupado")
+    for problema in problemas:
+        print(f"[FALHA] {problema}")
+    if not problemas:
+        print("Nenhuma venda acima do estoque e nenhuma venda perdida.")
+    return 1 if problemas else 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,47 @@
+import os
+import sys
+import tempfile
+import time
+import banco
+from esquema import preparar_banco
+from dashboard import ORCAMENTO_MS, calcular_indicadores
+from resumos import reconstruir_resumos
+from benchmarks.gerador import gerar_dados
+
+
+# Uso: python -m benchmarks.dashboard
+# Carrega um ano de vendas em um banco temporário e confere se o cálculo
+# dos indicadores fica dentro de dashboard.ORCAMENTO_MS.
+REPETICOES = 20
+
+def main():
+    with tempfile.TemporaryDirectory() as pasta:
+        banco.gerenciador = banco.GerenciadorConexoes(os.path.join(pasta, 'loja_ju.db'))
+        preparar_banco()
+        with banco.transacao() as conn:
+            quantidades = gerar_dados(conn, dias=365)
+        reconstruir_resumos()
+        print("Dados gerados: " + ", ".join(f"{n} {tabela}" for tabela, n in quantidades.items()))
+
+        # Primeira execução só aquece o cache de páginas
+        calcular_indicadores()
+
+        tempos = []
+        for _ in range(REPETICOES):
+            inicio = time.perf_counter()
+            calcular_indicadores()
+            tempos.append((time.perf_counter() - inicio) * 1000)
+        banco.fechar_conexoes()
+
+    tempos.sort()
+    mediana = tempos[len(tempos) // 2]
+    pior = tempos[-1]
+    print(f"Dashboard: mediana {mediana:.1f} ms, pior {pior:.1f} ms em {REPETICOES} execuções "
+          f"(orçamento: {ORCAMENTO_MS} ms)")
+    if pior > ORCAMENTO_MS:
+        print("Orçamento de latência estourado!")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
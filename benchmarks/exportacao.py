@@ -0,0 +1,75 @@
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import banco
+from esquema import preparar_banco
+from exportacao import exportar_vendas, exportar_itens, exportar_contas, exportar_pagamentos
+from benchmarks.gerador import gerar_dados
+
+
+# Uso: python -m benchmarks.exportacao
+# Exporta vendas, itens, contas e pagamentos de bancos com históricos de
+# tamanhos crescentes e mede o pico de memória Python (tracemalloc) de cada
+# exportação. Falha se, no maior histórico, o pico passar de
+# CRESCIMENTO_MAXIMO vezes o do menor (mais FOLGA_BYTES): a memória deve
+# ficar estável qualquer que seja o número de linhas.
+DIAS = (30, 180, 720)
+VENDAS_POR_DIA = 100
+CRESCIMENTO_MAXIMO = 1.5
+FOLGA_BYTES = 256 * 1024
+
+EXPORTACOES = (
+    ("vendas", exportar_vendas),
+    ("itens", exportar_itens),
+    ("contas", exportar_contas),
+    ("pagamentos", exportar_pagamentos),
+)
+
+def medir(pasta, nome, exportar):
+    """Retorna (linhas, segundos, pico em bytes) de uma exportação.
+
+    O tempo vem de uma primeira passada sem tracemalloc, que deixa tudo
+    várias vezes mais lento; o pico, de uma segunda passada.
+    """
+    caminho = os.path.join(pasta, f"{nome}.csv")
+    inicio = time.perf_counter()
+    linhas = exportar(caminho)
+    segundos = time.perf_counter() - inicio
+
+    tracemalloc.start()
+    exportar(caminho)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return linhas, segundos, pico
+
+def main():
+    picos = {}
+    for dias in DIAS:
+        with tempfile.TemporaryDirectory() as pasta:
+            banco.gerenciador = banco.GerenciadorConexoes(os.path.join(pasta, 'loja_ju.db'))
+            preparar_banco()
+            with banco.transacao() as conn:
+                gerar_dados(conn, dias=dias, vendas_por_dia=VENDAS_POR_DIA)
+            for nome, exportar in EXPORTACOES:
+                linhas, segundos, pico = medir(pasta, nome, exportar)
+                picos.setdefault(nome, []).append(pico)
+                print(f"{dias:4d} dias  {nome:<11} {linhas:8d} linhas em {segundos * 1000:7.1f} ms, "
+                      f"pico {pico / 1024:7.1f} KB")
+            banco.fechar_conexoes()
+
+    problemas = []
+    for nome, medidas in picos.items():
+        limite = medidas[0] * CRESCIMENTO_MAXIMO + FOLGA_BYTES
+        if medidas[-1] > limite:
+            problemas.append(f"{nome}: pico de {medidas[-1] / 1024:.0f} KB com {DIAS[-1]} dias, "
+                             f"acima de {limite / 1024:.0f} KB")
+    for problema in problemas:
+        print(f"[FALHA] {problema}")
+    if not problemas:
+        print("Memória estável em todas as exportações.")
+    return 1 if problemas else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+import random
+from datetime import datetime, timedelta
+
+
+TIPOS = ("Blusa", "Calça", "Saia", "Vestido", "Short", "Camiseta", "Jaqueta", "Macacão")
+CORES = ("Preto", "Branco", "Azul", "Vermelho", "Verde", "Rosa", "Bege", "Amarelo")
+TAMANHOS = ("PP", "P", "M", "G", "GG")
+NOMES = ("Ana", "Beatriz", "Carla", "Daniela", "Eduarda", "Fernanda", "Gabriela", "Helena",
+         "Isabela", "Júlia", "Larissa", "Mariana", "Natália", "Patrícia", "Renata", "Sofia")
+SOBRENOMES = ("Silva", "Santos", "Oliveira", "Souza", "Lima", "Pereira", "Costa", "Ferreira",
+              "Almeida", "Ribeiro", "Carvalho", "Gomes", "Martins", "Araújo", "Rocha", "Barbosa")
+
+def gerar_dados(conn, clientes=200, produtos=300, dias=365, vendas_por_dia=30, semente=42, hoje=None):
+    """Popula o banco com dados sintéticos reproduzíveis.
+
+    As vendas são distribuídas pelos últimos `dias` dias, com 1 a 4 itens
+    cada. Cerca de 70% são pagas integralmente, 15% parcialmente e o
+    restante fica em aberto. Deve ser chamada dentro de uma transação.
+    """
+    aleatorio = random.Random(semente)
+    hoje = hoje or datetime.now()
+    inicio = (hoje - timedelta(days=dias)).replace(hour=0, minute=0, second=0, microsecond=0)
+    cursor = conn.cursor()
+
+    cursor.executemany(
+        "INSERT INTO clientes (nome, telefone, data_cadastro) VALUES (?, ?, ?)",
+        [(f"{aleatorio.choice(NOMES)} {aleatorio.choice(SOBRENOMES)} {i}",
+          f"(11) 9{aleatorio.randint(1000, 9999)}-{aleatorio.randint(1000, 9999)}",
+          inicio)
+         for i in range(clientes)])
+    cursor.execute("SELECT codigo_cliente FROM clientes")
+    codigos_clientes = [str(linha[0]) for linha in cursor.fetchall()]
+
+    linhas_produtos = []
+    for _ in range(produtos):
+        custo = round(aleatorio.uniform(10, 120), 2)
+        em_promocao = aleatorio.random() < 0.1
+        linhas_produtos.append((
+            aleatorio.choice(TIPOS), aleatorio.choice(CORES), aleatorio.choice(TAMANHOS),
+            custo, round(custo * 2, 2), 10 ** 6,
+            1 if em_promocao else 0, round(custo * 1.5, 2) if em_promocao else None))
+    cursor.executemany("""
+        INSERT INTO produtos (tipo, cor, tamanho, preco_custo, preco_venda, quantidade,
+                              promocao, preco_promocional)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """, linhas_produtos)
+    cursor.execute("SELECT id, preco_venda, preco_custo FROM produtos")
+    precos = cursor.fetchall()
+
+    cursor.execute("SELECT COALESCE(MAX(id), 0) FROM vendas")
+    proximo_id = cursor.fetchone()[0] + 1
+
+    vendas, itens, pagamentos = [], [], []
+    for dia in range(dias):
+        for _ in range(vendas_por_dia):
+            venda_id = proximo_id
+            proximo_id += 1
+            data_venda = inicio + timedelta(days=dia, seconds=aleatorio.randint(9 * 3600, 19 * 3600))
+            cliente_id = aleatorio.choice(codigos_clientes)
+
+            total = 0.0
+            for produto_id, preco, custo in aleatorio.sample(precos, aleatorio.randint(1, 4)):
+                quantidade = aleatorio.randint(1, 3)
+                itens.append((venda_id, produto_id, quantidade, preco, custo))
+                total += quantidade * preco
+            total = round(total, 2)
+            vendas.append((venda_id, cliente_id, total, data_venda))
+
+            sorteio = aleatorio.random()
+            if sorteio < 0.85:
+                valor = total if sorteio < 0.70 else round(total / 2, 2)
+                data_pagamento = min(data_venda + timedelta(days=aleatorio.randint(0, 30)), hoje)
+                pagamentos.append((cliente_id, venda_id, valor, data_pagamento))
+
+    cursor.executemany(
+        "INSERT INTO vendas (id, cliente_id, valor_total, data_venda) VALUES (?, ?, ?, ?)", vendas)
+    cursor.executemany(
+        "INSERT INTO itens_venda (venda_id, produto_id, quantidade, valor_unitario, custo_unitario) "
+        "VALUES (?, ?, ?, ?, ?)",
+        itens)
+    cursor.executemany(
+        "INSERT INTO pagamentos (cliente_id, venda_id, valor_pago, data_pagamento) VALUES (?, ?, ?, ?)",
+        pagamentos)
+
+    return {
+        'clientes': clientes,
+        'produtos': produtos,
+        'vendas': len(vendas),
+        'itens_venda': len(itens),
+        'pagamentos': len(pagamentos),
+    }
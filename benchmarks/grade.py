@@ -0,0 +1,129 @@
+import os
+import sys
+import tempfile
+import time
+import banco
+from esquema import preparar_banco
+from consultas import montar_consulta_clientes
+from paginacao import FontePaginada, GradePaginada
+
+
+# Uso: python -m benchmarks.grade
+# Mede a atualização da listagem paginada de clientes (GradePaginada.atualizar,
+# como ao voltar para a tela ou depois de um cadastro) com tabelas de tamanhos
+# crescentes, depois de mudar e de excluir um cliente exibido. A Treeview é
+# substituída por TabelaContada, que guarda as linhas numa lista e conta as
+# operações que seriam feitas no Tk (as caras). Falha se uma mudança de uma
+# linha pedir mais que OPERACOES_MAXIMAS operações ou se a atualização passar
+# de ORCAMENTO_MS em qualquer tamanho: o custo deve depender só das linhas
+# exibidas, não do número de clientes.
+TAMANHOS = (1_000, 10_000, 100_000)
+OPERACOES_MAXIMAS = 3
+ORCAMENTO_MS = 20
+REPETICOES = 20
+
+class TabelaContada:
+    """O suficiente de uma ttk.Treeview para a grade paginada, contando as operações"""
+
+    def __init__(self):
+        self.itens = []
+        self.valores = {}
+        self.operacoes = 0
+        self.primeiro = 0.0
+
+    def configure(self, **opcoes):
+        pass
+
+    def get_children(self):
+        return tuple(self.itens)
+
+    def insert(self, pai, posicao, iid, values):
+        self.operacoes += 1
+        self.valores[iid] = values
+        if posicao == "end":
+            self.itens.append(iid)
+        else:
+            self.itens.insert(posicao, iid)
+        return iid
+
+    def item(self, iid, values):
+        self.operacoes += 1
+        self.valores[iid] = values
+
+    def delete(self, *itens):
+        self.operacoes += 1
+        for item in itens:
+            self.itens.remove(item)
+            del self.valores[item]
+
+    def move(self, iid, pai, posicao):
+        self.operacoes += 1
+        self.itens.remove(iid)
+        self.itens.insert(posicao, iid)
+
+    def yview(self):
+        return self.primeiro, 1.0
+
+    def yview_moveto(self, fracao):
+        self.operacoes += 1
+        self.primeiro = fracao
+
+def formatar(linhas):
+    return [linha[:-1] for linha in linhas]
+
+def medir_atualizacao(grade):
+    """Mediana, em milissegundos, de GradePaginada.atualizar sem mudanças no banco"""
+    tempos = []
+    for _ in range(REPETICOES):
+        inicio = time.perf_counter()
+        grade.atualizar()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    tempos.sort()
+    return tempos[len(tempos) // 2]
+
+def main():
+    problemas = []
+    for tamanho in TAMANHOS:
+        with tempfile.TemporaryDirectory() as pasta:
+            banco.gerenciador = banco.GerenciadorConexoes(os.path.join(pasta, 'loja_ju.db'))
+            preparar_banco()
+            with banco.transacao() as conn:
+                conn.executemany("INSERT INTO clientes (nome, telefone) VALUES (?, ?)",
+                                 ((f"Cliente {n}", f"11 9{n:08d}") for n in range(tamanho)))
+
+            # Sem executor: as páginas são lidas na hora
+            tabela = TabelaContada()
+            grade = GradePaginada(tabela)
+            grade.carregar(FontePaginada(montar_consulta_clientes), formatar)
+            mediana = medir_atualizacao(grade)
+
+            # Um cliente exibido muda de nome
+            meio = tabela.itens[len(tabela.itens) // 2]
+            with banco.transacao() as conn:
+                conn.execute("UPDATE clientes SET nome = 'Alterado' WHERE codigo_cliente = ?", (int(meio),))
+            tabela.operacoes = 0
+            grade.atualizar()
+            alteracao = tabela.operacoes
+
+            # E depois é excluído
+            with banco.transacao() as conn:
+                conn.execute("DELETE FROM clientes WHERE codigo_cliente = ?", (int(meio),))
+            tabela.operacoes = 0
+            grade.atualizar()
+            remocao = tabela.operacoes
+            exibidas = len(tabela.itens)
+            banco.fechar_conexoes()
+
+        print(f"{tamanho:8d} clientes: {exibidas} exibidos, atualização em {mediana:.2f} ms, "
+              f"alteração {alteracao} operação(ões), remoção {remocao}")
+        if max(alteracao, remocao) > OPERACOES_MAXIMAS:
+            problemas.append(f"{tamanho} clientes: {max(alteracao, remocao)} operações para uma linha")
+        if mediana > ORCAMENTO_MS:
+            problemas.append(f"{tamanho} clientes: atualização em {mediana:.2f} ms (orçamento: {ORCAMENTO_MS} ms)")
+
+    for problema in problemas:
+        print(f"[FALHA] {problema}")
+    return 1 if problemas else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+import csv
+import os
+import random
+import sys
+import tempfile
+import banco
+from esquema import TABELAS_BUSCA, preparar_banco
+from importacao import importar_produtos, importar_clientes
+from benchmarks.gerador import TIPOS, CORES, TAMANHOS, NOMES, SOBRENOMES
+
+
+# Uso: python -m benchmarks.importacao [linhas]
+# Gera CSVs de produtos e clientes com algumas linhas inválidas, importa
+# num banco temporário e importa de novo com atualização. Confere as
+# contagens, a busca textual e se cada importação fica dentro de
+# ORCAMENTO_S segundos.
+LINHAS = 100_000
+ORCAMENTO_S = 10.0
+# Uma linha a cada INVALIDA_A_CADA tem preço ou nome inválido
+INVALIDA_A_CADA = 1000
+
+def gerar_csv_produtos(caminho, linhas, aleatorio):
+    with open(caminho, "w", newline="", encoding="utf-8") as arquivo:
+        escritor = csv.writer(arquivo, delimiter=";")
+        escritor.writerow(["Tipo", "Cor", "Tamanho", "Preço Custo", "Preço Venda", "Quantidade"])
+        for numero in range(linhas):
+            custo = aleatorio.uniform(10, 120)
+            venda = "abc" if numero % INVALIDA_A_CADA == 0 else f"{custo * 2:.2f}".replace(".", ",")
+            # Tipos numerados para que as chaves (tipo, cor, tamanho) não se repitam
+            escritor.writerow([f"{aleatorio.choice(TIPOS)} {numero}", aleatorio.choice(CORES),
+                               aleatorio.choice(TAMANHOS), f"{custo:.2f}".replace(".", ","), venda,
+                               aleatorio.randint(0, 50)])
+
+def gerar_csv_clientes(caminho, linhas, aleatorio):
+    with open(caminho, "w", newline="", encoding="utf-8") as arquivo:
+        escritor = csv.writer(arquivo)
+        escritor.writerow(["nome", "telefone"])
+        for numero in range(linhas):
+            nome = "" if numero % INVALIDA_A_CADA == 0 else \
+                f"{aleatorio.choice(NOMES)} {aleatorio.choice(SOBRENOMES)}"
+            escritor.writerow([nome, f"(11) 9{numero:08d}"])
+
+def medir(nome, importar, caminho, atualizar, esperado):
+    resultado = importar(caminho, atualizar)
+    print(f"{nome:<28} {resultado.resumo()}")
+    problemas = []
+    contagens = (resultado.inseridas, resultado.atualizadas, resultado.rejeitadas)
+    if contagens != esperado:
+        problemas.append(f"{nome}: (incluídas, atualizadas, rejeitadas) = {contagens}, esperado {esperado}")
+    if resultado.segundos > ORCAMENTO_S:
+        problemas.append(f"{nome}: {resultado.segundos:.1f} s, acima de {ORCAMENTO_S} s")
+    return problemas
+
+def main(argumentos):
+    linhas = int(argumentos[0]) if argumentos else LINHAS
+    rejeitadas = len(range(0, linhas, INVALIDA_A_CADA))
+    validas = linhas - rejeitadas
+    aleatorio = random.Random(42)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        banco.gerenciador = banco.GerenciadorConexoes(os.path.join(pasta, 'loja_ju.db'))
+        preparar_banco()
+        produtos = os.path.join(pasta, "produtos.csv")
+        clientes = os.path.join(pasta, "clientes.csv")
+        gerar_csv_produtos(produtos, linhas, aleatorio)
+        gerar_csv_clientes(clientes, linhas, aleatorio)
+
+        problemas = []
+        problemas += medir("produtos", importar_produtos, produtos, False, (validas, 0, rejeitadas))
+        problemas += medir("produtos, atualizando", importar_produtos, produtos, True, (0, validas, rejeitadas))
+        problemas += medir("clientes", importar_clientes, clientes, False, (validas, 0, rejeitadas))
+        problemas += medir("clientes, atualizando", importar_clientes, clientes, True, (0, validas, rejeitadas))
+
+        # A busca textual, mantida por lote, deve continuar íntegra e com os gatilhos de volta
+        conn = banco.obter_conexao()
+        for busca, tabela, _, _ in TABELAS_BUSCA:
+            try:
+                conn.execute(f"INSERT INTO {busca} ({busca}) VALUES ('integrity-check')")
+            except banco.sqlite3.DatabaseError as e:
+                problemas.append(f"busca de {tabela} corrompida: {e}")
+        gatilhos = conn.execute("SELECT COUNT(*) FROM sqlite_master "
+                                "WHERE type = 'trigger' AND name LIKE 'trg_%_busca_%'").fetchone()[0]
+        if gatilhos != 3 * len(TABELAS_BUSCA):
+            problemas.append(f"{gatilhos} gatilhos de busca, esperado {3 * len(TABELAS_BUSCA)}")
+        banco.fechar_conexoes()
+
+    for problema in problemas:
+        print(f"[FALHA] {problema}")
+    return 1 if problemas else 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,62 @@
+import os
+import sys
+import tempfile
+import time
+import banco
+from esquema import VERSAO_ESQUEMA, preparar_banco
+from resumos import reconstruir_resumos
+from benchmarks.gerador import gerar_dados
+
+
+# Uso: python -m benchmarks.inicializacao
+# Gera um banco grande e mede preparar_banco() como na abertura do
+# programa, sempre com conexão nova: passando por todas as migrações (banco
+# na versão 0, o que toda abertura fazia antes do user_version) e com o
+# banco já atualizado. Falha se o caminho rápido passar de ORCAMENTO_MS.
+DIAS = 3 * 365
+VENDAS_POR_DIA = 120
+REPETICOES = 10
+ORCAMENTO_MS = 5.0
+
+def medir(caminho, versao_inicial):
+    """Mediana, em milissegundos, de preparar_banco() partindo de `versao_inicial`"""
+    tempos = []
+    for _ in range(REPETICOES):
+        if versao_inicial is not None:
+            with banco.transacao("IMMEDIATE") as conn:
+                conn.execute(f"PRAGMA user_version = {versao_inicial}")
+        banco.fechar_conexoes()
+        banco.gerenciador = banco.GerenciadorConexoes(caminho)
+        inicio = time.perf_counter()
+        preparar_banco()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    tempos.sort()
+    return tempos[len(tempos) // 2]
+
+def main():
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, 'loja_ju.db')
+        banco.gerenciador = banco.GerenciadorConexoes(caminho)
+        preparar_banco()
+        with banco.transacao() as conn:
+            quantidades = gerar_dados(conn, dias=DIAS, vendas_por_dia=VENDAS_POR_DIA)
+        reconstruir_resumos()
+        print("Dados gerados: " + ", ".join(f"{n} {tabela}" for tabela, n in quantidades.items()))
+
+        todas = medir(caminho, 0)
+        rapido = medir(caminho, None)
+        versao = banco.obter_conexao().execute("PRAGMA user_version").fetchone()[0]
+        banco.fechar_conexoes()
+
+    print(f"Todas as migrações (versão 0): mediana {todas:.1f} ms")
+    print(f"Banco na versão {versao}:          mediana {rapido:.1f} ms (orçamento: {ORCAMENTO_MS} ms)")
+    if versao != VERSAO_ESQUEMA:
+        print(f"[FALHA] banco ficou na versão {versao}, esperado {VERSAO_ESQUEMA}")
+        return 1
+    if rapido > ORCAMENTO_MS:
+        print("Orçamento de inicialização estourado!")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,207 @@
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+import banco
+from esquema import preparar_banco
+from consultas import (SQL_TOTAL_A_RECEBER, SQL_BUSCAR_PRODUTOS, parametros_busca,
+                       montar_consulta_historico_vendas, montar_consulta_contas, montar_consulta_historico)
+from catalogo import Catalogo
+from dashboard import calcular_indicadores
+from paginacao import FontePaginada
+from resumos import reconstruir_resumos
+from tempo import formatar_data_hora
+from benchmarks.gerador import gerar_dados
+
+
+# Uso: python -m benchmarks.leituras [--tamanhos pequeno,medio,grande]
+#                                    [--saida resultado.json] [--comparar anterior.json]
+# Gera, com a mesma semente, bancos temporários de vários tamanhos e mede
+# as leituras por trás das telas: a primeira página e uma página funda do
+# histórico de vendas, das contas a receber (todas e filtradas por cliente)
+# e do histórico de pagamentos (com filtro de cliente e período), o total a
+# receber, os indicadores do dashboard, a carga do catálogo e a busca de
+# produtos. Grava os tempos em JSON; com --comparar, mostra a variação da
+# mediana em relação a uma execução anterior e termina com erro se alguma
+# leitura ficou mais lenta.
+TAMANHOS = {
+    # nome: parâmetros de gerar_dados
+    "pequeno": {"clientes": 200, "produtos": 300, "dias": 365, "vendas_por_dia": 30},
+    "medio": {"clientes": 2_000, "produtos": 3_000, "dias": 3 * 365, "vendas_por_dia": 60},
+    "grande": {"clientes": 10_000, "produtos": 10_000, "dias": 5 * 365, "vendas_por_dia": 120},
+}
+SEMENTE = 42
+REPETICOES = 20
+TAMANHO_PAGINA = 100
+# Páginas percorridas antes de medir a "página funda"
+PAGINAS_FUNDAS = 50
+# Na comparação, uma mediana só conta como mais lenta (ou mais rápida) se
+# variar mais que TOLERANCIA_COMPARACAO e mais que DIFERENCA_MINIMA_MS: em
+# leituras de décimos de milissegundo, 20% é ruído
+TOLERANCIA_COMPARACAO = 0.2
+DIFERENCA_MINIMA_MS = 0.1
+
+def ler_pagina(montar_consulta, apos=None, **filtros):
+    """Lê e formata uma página como a GradePaginada faz; retorna a chave da última linha"""
+    query, params = montar_consulta(apos=apos, limite=TAMANHO_PAGINA, **filtros)
+    linhas = banco.obter_conexao().execute(query, params).fetchall()
+    formatar_data_hora([linha[-1] for linha in linhas])
+    return (linhas[-1][-1], linhas[-1][0]) if linhas else None
+
+def chave_funda(montar_consulta, **filtros):
+    """Chave da página PAGINAS_FUNDAS, alcançada como na rolagem da tela"""
+    fonte = FontePaginada(lambda **posicao: montar_consulta(**filtros, **posicao), TAMANHO_PAGINA)
+    chaves = [None]
+    pagina = fonte.primeira_pagina()
+    while pagina and len(chaves) < PAGINAS_FUNDAS:
+        chaves.append(pagina[-1][0])
+        pagina = fonte.pagina_seguinte(chaves[-1])
+    # Com menos páginas que isso, fica a que lê a última página com linhas
+    if not pagina and len(chaves) > 1:
+        return chaves[-2]
+    return chaves[-1]
+
+def caminhos_de_leitura(conn):
+    """Retorna [(nome, função sem argumentos)] das leituras medidas"""
+    cliente = conn.execute("""
+        SELECT cliente_id FROM vendas WHERE saldo > 0
+        GROUP BY cliente_id ORDER BY COUNT(*) DESC LIMIT 1
+    """).fetchone()[0]
+    hoje = date.today()
+    periodo = {"codigo_cliente": cliente, "data_inicial": hoje - timedelta(days=90), "data_final": hoje}
+    funda_vendas = chave_funda(montar_consulta_historico_vendas)
+    funda_contas = chave_funda(montar_consulta_contas)
+
+    return [
+        # atualizar_tabela_vendas
+        ("historico_vendas", lambda: ler_pagina(montar_consulta_historico_vendas)),
+        ("historico_vendas_funda", lambda: ler_pagina(montar_consulta_historico_vendas, funda_vendas)),
+        # Tela de contas (paginar) e filtrar_contas
+        ("contas", lambda: ler_pagina(montar_consulta_contas)),
+        ("contas_funda", lambda: ler_pagina(montar_consulta_contas, funda_contas)),
+        ("contas_por_cliente", lambda: ler_pagina(montar_consulta_contas, codigo_cliente=cliente)),
+        # carregar_historico_pagamentos, sem e com filtros
+        ("historico_pagamentos", lambda: ler_pagina(montar_consulta_historico)),
+        ("historico_pagamentos_filtrado", lambda: ler_pagina(montar_consulta_historico, **periodo)),
+        # calcular_total_receber
+        ("total_a_receber", lambda: conn.execute(SQL_TOTAL_A_RECEBER).fetchone()),
+        # Dashboard (antes obter_dados_*)
+        ("dashboard", calcular_indicadores),
+        # Primeira consulta do catálogo, feita ao abrir a tela de vendas
+        ("catalogo_carga", lambda: Catalogo().listar()),
+        ("buscar_produtos", lambda: conn.execute(SQL_BUSCAR_PRODUTOS,
+                                                 parametros_busca("blusa azul")).fetchall()),
+    ]
+
+def medir(funcao, repeticoes=REPETICOES):
+    """Retorna estatísticas, em milissegundos, de `repeticoes` execuções depois de um aquecimento"""
+    funcao()
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    tempos.sort()
+    return {
+        "minimo_ms": round(tempos[0], 3),
+        "mediana_ms": round(tempos[len(tempos) // 2], 3),
+        "p95_ms": round(tempos[min(int(len(tempos) * 0.95), len(tempos) - 1)], 3),
+        "maximo_ms": round(tempos[-1], 3),
+    }
+
+def medir_tamanho(nome, parametros, repeticoes):
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, 'loja_ju.db')
+        banco.gerenciador = banco.GerenciadorConexoes(caminho)
+        preparar_banco()
+        inicio = time.perf_counter()
+        with banco.transacao() as conn:
+            linhas = gerar_dados(conn, semente=SEMENTE, **parametros)
+        reconstruir_resumos()
+        geracao = time.perf_counter() - inicio
+        print(f"{nome}: " + ", ".join(f"{n} {tabela}" for tabela, n in linhas.items())
+              + f" gerados em {geracao:.1f} s")
+
+        conn = banco.obter_conexao()
+        caminhos = {}
+        for caminho_leitura, funcao in caminhos_de_leitura(conn):
+            caminhos[caminho_leitura] = medir(funcao, repeticoes)
+            print(f"  {caminho_leitura:<30} mediana {caminhos[caminho_leitura]['mediana_ms']:8.3f} ms  "
+                  f"p95 {caminhos[caminho_leitura]['p95_ms']:8.3f} ms")
+        tamanho_arquivo = os.path.getsize(caminho)
+        banco.fechar_conexoes()
+
+    return {"nome": nome, "parametros": parametros, "linhas": linhas,
+            "tamanho_banco_bytes": tamanho_arquivo, "geracao_s": round(geracao, 2),
+            "caminhos": caminhos}
+
+def comparar(atual, anterior):
+    """Mostra a variação da mediana por tamanho e caminho; retorna quantas pioraram além da tolerância"""
+    anteriores = {tamanho["nome"]: tamanho["caminhos"] for tamanho in anterior["tamanhos"]}
+    piores = 0
+    print(f"Comparação com a execução de {anterior['gerado_em']}:")
+    for tamanho in atual["tamanhos"]:
+        caminhos_anteriores = anteriores.get(tamanho["nome"])
+        if caminhos_anteriores is None:
+            continue
+        for caminho_leitura, estatisticas in tamanho["caminhos"].items():
+            antes = caminhos_anteriores.get(caminho_leitura)
+            if not antes or not antes["mediana_ms"]:
+                continue
+            variacao = estatisticas["mediana_ms"] / antes["mediana_ms"] - 1
+            relevante = abs(estatisticas["mediana_ms"] - antes["mediana_ms"]) > DIFERENCA_MINIMA_MS
+            marca = ""
+            if relevante and variacao > TOLERANCIA_COMPARACAO:
+                marca = "  <- mais lento"
+                piores += 1
+            elif relevante and variacao < -TOLERANCIA_COMPARACAO:
+                marca = "  <- mais rápido"
+            print(f"  {tamanho['nome']:<8} {caminho_leitura:<30} {antes['mediana_ms']:8.3f} -> "
+                  f"{estatisticas['mediana_ms']:8.3f} ms ({variacao:+.0%}){marca}")
+    return piores
+
+def main(argumentos):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.leituras",
+                                     description="Mede as leituras das telas em bancos de vários tamanhos")
+    parser.add_argument("--tamanhos", default="pequeno,medio",
+                        help=f"tamanhos separados por vírgula, entre {', '.join(TAMANHOS)} (padrão: pequeno,medio)")
+    parser.add_argument("--saida", help="arquivo JSON de resultado (padrão: leituras-<data e hora>.json)")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior para comparar")
+    parser.add_argument("--repeticoes", type=int, default=REPETICOES)
+    opcoes = parser.parse_args(argumentos)
+
+    nomes = [nome.strip() for nome in opcoes.tamanhos.split(",") if nome.strip()]
+    desconhecidos = [nome for nome in nomes if nome not in TAMANHOS]
+    if desconhecidos:
+        parser.error(f"tamanho(s) desconhecido(s): {', '.join(desconhecidos)}")
+
+    agora = datetime.now()
+    resultado = {
+        "gerado_em": agora.isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "plataforma": platform.platform(),
+        "semente": SEMENTE,
+        "repeticoes": opcoes.repeticoes,
+        "tamanho_pagina": TAMANHO_PAGINA,
+        "tamanhos": [medir_tamanho(nome, TAMANHOS[nome], opcoes.repeticoes) for nome in nomes],
+    }
+
+    saida = opcoes.saida or f"leituras-{agora:%Y%m%d-%H%M%S}.json"
+    with open(saida, "w", encoding="utf-8") as arquivo:
+        json.dump(resultado, arquivo, ensure_ascii=False, indent=2)
+    print(f"Resultado gravado em {saida}")
+
+    if opcoes.comparar:
+        with open(opcoes.comparar, encoding="utf-8") as arquivo:
+            if comparar(resultado, json.load(arquivo)):
+                return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,151 @@
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import banco
+from esquema import preparar_banco
+from benchmarks.gerador import gerar_dados
+
+
+# Uso: python -m benchmarks.servidor [conexões] [segundos]
+# Sobe servidor.py em outro processo, com um banco temporário, e mantém
+# várias conexões abertas fazendo uma mistura de consultas e gravações como
+# a de um dia de loja. Informa pedidos por segundo e latências por rota, e
+# falha se o p99 de alguma rota passar de ORCAMENTO_P99_MS.
+CONEXOES = 16
+DURACAO = 10.0
+PORTA = 8799
+ORCAMENTO_P99_MS = 100
+
+# Peso de cada rota na mistura de pedidos
+MISTURA = (
+    ("produto", 50),
+    ("busca", 20),
+    ("contas", 15),
+    ("venda", 10),
+    ("pagamento", 5),
+)
+
+BUSCAS = ("blusa", "azul", "vestido preto", "calça g", "ja", "saia rosa m")
+
+def montar_pedido(rota, aleatorio, produtos, clientes, vendas):
+    """Retorna (método, caminho, corpo) de um pedido da rota"""
+    if rota == "produto":
+        return "GET", f"/produtos/{aleatorio.choice(produtos)}", None
+    if rota == "busca":
+        return "GET", f"/produtos?busca={aleatorio.choice(BUSCAS).replace(' ', '+')}", None
+    if rota == "contas":
+        if aleatorio.random() < 0.5:
+            return "GET", f"/contas?cliente={aleatorio.choice(clientes)}", None
+        return "GET", "/contas?limite=100", None
+    if rota == "venda":
+        itens = [{"produto": produto_id, "quantidade": aleatorio.randint(1, 3)}
+                 for produto_id in aleatorio.sample(produtos, aleatorio.randint(1, 5))]
+        return "POST", "/vendas", {"cliente": aleatorio.choice(clientes), "itens": itens}
+    return "POST", "/pagamentos", {"venda": aleatorio.choice(vendas), "valor": 1}
+
+async def cliente(numero, fim, produtos, clientes, vendas, tempos, erros):
+    aleatorio = random.Random(numero)
+    rotas, pesos = zip(*MISTURA)
+    leitor, escritor = await asyncio.open_connection("127.0.0.1", PORTA)
+    try:
+        while time.perf_counter() < fim:
+            rota = aleatorio.choices(rotas, pesos)[0]
+            metodo, caminho, dados = montar_pedido(rota, aleatorio, produtos, clientes, vendas)
+            corpo = json.dumps(dados).encode() if dados is not None else b""
+            pedido = (f"{metodo} {caminho} HTTP/1.1\r\nHost: localhost\r\n"
+                      f"Content-Type: application/json\r\nContent-Length: {len(corpo)}\r\n\r\n")
+
+            inicio = time.perf_counter()
+            escritor.write(pedido.encode() + corpo)
+            await escritor.drain()
+            status = int((await leitor.readline()).split()[1])
+            tamanho = 0
+            while (linha := await leitor.readline()) != b"\r\n":
+                nome, _, valor = linha.decode().partition(":")
+                if nome.lower() == "content-length":
+                    tamanho = int(valor)
+            resposta = await leitor.readexactly(tamanho)
+            tempos[rota].append((time.perf_counter() - inicio) * 1000)
+
+            # 409/422 são respostas de negócio esperadas (estoque, saldo já pago)
+            if status >= 500 or status == 400:
+                erros.append(f"{metodo} {caminho}: {status} {resposta.decode()}")
+    finally:
+        escritor.close()
+
+async def aguardar_servidor(processo, limite=20.0):
+    fim = time.perf_counter() + limite
+    while time.perf_counter() < fim:
+        if processo.poll() is not None:
+            raise RuntimeError("O servidor terminou antes de aceitar conexões")
+        try:
+            _, escritor = await asyncio.open_connection("127.0.0.1", PORTA)
+            escritor.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError("O servidor não aceitou conexões a tempo")
+
+async def carga(processo, conexoes, duracao, produtos, clientes, vendas):
+    await aguardar_servidor(processo)
+    tempos = {rota: [] for rota, _ in MISTURA}
+    erros = []
+    inicio = time.perf_counter()
+    await asyncio.gather(*(cliente(numero, inicio + duracao, produtos, clientes, vendas, tempos, erros)
+                           for numero in range(conexoes)))
+    return tempos, erros, time.perf_counter() - inicio
+
+def percentil(tempos, fracao):
+    return tempos[min(int(len(tempos) * fracao), len(tempos) - 1)]
+
+def main(argumentos):
+    conexoes = int(argumentos[0]) if argumentos else CONEXOES
+    duracao = float(argumentos[1]) if len(argumentos) > 1 else DURACAO
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, 'loja_ju.db')
+        banco.gerenciador = banco.GerenciadorConexoes(caminho)
+        preparar_banco()
+        with banco.transacao() as conn:
+            gerar_dados(conn, dias=90)
+            produtos = [linha[0] for linha in conn.execute("SELECT id FROM produtos")]
+            clientes = [str(linha[0]) for linha in conn.execute("SELECT codigo_cliente FROM clientes")]
+            vendas = [linha[0] for linha in conn.execute("SELECT id FROM vendas WHERE saldo > 0")]
+        banco.fechar_conexoes()
+
+        raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        processo = subprocess.Popen([sys.executable, os.path.join(raiz, "servidor.py"), str(PORTA)],
+                                    env={**os.environ, "LOJA_BANCO": caminho}, cwd=raiz)
+        try:
+            tempos, erros, decorrido = asyncio.run(
+                carga(processo, conexoes, duracao, produtos, clientes, vendas))
+        finally:
+            processo.terminate()
+            processo.wait()
+
+    total = sum(len(t) for t in tempos.values())
+    print(f"{conexoes} conexões em {decorrido:.1f} s: {total} pedidos ({total / decorrido:.0f} pedidos/s)")
+    acima = []
+    for rota, lista in tempos.items():
+        if not lista:
+            continue
+        lista.sort()
+        p99 = percentil(lista, 0.99)
+        print(f"  {rota:<10} {len(lista):7d} pedidos  mediana {percentil(lista, 0.5):6.2f} ms  "
+              f"p99 {p99:6.2f} ms")
+        if p99 > ORCAMENTO_P99_MS:
+            acima.append(rota)
+
+    for erro in erros[:10]:
+        print(f"[FALHA] {erro}")
+    if acima:
+        print(f"[FALHA] p99 acima de {ORCAMENTO_P99_MS} ms em: {', '.join(acima)}")
+    return 1 if erros or acima else 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,73 @@
+import os
+import sys
+import tempfile
+import time
+import banco
+from esquema import preparar_banco
+from consultas import SQL_OPCOES_CLIENTES
+from catalogo import Catalogo
+from sugestoes import ORCAMENTO_MS, IndiceSugestoes
+from benchmarks.gerador import gerar_dados
+
+
+# Uso: python -m benchmarks.sugestoes
+# Monta os índices de sugestões de clientes e produtos sobre um banco
+# temporário grande e simula a digitação de algumas consultas letra a letra,
+# conferindo se cada busca fica dentro de sugestoes.ORCAMENTO_MS.
+CLIENTES = 20_000
+PRODUTOS = 20_000
+DIGITACOES = {
+    "clientes": ["mariana silva", "julia", "9123", "(11) 95", "arauj", "ana costa 1"],
+    "produtos": ["blusa azul m", "calca", "vestido preto gg", "jaq", "rosa p", "macacao"],
+}
+
+def medir_digitacao(indice, texto):
+    """Busca cada prefixo de `texto`, como se digitado letra a letra"""
+    tempos = []
+    for fim in range(1, len(texto) + 1):
+        inicio = time.perf_counter()
+        indice.buscar(texto[:fim])
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return tempos
+
+def main():
+    with tempfile.TemporaryDirectory() as pasta:
+        banco.gerenciador = banco.GerenciadorConexoes(os.path.join(pasta, 'loja_ju.db'))
+        preparar_banco()
+        with banco.transacao() as conn:
+            gerar_dados(conn, clientes=CLIENTES, produtos=PRODUTOS, dias=1, vendas_por_dia=1)
+
+        cursor = banco.obter_conexao().cursor()
+        cursor.execute(SQL_OPCOES_CLIENTES)
+        opcoes = {
+            "clientes": [(f"{codigo} - {nome}", (nome, telefone, codigo))
+                         for codigo, nome, telefone in cursor.fetchall()],
+            "produtos": [(f"{p.id} - {p.descricao}", (p.tipo, p.cor, p.tamanho, p.id))
+                         for p in Catalogo().listar()],
+        }
+        banco.fechar_conexoes()
+
+    estourou = False
+    for nome, lista in opcoes.items():
+        inicio = time.perf_counter()
+        indice = IndiceSugestoes(lista)
+        print(f"Índice de {nome}: {len(lista)} opções montadas em "
+              f"{(time.perf_counter() - inicio) * 1000:.0f} ms")
+
+        tempos = []
+        for texto in DIGITACOES[nome]:
+            tempos.extend(medir_digitacao(indice, texto))
+        tempos.sort()
+        mediana = tempos[len(tempos) // 2]
+        pior = tempos[-1]
+        print(f"  por tecla: mediana {mediana:.2f} ms, pior {pior:.2f} ms em {len(tempos)} buscas "
+              f"(orçamento: {ORCAMENTO_MS} ms)")
+        estourou = estourou or pior > ORCAMENTO_MS
+
+    if estourou:
+        print("Orçamento de latência estourado!")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
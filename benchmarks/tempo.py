@@ -0,0 +1,60 @@
+import random
+import sys
+import time
+from datetime import datetime
+from tempo import FUSO_HORARIO, formatar_data_hora, para_datetime
+
+
+# Uso: python -m benchmarks.tempo
+# Compara a formatação por linha (conversor + strftime, como era feito com
+# pytz) com a formatação em lote de tempo.py sobre 100 mil instantes
+# espalhados entre 2015 e 2026, período que inclui horários de verão.
+QUANTIDADE = 100_000
+FORMATO = "%d/%m/%Y %H:%M"
+
+def gerar_instantes(quantidade=QUANTIDADE, semente=42):
+    aleatorio = random.Random(semente)
+    inicio = int(datetime(2015, 1, 1, tzinfo=FUSO_HORARIO).timestamp())
+    fim = int(datetime(2026, 12, 31, tzinfo=FUSO_HORARIO).timestamp())
+    return [aleatorio.randint(inicio, fim) for _ in range(quantidade)]
+
+def medir(nome, funcao, instantes):
+    inicio = time.perf_counter()
+    textos = funcao(instantes)
+    duracao = time.perf_counter() - inicio
+    print(f"{nome:<28} {duracao * 1000:8.1f} ms  ({duracao / len(instantes) * 1e9:6.0f} ns/linha)")
+    return textos, duracao
+
+def por_linha_zoneinfo(instantes):
+    return [para_datetime(epoch).strftime(FORMATO) for epoch in instantes]
+
+def main():
+    instantes = gerar_instantes()
+    print(f"{len(instantes)} instantes")
+
+    try:
+        import pytz
+    except ImportError:
+        pytz = None
+        print("pytz não instalado: comparação com o caminho antigo ignorada")
+
+    resultados = []
+    if pytz:
+        fuso_pytz = pytz.timezone('America/Sao_Paulo')
+        resultados.append(medir("por linha (pytz)", lambda lista: [
+            datetime.fromtimestamp(epoch, fuso_pytz).strftime(FORMATO) for epoch in lista
+        ], instantes))
+    resultados.append(medir("por linha (zoneinfo)", por_linha_zoneinfo, instantes))
+    resultados.append(medir("em lote (cache frio)", formatar_data_hora, instantes))
+    lote, duracao_lote = medir("em lote (cache quente)", formatar_data_hora, instantes)
+
+    referencia, duracao_referencia = resultados[0]
+    if any(textos != lote for textos, _ in resultados):
+        print("Os resultados divergem!")
+        return 1
+    print(f"Resultados idênticos; em lote é {duracao_referencia / duracao_lote:.1f}x mais rápido "
+          f"que o caminho por linha")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
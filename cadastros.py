@@ -0,0 +1,136 @@
+from datetime import datetime
+from banco import FUSO_HORARIO, obter_conexao, transacao, repetir_se_ocupado
+from consultas import (SQL_BUSCAR_CLIENTES, SQL_BUSCAR_PRODUTOS, SQL_VENDAS_DO_CLIENTE, SQL_PRECO_VENDA,
+                       SQL_PRODUTOS_EM_PROMOCAO, SQL_PRODUTO_EM_PROMOCAO, parametros_busca)
+from catalogo import catalogo
+
+
+# Leituras e gravações das telas de clientes, produtos e promoções. Todas
+# rodam na thread do banco (ver tarefas.py); a tela só recebe o resultado.
+# As listagens completas de clientes e produtos são paginadas (ver
+# consultas.montar_consulta_clientes); aqui ficam só as buscas, já limitadas.
+SQL_INSERIR_CLIENTE = """
+    INSERT INTO clientes (nome, telefone, data_cadastro)
+    VALUES (?, ?, ?)
+"""
+
+SQL_INSERIR_PRODUTO = """
+    INSERT INTO produtos (tipo, cor, tamanho, preco_custo, preco_venda, quantidade)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+SQL_ALTERAR_PRODUTO = """
+    UPDATE produtos
+    SET tipo = ?, cor = ?, tamanho = ?, preco_custo = ?, preco_venda = ?, quantidade = ?
+    WHERE id = ?
+"""
+
+SQL_COLOCAR_EM_PROMOCAO = """
+    UPDATE produtos
+    SET promocao = 1, preco_promocional = ?
+    WHERE id = ?
+"""
+
+SQL_RETIRAR_DA_PROMOCAO = """
+    UPDATE produtos
+    SET promocao = 0, preco_promocional = NULL
+    WHERE id = ?
+"""
+
+def pesquisar_clientes(texto):
+    """Retorna até LIMITE_BUSCA clientes que combinam com o texto, dos mais
+    relevantes aos menos. Roda na thread do banco."""
+    parametros = parametros_busca(texto)
+    if parametros is None:
+        return []
+    cursor = obter_conexao().cursor()
+    cursor.execute(SQL_BUSCAR_CLIENTES, parametros)
+    return cursor.fetchall()
+
+def pesquisar_produtos(texto):
+    """Retorna até LIMITE_BUSCA produtos que combinam com o texto, dos mais
+    relevantes aos menos. Roda na thread do banco."""
+    parametros = parametros_busca(texto)
+    if parametros is None:
+        return []
+    cursor = obter_conexao().cursor()
+    cursor.execute(SQL_BUSCAR_PRODUTOS, parametros)
+    return cursor.fetchall()
+
+def listar_promocoes():
+    """Retorna os produtos em promoção. Roda na thread do banco."""
+    cursor = obter_conexao().cursor()
+    cursor.execute(SQL_PRODUTOS_EM_PROMOCAO)
+    return cursor.fetchall()
+
+@repetir_se_ocupado
+def gravar_cliente(nome, telefone):
+    """Cadastra um cliente e retorna o código dele. Roda na thread do banco."""
+    with transacao("IMMEDIATE") as conn:
+        cursor = conn.cursor()
+        cursor.execute(SQL_INSERIR_CLIENTE, (nome, telefone, datetime.now(FUSO_HORARIO)))
+        return cursor.lastrowid
+
+@repetir_se_ocupado
+def apagar_cliente(codigo_cliente):
+    """Exclui o cliente; ValueError se ele tiver vendas, inclusive arquivadas.
+    Roda na thread do banco."""
+    with transacao("IMMEDIATE") as conn:
+        cursor = conn.cursor()
+        cursor.execute(SQL_VENDAS_DO_CLIENTE, (codigo_cliente,))
+        if cursor.fetchone()[0] > 0:
+            raise ValueError("Não é possível excluir um cliente que possui vendas registradas.")
+
+        cursor.execute("DELETE FROM clientes WHERE codigo_cliente = ?", (codigo_cliente,))
+
+@repetir_se_ocupado
+def gravar_produto(tipo, cor, tamanho, preco_custo, preco_venda, quantidade):
+    """Cadastra um produto e retorna o id dele. Roda na thread do banco."""
+    with transacao("IMMEDIATE") as conn:
+        cursor = conn.cursor()
+        cursor.execute(SQL_INSERIR_PRODUTO, (tipo, cor, tamanho, preco_custo, preco_venda, quantidade))
+        produto_id = cursor.lastrowid
+    catalogo.invalidar(produto_id)
+    return produto_id
+
+@repetir_se_ocupado
+def alterar_produto(produto_id, tipo, cor, tamanho, preco_custo, preco_venda, quantidade):
+    """Grava os novos dados do produto. Roda na thread do banco."""
+    with transacao("IMMEDIATE") as conn:
+        conn.execute(SQL_ALTERAR_PRODUTO, (tipo, cor, tamanho, preco_custo, preco_venda, quantidade, produto_id))
+    catalogo.invalidar(produto_id)
+
+@repetir_se_ocupado
+def apagar_produto(produto_id):
+    """Exclui o produto. Roda na thread do banco."""
+    with transacao("IMMEDIATE") as conn:
+        conn.execute("DELETE FROM produtos WHERE id = ?", (produto_id,))
+    catalogo.invalidar(produto_id)
+
+@repetir_se_ocupado
+def colocar_em_promocao(produto_id, preco_promocional):
+    """Põe o produto em promoção pelo preço dado, que deve ser menor que o
+    normal; senão, ValueError. Retorna a linha do produto na listagem de
+    promoções. Roda na thread do banco."""
+    with transacao("IMMEDIATE") as conn:
+        cursor = conn.cursor()
+        cursor.execute(SQL_PRECO_VENDA, (produto_id,))
+        produto = cursor.fetchone()
+        if produto is None:
+            raise ValueError(f"Produto {produto_id} não encontrado.")
+
+        if preco_promocional >= produto[0]:
+            raise ValueError("O preço promocional deve ser menor que o preço normal.")
+
+        cursor.execute(SQL_COLOCAR_EM_PROMOCAO, (preco_promocional, produto_id))
+        cursor.execute(SQL_PRODUTO_EM_PROMOCAO, (produto_id,))
+        linha = cursor.fetchone()
+    catalogo.invalidar(produto_id)
+    return linha
+
+@repetir_se_ocupado
+def retirar_da_promocao(produto_id):
+    """Volta o produto ao preço normal. Roda na thread do banco."""
+    with transacao("IMMEDIATE") as conn:
+        conn.execute(SQL_RETIRAR_DA_PROMOCAO, (produto_id,))
+    catalogo.invalidar(produto_id)
@@ -0,0 +1,91 @@
+from dataclasses import dataclass
+from decimal import Decimal, ROUND_HALF_UP
+
+
+CENTAVO = Decimal('0.01')
+
+def para_decimal(valor):
+    """Converte um preço (float do banco, texto ou número) para Decimal em centavos"""
+    return Decimal(str(valor)).quantize(CENTAVO, rounding=ROUND_HALF_UP)
+
+@dataclass
+class ItemCarrinho:
+    """Um produto da venda em andamento"""
+    produto_id: int
+    descricao: str
+    quantidade: int
+    preco: Decimal
+
+    @property
+    def subtotal(self):
+        return self.preco * self.quantidade
+
+class Carrinho:
+    """Itens da venda em andamento, por id de produto, e o total sempre atualizado.
+
+    Quantidades são inteiros e preços Decimal em centavos; cada alteração
+    soma ao total só a diferença que causou, sem recalcular os outros itens.
+    A tabela da tela apenas exibe o carrinho.
+    """
+
+    def __init__(self):
+        self._itens = {}
+        self.total = Decimal('0.00')
+
+    def __len__(self):
+        return len(self._itens)
+
+    def __contains__(self, produto_id):
+        return int(produto_id) in self._itens
+
+    def __iter__(self):
+        # Na ordem em que os produtos entraram
+        return iter(list(self._itens.values()))
+
+    def obter(self, produto_id):
+        """Retorna o ItemCarrinho do produto, ou None"""
+        return self._itens.get(int(produto_id))
+
+    def quantidade_de(self, produto_id):
+        """Retorna a quantidade do produto já no carrinho (0 se não estiver)"""
+        item = self.obter(produto_id)
+        return item.quantidade if item else 0
+
+    def adicionar(self, produto_id, descricao, quantidade, preco):
+        """Acrescenta a quantidade ao produto, ao preço informado, e retorna o item"""
+        item = self.obter(produto_id)
+        if item is None:
+            return self.alterar(produto_id, quantidade, preco, descricao)
+        return self.alterar(produto_id, item.quantidade + int(quantidade), preco)
+
+    def alterar(self, produto_id, quantidade, preco, descricao=None):
+        """Define a quantidade e o preço do produto e retorna o item"""
+        produto_id = int(produto_id)
+        quantidade = int(quantidade)
+        if quantidade <= 0:
+            raise ValueError("A quantidade deve ser maior que zero")
+        preco = para_decimal(preco)
+
+        item = self._itens.get(produto_id)
+        if item is None:
+            item = self._itens[produto_id] = ItemCarrinho(produto_id, descricao, 0, preco)
+        self.total -= item.subtotal
+        item.quantidade = quantidade
+        item.preco = preco
+        self.total += item.subtotal
+        return item
+
+    def remover(self, produto_id):
+        """Tira o produto do carrinho"""
+        item = self._itens.pop(int(produto_id), None)
+        if item:
+            self.total -= item.subtotal
+
+    def limpar(self):
+        self._itens.clear()
+        self.total = Decimal('0.00')
+
+    def itens_para_gravar(self):
+        """Retorna [(produto_id, quantidade)] para gravar a venda; o preço é relido
+        do banco na gravação (ver vendas.gravar_venda)"""
+        return [(item.produto_id, item.quantidade) for item in self._itens.values()]
@@ -0,0 +1,107 @@
+import threading
+from dataclasses import dataclass
+from banco import obter_conexao
+from consultas import SQL_CATALOGO, SQL_CATALOGO_PRODUTO, SQL_VERSAO_PRODUTOS, SQL_PRODUTOS_ALTERADOS
+
+
+@dataclass(frozen=True)
+class ProdutoCatalogo:
+    """Dados de um produto usados no caixa"""
+    id: int
+    tipo: str
+    cor: str
+    tamanho: str
+    quantidade: int
+    preco: float
+
+    @property
+    def descricao(self):
+        return f"{self.tipo} {self.cor} {self.tamanho}"
+
+class Catalogo:
+    """Estoque e preço efetivo dos produtos, mantidos em memória por id.
+
+    A primeira consulta carrega todos os produtos; depois disso cada leitura
+    só confere PRAGMA data_version, que muda quando outra conexão (outro
+    caixa, o servidor ou outra thread) grava no banco. Nesse caso os produtos
+    alterados desde a última versão vista são lidos de produtos_alteracoes
+    (ver esquema.criar_registro_alteracoes) e relidos. Quem grava em produtos
+    nesta conexão chama `invalidar` com os ids alterados, depois do commit,
+    pois a própria conexão não muda o seu data_version. Como a venda é
+    gravada na thread do banco (ver tarefas.py), o acesso é protegido por
+    um lock.
+    """
+
+    def __init__(self):
+        self._produtos = None
+        self._invalidos = set()
+        self._versao = 0
+        self._lock = threading.Lock()
+        # data_version é por conexão, e cada thread tem a sua
+        self._conexoes = threading.local()
+
+    def _revalidar(self):
+        # Chamado com o lock já adquirido
+        conn = obter_conexao()
+        versao_dados = conn.execute("PRAGMA data_version").fetchone()[0]
+        vista = getattr(self._conexoes, "vista", None)
+        if vista is not None and vista[0] is conn and vista[1] == versao_dados:
+            return
+        self._conexoes.vista = (conn, versao_dados)
+        if self._produtos is None:
+            return
+        for produto_id, versao in conn.execute(SQL_PRODUTOS_ALTERADOS, (self._versao,)).fetchall():
+            self._invalidos.add(produto_id)
+            self._versao = max(self._versao, versao)
+
+    def _atualizar(self):
+        # Chamado com o lock já adquirido
+        self._revalidar()
+        cursor = obter_conexao().cursor()
+        if self._produtos is None:
+            # A versão é lida antes: o que mudar durante a carga é relido depois
+            cursor.execute(SQL_VERSAO_PRODUTOS)
+            self._versao = cursor.fetchone()[0]
+            cursor.execute(SQL_CATALOGO)
+            self._produtos = {linha[0]: ProdutoCatalogo(*linha) for linha in cursor.fetchall()}
+            self._invalidos.clear()
+            return
+
+        if not self._invalidos:
+            return
+        for produto_id in self._invalidos:
+            cursor.execute(SQL_CATALOGO_PRODUTO, (produto_id,))
+            linha = cursor.fetchone()
+            if linha is None:
+                # Produto excluído
+                self._produtos.pop(produto_id, None)
+            else:
+                self._produtos[produto_id] = ProdutoCatalogo(*linha)
+        self._invalidos.clear()
+
+    def obter(self, produto_id):
+        """Retorna o ProdutoCatalogo do id, ou None se ele não existir"""
+        try:
+            produto_id = int(produto_id)
+        except (TypeError, ValueError):
+            return None
+        with self._lock:
+            self._atualizar()
+            return self._produtos.get(produto_id)
+
+    def listar(self):
+        """Retorna todos os produtos em ordem de id"""
+        with self._lock:
+            self._atualizar()
+            return [self._produtos[produto_id] for produto_id in sorted(self._produtos)]
+
+    def invalidar(self, *produto_ids):
+        """Marca os produtos para serem relidos; sem ids, descarta o catálogo inteiro"""
+        with self._lock:
+            if not produto_ids:
+                self._produtos = None
+                self._invalidos.clear()
+            elif self._produtos is not None:
+                self._invalidos.update(int(produto_id) for produto_id in produto_ids)
+
+catalogo = Catalogo()
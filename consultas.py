@@ -0,0 +1,430 @@
+import re
+from datetime import date, datetime, time, timedelta
+
+
+# Listagens completas: nestas a varredura da tabela inteira é esperada
+SQL_TABELA_CLIENTES = """
+    SELECT codigo_cliente, nome, COALESCE(telefone, '-') as telefone
+    FROM clientes
+    ORDER BY codigo_cliente
+"""
+
+SQL_LISTAR_CLIENTES = "SELECT codigo_cliente, nome, telefone FROM clientes"
+
+SQL_LISTAR_PRODUTOS = "SELECT id, tipo, cor, tamanho, preco_custo, preco_venda, quantidade FROM produtos"
+
+SQL_OPCOES_CLIENTES = "SELECT codigo_cliente, nome, telefone FROM clientes ORDER BY codigo_cliente"
+
+SQL_TOTAL_CLIENTES = "SELECT COUNT(*) FROM clientes"
+
+# Importação com atualização (importacao.py): chaves naturais dos cadastros
+# existentes e, depois de cada lote, só as das linhas recém-incluídas
+SQL_CHAVES_PRODUTOS = "SELECT id, tipo, cor, tamanho FROM produtos"
+
+SQL_CHAVES_PRODUTOS_NOVOS = SQL_CHAVES_PRODUTOS + " WHERE id > ?"
+
+SQL_ULTIMO_PRODUTO = "SELECT COALESCE(MAX(id), 0) FROM produtos"
+
+SQL_CHAVES_CLIENTES = "SELECT codigo_cliente, nome, telefone FROM clientes"
+
+SQL_CHAVES_CLIENTES_NOVOS = SQL_CHAVES_CLIENTES + " WHERE codigo_cliente > ?"
+
+SQL_ULTIMO_CLIENTE = "SELECT COALESCE(MAX(codigo_cliente), 0) FROM clientes"
+
+# Consultas pontuais, que devem sempre usar chave primária ou índice
+# Inclui as vendas arquivadas: o cliente continua referenciado por elas
+SQL_VENDAS_DO_CLIENTE = "SELECT COUNT(*) FROM todas_vendas WHERE cliente_id = ?"
+
+SQL_ESTOQUE_E_PRECO = "SELECT quantidade, preco_venda FROM produtos WHERE id = ?"
+
+SQL_PRECO_VENDA = "SELECT preco_venda FROM produtos WHERE id = ?"
+
+SQL_SALDO_VENDA = "SELECT cliente_id, saldo FROM vendas WHERE id = ?"
+
+SQL_NOME_CLIENTE = "SELECT nome FROM clientes WHERE codigo_cliente = ?"
+
+# Catálogo em memória (catalogo.py): o preço efetivo já sai resolvido do banco
+SQL_CATALOGO = """
+    SELECT id, tipo, cor, tamanho, quantidade,
+           CASE WHEN promocao = 1 AND preco_promocional IS NOT NULL
+                THEN preco_promocional ELSE preco_venda END AS preco_efetivo
+    FROM produtos
+"""
+
+SQL_CATALOGO_PRODUTO = SQL_CATALOGO + " WHERE id = ?"
+
+# Registro de alterações de produtos, mantido por gatilhos (ver
+# esquema.criar_registro_alteracoes): a versão atual e os produtos alterados
+# depois de uma versão, para o catálogo ver o que outros processos gravaram
+SQL_VERSAO_PRODUTOS = "SELECT COALESCE(MAX(versao), 0) FROM produtos_alteracoes"
+
+SQL_PRODUTOS_ALTERADOS = "SELECT produto_id, versao FROM produtos_alteracoes WHERE versao > ?"
+
+# Preço efetivo dos produtos da venda, lido dentro da transação que a grava
+SQL_PRECOS_EFETIVOS = """
+    SELECT id,
+           CASE WHEN promocao = 1 AND preco_promocional IS NOT NULL
+                THEN preco_promocional ELSE preco_venda END AS preco_efetivo
+    FROM produtos
+    WHERE id IN (SELECT value FROM json_each(?))
+"""
+
+# Lido do índice parcial de vendas em aberto, sem tocar em pagamentos
+SQL_TOTAL_A_RECEBER = "SELECT COALESCE(SUM(saldo), 0) FROM vendas WHERE saldo > 0"
+
+# Arquivamento (arquivamento.py): o próximo lote de vendas quitadas antigas,
+# pelo índice da data
+SQL_VENDAS_ARQUIVAVEIS = """
+    SELECT id FROM vendas
+    WHERE data_venda < ? AND saldo <= 0
+    ORDER BY data_venda
+    LIMIT ?
+"""
+
+# Dashboard: lido de resumo_diario, no máximo ~90 linhas qualquer que seja o
+# tamanho do histórico. O mês atual e os últimos 90 dias saem da mesma
+# passada com agregação condicional.
+SQL_DASHBOARD_RESUMO = """
+    SELECT
+        COALESCE(SUM(CASE WHEN dia >= :mes THEN faturamento END), 0),
+        COALESCE(SUM(CASE WHEN dia >= :trimestre THEN faturamento END), 0),
+        COALESCE(SUM(CASE WHEN dia >= :mes THEN recebido END), 0),
+        COALESCE(SUM(CASE WHEN dia >= :trimestre THEN recebido END), 0),
+        COALESCE(SUM(CASE WHEN dia >= :mes THEN lucro END), 0),
+        COALESCE(SUM(CASE WHEN dia >= :trimestre THEN lucro END), 0)
+    FROM resumo_diario
+    WHERE dia >= :inicio
+"""
+
+SQL_PRODUTOS_EM_PROMOCAO = """
+    SELECT id, tipo, cor, tamanho, preco_venda, preco_promocional
+    FROM produtos
+    WHERE promocao = 1
+    ORDER BY tipo, cor, tamanho
+"""
+
+SQL_PRODUTO_EM_PROMOCAO = """
+    SELECT id, tipo, cor, tamanho, preco_venda, preco_promocional
+    FROM produtos
+    WHERE id = ? AND promocao = 1
+"""
+
+# Busca textual (tabelas FTS5 criadas em esquema.py), das linhas mais
+# relevantes para as menos. A relevância (bm25) custa uma conta por linha
+# encontrada, então só as CANDIDATOS_BUSCA mais recentes são ordenadas: uma
+# palavra curta como "ve" encontra metade do catálogo e, sem o limite, a
+# busca levaria dezenas de milissegundos com 100 mil produtos.
+LIMITE_BUSCA = 200
+CANDIDATOS_BUSCA = 2000
+
+SQL_BUSCAR_CLIENTES = """
+    SELECT c.codigo_cliente, c.nome, COALESCE(c.telefone, '-') AS telefone
+    FROM (SELECT rowid, rank FROM clientes_busca
+          WHERE clientes_busca MATCH ?
+          ORDER BY rowid DESC
+          LIMIT ?) b
+    JOIN clientes c ON c.codigo_cliente = b.rowid
+    ORDER BY b.rank
+    LIMIT ?
+"""
+
+SQL_BUSCAR_PRODUTOS = """
+    SELECT p.id, p.tipo, p.cor, p.tamanho, p.preco_custo, p.preco_venda, p.quantidade
+    FROM (SELECT rowid, rank FROM produtos_busca
+          WHERE produtos_busca MATCH ?
+          ORDER BY rowid DESC
+          LIMIT ?) b
+    JOIN produtos p ON p.id = b.rowid
+    ORDER BY b.rank
+    LIMIT ?
+"""
+
+def parametros_busca(texto):
+    """Retorna os parâmetros de SQL_BUSCAR_*, ou None se não houver o que buscar"""
+    expressao = expressao_busca(texto)
+    if expressao is None:
+        return None
+    return (expressao, CANDIDATOS_BUSCA, LIMITE_BUSCA)
+
+def expressao_busca(texto):
+    """Converte o texto digitado numa expressão MATCH do FTS5.
+
+    Cada palavra vira um prefixo entre aspas e todas precisam aparecer, em
+    qualquer coluna. Retorna None se não houver palavra a buscar.
+    """
+    termos = re.findall(r'\w+', texto)
+    return " ".join(f'"{termo}"*' for termo in termos) or None
+
+def continuar_apos(query, params, coluna_data, coluna_id, apos=None, antes=None):
+    """Acrescenta a continuação por chave (data, id); retorna (sql, parâmetros, direção da ordem).
+
+    A data não pode ser nula: a comparação com ela nunca é verdadeira e a
+    linha sumiria das páginas (ver esquema.preencher_datas_nulas).
+    """
+    direcao = "DESC"
+    if apos:
+        query += f" AND ({coluna_data}, {coluna_id}) < (?, ?)"
+        params.extend(apos)
+    elif antes:
+        query += f" AND ({coluna_data}, {coluna_id}) > (?, ?)"
+        params.extend(antes)
+        direcao = "ASC"
+    return query, params, direcao
+
+def paginar_consulta(query, params, coluna_data, coluna_id, apos=None, antes=None, limite=None):
+    """Acrescenta a continuação por chave (data, id), a ordenação e o LIMIT.
+
+    Sem `antes`, as linhas vêm da mais recente para a mais antiga, a partir
+    da chave `apos` quando informada. Com `antes`, vêm as linhas logo acima
+    dessa chave, em ordem crescente. A comparação por valor de linha usa o
+    índice da data e dispensa OFFSET, então toda página custa o mesmo.
+    """
+    query, params, direcao = continuar_apos(query, params, coluna_data, coluna_id, apos, antes)
+    query += f" ORDER BY {coluna_data} {direcao}, {coluna_id} {direcao}"
+    if limite:
+        query += " LIMIT ?"
+        params.append(limite)
+    return query, params
+
+def paginar_historico_completo(montar, colunas, coluna_data, coluna_id, apos=None, antes=None, limite=None):
+    """Como paginar_consulta, mas com a consulta repetida no banco principal
+    e no de arquivo (ver banco.TABELAS_ARQUIVADAS).
+
+    `montar(esquema, data)` retorna (sql, parâmetros) com as tabelas
+    arquivadas prefixadas por `esquema` e `data` como última coluna; a data
+    e o id devem sair com o nome da própria coluna (ou com ele como apelido),
+    que é como a união é ordenada. Cada parte lê a data sem conversão, na
+    ordem do próprio índice, e o SQLite intercala as duas (MERGE) sem
+    ordenar de novo; a consulta de fora converte a data e retorna `colunas`.
+    """
+    partes, params = [], []
+    for esquema in ("main", "arquivo"):
+        query, parametros = montar(esquema, coluna_data)
+        query, parametros, direcao = continuar_apos(query, parametros, coluna_data, coluna_id, apos, antes)
+        partes.append(query)
+        params.extend(parametros)
+
+    # Na união, a ordem é dada pelos nomes das colunas do resultado
+    data, id_ = coluna_data.split(".")[-1], coluna_id.split(".")[-1]
+    query = " UNION ALL ".join(partes) + f" ORDER BY {data} {direcao}, {id_} {direcao}"
+    if limite:
+        query += " LIMIT ?"
+        params.append(limite)
+    return f"SELECT {colunas} FROM ({query})", params
+
+# Nas consultas paginadas a última coluna é a data em segundos UTC, sem
+# conversão: é formatada de uma vez para a página inteira (tempo.py) e,
+# junto com o id, serve de chave da página seguinte (ver paginacao.py)
+def filtrar_periodo(query, params, coluna_data, data_inicial=None, data_final=None):
+    """Acrescenta o intervalo [meia-noite de data_inicial, meia-noite do dia
+    seguinte a data_final) no fuso da loja, comparado direto com a coluna
+    para que o índice possa ser usado"""
+    if data_inicial:
+        query += f" AND {coluna_data} >= ?"
+        params.append(datetime.combine(data_inicial, time.min))
+
+    if data_final:
+        query += f" AND {coluna_data} < ?"
+        params.append(datetime.combine(data_final + timedelta(days=1), time.min))
+    return query, params
+
+def montar_consulta_historico_vendas(codigo_cliente=None, data_inicial=None, data_final=None,
+                                     apos=None, antes=None, limite=None, completo=False):
+    """Retorna (sql, parâmetros) do histórico de vendas; com `completo`,
+    também das vendas arquivadas"""
+    def montar(esquema, data):
+        query = f"""
+            SELECT v.id, c.nome, v.valor_total, {data}
+            FROM {esquema}.vendas v
+            JOIN clientes c ON v.cliente_id = c.codigo_cliente
+            WHERE 1=1
+        """
+        params = []
+
+        if codigo_cliente:
+            query += " AND v.cliente_id = ?"
+            params.append(str(codigo_cliente))
+
+        return filtrar_periodo(query, params, "v.data_venda", data_inicial, data_final)
+
+    if completo:
+        return paginar_historico_completo(montar, "id, nome, valor_total, CAST(data_venda AS INTEGER) AS data_venda",
+                                          "v.data_venda", "v.id", apos, antes, limite)
+    query, params = montar("main", "CAST(v.data_venda AS INTEGER) AS data_venda")
+    return paginar_consulta(query, params, "v.data_venda", "v.id", apos, antes, limite)
+
+def montar_consulta_itens_vendas(codigo_cliente=None, data_inicial=None, data_final=None,
+                                 apos=None, antes=None, limite=None, completo=False):
+    """Retorna (sql, parâmetros) dos itens vendidos, venda a venda.
+
+    Produtos excluídos depois da venda aparecem sem descrição. Com
+    `completo`, inclui as vendas arquivadas.
+    """
+    def montar(esquema, data):
+        query = f"""
+            SELECT v.id AS id, c.nome, iv.produto_id, p.tipo, p.cor, p.tamanho,
+                   iv.quantidade, iv.valor_unitario, {data}
+            FROM {esquema}.vendas v
+            JOIN clientes c ON v.cliente_id = c.codigo_cliente
+            JOIN {esquema}.itens_venda iv ON iv.venda_id = v.id
+            LEFT JOIN produtos p ON p.id = iv.produto_id
+            WHERE 1=1
+        """
+        params = []
+
+        if codigo_cliente:
+            query += " AND v.cliente_id = ?"
+            params.append(str(codigo_cliente))
+
+        return filtrar_periodo(query, params, "v.data_venda", data_inicial, data_final)
+
+    if completo:
+        return paginar_historico_completo(
+            montar, "id, nome, produto_id, tipo, cor, tamanho, quantidade, valor_unitario, "
+                    "CAST(data_venda AS INTEGER) AS data_venda",
+            "v.data_venda", "v.id", apos, antes, limite)
+    query, params = montar("main", "CAST(v.data_venda AS INTEGER) AS data_venda")
+    return paginar_consulta(query, params, "v.data_venda", "v.id", apos, antes, limite)
+
+def montar_consulta_contas(codigo_cliente=None, apos=None, antes=None, limite=None):
+    """Retorna (sql, parâmetros) das vendas com saldo em aberto"""
+    query = """
+        SELECT v.id, c.nome, v.valor_total, v.valor_pago, v.saldo,
+               CAST(v.data_venda AS INTEGER) AS data_venda
+        FROM vendas v
+        JOIN clientes c ON v.cliente_id = c.codigo_cliente
+        WHERE v.saldo > 0
+    """
+    params = []
+
+    # cliente_id é TEXT em vendas; filtrar pela própria coluna permite usar o índice
+    if codigo_cliente:
+        query += " AND v.cliente_id = ?"
+        params.append(str(codigo_cliente))
+
+    return paginar_consulta(query, params, "v.data_venda", "v.id", apos, antes, limite)
+
+def montar_consulta_historico(codigo_cliente=None, data_inicial=None, data_final=None,
+                              apos=None, antes=None, limite=None, completo=False):
+    """Retorna (sql, parâmetros) do histórico de pagamentos; as datas são
+    filtradas como em filtrar_periodo. Com `completo`, inclui os arquivados."""
+    def montar(esquema, data):
+        query = f"""
+            SELECT
+                p.id,
+                c.nome,
+                p.venda_id,
+                p.valor_pago,
+                {data}
+            FROM {esquema}.pagamentos p
+            JOIN clientes c ON p.cliente_id = c.codigo_cliente
+            WHERE 1=1
+        """
+        params = []
+
+        if codigo_cliente:
+            query += " AND c.codigo_cliente = ?"
+            params.append(codigo_cliente)
+
+        return filtrar_periodo(query, params, "p.data_pagamento", data_inicial, data_final)
+
+    if completo:
+        return paginar_historico_completo(
+            montar, "id, nome, venda_id, valor_pago, CAST(data_pagamento AS INTEGER) AS data_pagamento",
+            "p.data_pagamento", "p.id", apos, antes, limite)
+    query, params = montar("main", "CAST(p.data_pagamento AS INTEGER) AS data_pagamento")
+    return paginar_consulta(query, params, "p.data_pagamento", "p.id", apos, antes, limite)
+
+def montar_consulta_clientes(apos=None, antes=None, limite=None):
+    """Retorna (sql, parâmetros) da listagem de clientes, dos mais novos aos
+    mais antigos. A chave da página é o código, repetido como última coluna
+    no lugar da data."""
+    query = """
+        SELECT c.codigo_cliente, c.nome, COALESCE(c.telefone, '-') AS telefone,
+               c.codigo_cliente AS ordem
+        FROM clientes c
+        WHERE 1=1
+    """
+    return paginar_consulta(query, [], "c.codigo_cliente", "c.codigo_cliente", apos, antes, limite)
+
+def montar_consulta_produtos(apos=None, antes=None, limite=None):
+    """Retorna (sql, parâmetros) da listagem de produtos, dos mais novos aos
+    mais antigos, com o id como chave (ver montar_consulta_clientes)"""
+    query = """
+        SELECT p.id, p.tipo, p.cor, p.tamanho, p.preco_custo, p.preco_venda, p.quantidade,
+               p.id AS ordem
+        FROM produtos p
+        WHERE 1=1
+    """
+    return paginar_consulta(query, [], "p.id", "p.id", apos, antes, limite)
+
+def consultas_verificadas():
+    """Lista as consultas conferidas por verificar_planos.py.
+
+    Cada item é (nome, sql, parâmetros de exemplo, nomes que podem aparecer
+    em SCAN no plano). Os nomes são os apelidos usados na consulta, quando
+    houver, pois é assim que o SQLite os mostra.
+    """
+    hoje = date.today()
+    inicio_mes = hoje.replace(day=1)
+    chave = (int(datetime.now().timestamp()), 1)
+    periodos = {"mes": inicio_mes.isoformat(),
+                "trimestre": (hoje - timedelta(days=90)).isoformat(),
+                "inicio": (hoje - timedelta(days=90)).isoformat()}
+    return [
+        ("tabela_clientes", SQL_TABELA_CLIENTES, (), {"clientes"}),
+        ("listar_clientes", SQL_LISTAR_CLIENTES, (), {"clientes"}),
+        ("listar_produtos", SQL_LISTAR_PRODUTOS, (), {"produtos"}),
+        ("opcoes_clientes", SQL_OPCOES_CLIENTES, (), {"clientes"}),
+        ("total_clientes", SQL_TOTAL_CLIENTES, (), {"clientes"}),
+        ("chaves_produtos", SQL_CHAVES_PRODUTOS, (), {"produtos"}),
+        ("chaves_produtos_novos", SQL_CHAVES_PRODUTOS_NOVOS, (1,), set()),
+        ("ultimo_produto", SQL_ULTIMO_PRODUTO, (), set()),
+        ("chaves_clientes", SQL_CHAVES_CLIENTES, (), {"clientes"}),
+        ("chaves_clientes_novos", SQL_CHAVES_CLIENTES_NOVOS, (1,), set()),
+        ("ultimo_cliente", SQL_ULTIMO_CLIENTE, (), set()),
+        # "todas_vendas" é a visão, lida pelos índices de cliente de cada banco
+        ("vendas_do_cliente", SQL_VENDAS_DO_CLIENTE, ("1",), {"todas_vendas"}),
+        ("estoque_e_preco", SQL_ESTOQUE_E_PRECO, (1,), set()),
+        ("preco_venda", SQL_PRECO_VENDA, (1,), set()),
+        ("saldo_venda", SQL_SALDO_VENDA, (1,), set()),
+        ("nome_cliente", SQL_NOME_CLIENTE, (1,), set()),
+        ("catalogo", SQL_CATALOGO, (), {"produtos"}),
+        ("catalogo_produto", SQL_CATALOGO_PRODUTO, (1,), set()),
+        ("versao_produtos", SQL_VERSAO_PRODUTOS, (), set()),
+        ("produtos_alterados", SQL_PRODUTOS_ALTERADOS, (0,), set()),
+        ("precos_efetivos", SQL_PRECOS_EFETIVOS, ("[1, 2, 3]",), {"json_each"}),
+        ("total_a_receber", SQL_TOTAL_A_RECEBER, (), set()),
+        ("vendas_arquivaveis", SQL_VENDAS_ARQUIVAVEIS, (datetime.now(), 1000), set()),
+        ("dashboard_resumo", SQL_DASHBOARD_RESUMO, periodos, set()),
+        ("produtos_em_promocao", SQL_PRODUTOS_EM_PROMOCAO, (), set()),
+        ("produto_em_promocao", SQL_PRODUTO_EM_PROMOCAO, (1,), set()),
+        # Busca textual: "b" são os candidatos, já limitados na subconsulta
+        ("buscar_clientes", SQL_BUSCAR_CLIENTES, parametros_busca("ana"), {"b"}),
+        ("buscar_produtos", SQL_BUSCAR_PRODUTOS, parametros_busca("blusa azul"), {"b"}),
+        # Primeiras páginas: percorrem o índice na ordem e param no LIMIT
+        ("historico_vendas", *montar_consulta_historico_vendas(limite=100), {"v"}),
+        ("historico_vendas_seguinte", *montar_consulta_historico_vendas(apos=chave, limite=100), set()),
+        ("historico_vendas_anterior", *montar_consulta_historico_vendas(antes=chave, limite=100), set()),
+        # Exportação (exportacao.py): a consulta inteira, sem LIMIT, na ordem do índice,
+        # no banco principal e no de arquivo
+        ("exportar_vendas", *montar_consulta_historico_vendas(completo=True), {"v"}),
+        ("exportar_vendas_periodo", *montar_consulta_historico_vendas(None, inicio_mes, hoje, completo=True), set()),
+        ("exportar_vendas_cliente", *montar_consulta_historico_vendas("1", completo=True), set()),
+        ("exportar_itens", *montar_consulta_itens_vendas(completo=True), {"v"}),
+        ("exportar_itens_periodo", *montar_consulta_itens_vendas("1", inicio_mes, hoje, completo=True), set()),
+        ("exportar_pagamentos_periodo", *montar_consulta_historico(None, inicio_mes, hoje, completo=True), set()),
+        ("contas", *montar_consulta_contas(limite=100), set()),
+        ("contas_seguinte", *montar_consulta_contas(apos=chave, limite=100), set()),
+        ("contas_por_cliente", *montar_consulta_contas("1"), set()),
+        ("historico_pagamentos", *montar_consulta_historico(limite=100), {"p"}),
+        ("historico_pagamentos_seguinte", *montar_consulta_historico(apos=chave, limite=100), set()),
+        # Cadastros paginados pela chave primária
+        ("pagina_clientes", *montar_consulta_clientes(limite=100), {"c"}),
+        ("pagina_clientes_seguinte", *montar_consulta_clientes(apos=(100, 100), limite=100), set()),
+        ("pagina_clientes_anterior", *montar_consulta_clientes(antes=(100, 100), limite=100), set()),
+        ("pagina_produtos", *montar_consulta_produtos(limite=100), {"p"}),
+        ("pagina_produtos_seguinte", *montar_consulta_produtos(apos=(100, 100), limite=100), set()),
+        ("historico_por_periodo", *montar_consulta_historico(None, inicio_mes, hoje), set()),
+        ("historico_cliente_periodo", *montar_consulta_historico("1", inicio_mes, hoje), set()),
+    ]
@@ -0,0 +1,62 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from banco import FUSO_HORARIO, transacao
+from consultas import SQL_TOTAL_CLIENTES, SQL_DASHBOARD_RESUMO
+
+
+# Tempo máximo, em milissegundos, para calcular todos os indicadores com um
+# ano de vendas no banco (conferido por benchmarks/dashboard.py)
+ORCAMENTO_MS = 100
+
+@dataclass(frozen=True)
+class IndicadoresDashboard:
+    """Indicadores exibidos na tela de dashboard"""
+    total_clientes: int
+    vendas_mes: float
+    vendas_trimestre: float
+    recebido_mes: float
+    recebido_trimestre: float
+    lucro_mes: float
+    lucro_trimestre: float
+
+def inicio_periodos(hoje=None):
+    """Retorna o início do mês atual e o início da janela dos últimos 90 dias"""
+    hoje = hoje or datetime.now(FUSO_HORARIO)
+    primeiro_dia_mes = hoje.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    primeiro_dia_tres_meses = (hoje - timedelta(days=90)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return primeiro_dia_mes, primeiro_dia_tres_meses
+
+def calcular_indicadores(hoje=None):
+    """Calcula todos os indicadores do dashboard.
+
+    Os totais vêm de resumo_diario, lido uma única vez a partir do início do
+    período mais antigo; o mês e os 90 dias saem da mesma passada.
+    """
+    primeiro_dia_mes, primeiro_dia_tres_meses = inicio_periodos(hoje)
+    # Os períodos começam à meia-noite, então basta comparar o dia
+    periodos = {
+        'mes': primeiro_dia_mes.date().isoformat(),
+        'trimestre': primeiro_dia_tres_meses.date().isoformat(),
+        'inicio': min(primeiro_dia_mes, primeiro_dia_tres_meses).date().isoformat(),
+    }
+
+    # Uma única transação de leitura garante que os números sejam coerentes
+    with transacao() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute(SQL_TOTAL_CLIENTES)
+        total_clientes = cursor.fetchone()[0]
+
+        cursor.execute(SQL_DASHBOARD_RESUMO, periodos)
+        (vendas_mes, vendas_trimestre, recebido_mes, recebido_trimestre,
+         lucro_mes, lucro_trimestre) = cursor.fetchone()
+
+    return IndicadoresDashboard(
+        total_clientes=total_clientes,
+        vendas_mes=vendas_mes,
+        vendas_trimestre=vendas_trimestre,
+        recebido_mes=recebido_mes,
+        recebido_trimestre=recebido_trimestre,
+        lucro_mes=lucro_mes,
+        lucro_trimestre=lucro_trimestre,
+    )
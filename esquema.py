@@ -0,0 +1,533 @@
+import sqlite3
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from banco import FUSO_HORARIO, obter_conexao, transacao
+from tempo import para_epoch
+from resumos import reconstruir_resumos
+
+
+# Índices secundários usados pelas consultas mais frequentes
+INDICES = (
+    "CREATE INDEX IF NOT EXISTS idx_vendas_data ON vendas (data_venda)",
+    "CREATE INDEX IF NOT EXISTS idx_vendas_cliente ON vendas (cliente_id)",
+    "CREATE INDEX IF NOT EXISTS idx_pagamentos_venda ON pagamentos (venda_id)",
+    "CREATE INDEX IF NOT EXISTS idx_pagamentos_data ON pagamentos (data_pagamento)",
+    # Índice parcial: só os produtos em promoção, já na ordem da listagem
+    """CREATE INDEX IF NOT EXISTS idx_produtos_promocao ON produtos (tipo, cor, tamanho)
+       WHERE promocao = 1""",
+    # Índice parcial: só as vendas com saldo em aberto (Contas a Receber), na
+    # ordem (data, id) da paginação e cobrindo o saldo para o total a receber.
+    # Substitui idx_vendas_em_aberto, que não tinha o id.
+    "DROP INDEX IF EXISTS idx_vendas_em_aberto",
+    """CREATE INDEX IF NOT EXISTS idx_vendas_em_aberto_data ON vendas (data_venda, id, saldo)
+       WHERE saldo > 0""",
+)
+
+# Índice de cobertura dos itens: as somas de lucro e de itens por venda
+# (resumos.py) e a junção da exportação leem só o índice, sem ir à tabela.
+# Criado por adicionar_custo_unitario, porque depende dessa coluna;
+# substitui idx_itens_venda_venda_produto.
+INDICE_ITENS_VENDA = """
+    CREATE INDEX IF NOT EXISTS idx_itens_venda_cobertura
+    ON itens_venda (venda_id, produto_id, quantidade, valor_unitario, custo_unitario)
+"""
+
+# Índices de texto (FTS5) das telas de busca: (tabela de busca, tabela de
+# origem, chave primária, colunas pesquisáveis). São de conteúdo externo, só
+# guardam as palavras e apontam para a linha pelo rowid; os gatilhos de
+# criar_busca_textual os mantêm em dia. O tokenizador ignora maiúsculas e
+# acentos, e os prefixos de 2 e 3 letras ficam pré-indexados.
+TABELAS_BUSCA = (
+    ("clientes_busca", "clientes", "codigo_cliente", ("nome", "telefone")),
+    ("produtos_busca", "produtos", "id", ("tipo", "cor", "tamanho")),
+)
+
+# Colunas de data que guardam segundos UTC (ver banco.adapt_datetime)
+COLUNAS_DATA = (
+    ("clientes", "data_cadastro"),
+    ("vendas", "data_venda"),
+    ("pagamentos", "data_pagamento"),
+)
+
+# Gatilhos que mantêm vendas.valor_pago e vendas.saldo em dia. O total pago
+# é recalculado pelo índice de pagamentos(venda_id) a cada alteração, e o
+# saldo acompanha qualquer mudança em valor_total ou valor_pago.
+GATILHOS = (
+    """CREATE TRIGGER IF NOT EXISTS trg_vendas_inserir AFTER INSERT ON vendas
+       BEGIN
+           UPDATE vendas SET saldo = ROUND(COALESCE(NEW.valor_total, 0) - NEW.valor_pago, 2)
+           WHERE id = NEW.id;
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_vendas_saldo AFTER UPDATE OF valor_total, valor_pago ON vendas
+       BEGIN
+           UPDATE vendas SET saldo = ROUND(COALESCE(NEW.valor_total, 0) - NEW.valor_pago, 2)
+           WHERE id = NEW.id;
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_pagamentos_inserir AFTER INSERT ON pagamentos
+       BEGIN
+           UPDATE vendas SET valor_pago = (
+               SELECT ROUND(COALESCE(SUM(valor_pago), 0), 2) FROM pagamentos WHERE venda_id = NEW.venda_id)
+           WHERE id = NEW.venda_id;
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_pagamentos_atualizar AFTER UPDATE OF valor_pago, venda_id ON pagamentos
+       BEGIN
+           UPDATE vendas SET valor_pago = (
+               SELECT ROUND(COALESCE(SUM(valor_pago), 0), 2) FROM pagamentos WHERE venda_id = OLD.venda_id)
+           WHERE id = OLD.venda_id;
+           UPDATE vendas SET valor_pago = (
+               SELECT ROUND(COALESCE(SUM(valor_pago), 0), 2) FROM pagamentos WHERE venda_id = NEW.venda_id)
+           WHERE id = NEW.venda_id;
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_pagamentos_excluir AFTER DELETE ON pagamentos
+       BEGIN
+           UPDATE vendas SET valor_pago = (
+               SELECT ROUND(COALESCE(SUM(valor_pago), 0), 2) FROM pagamentos WHERE venda_id = OLD.venda_id)
+           WHERE id = OLD.venda_id;
+       END""",
+)
+
+def preparar_banco():
+    """Leva o banco à VERSAO_ESQUEMA, aplicando em ordem só as migrações que faltam.
+
+    Num banco já atualizado é uma única leitura de PRAGMA user_version.
+    Cada migração roda numa transação IMMEDIATE que também grava a nova
+    versão: uma falha não deixa o banco entre duas versões, e um caixa que
+    esperou a trava enquanto outro migrava não repete o trabalho.
+    """
+    if obter_conexao().execute("PRAGMA user_version").fetchone()[0] >= VERSAO_ESQUEMA:
+        return
+    for versao, migracao in MIGRACOES:
+        with transacao("IMMEDIATE") as conn:
+            if conn.execute("PRAGMA user_version").fetchone()[0] >= versao:
+                continue
+            migracao()
+            conn.execute(f"PRAGMA user_version = {versao}")
+
+def criar_banco_dados():
+    with transacao("IMMEDIATE") as conn:
+        cursor = conn.cursor()
+        
+        # Tabela de clientes com código sequencial
+        cursor.execute('''CREATE TABLE IF NOT EXISTS clientes
+                          (codigo_cliente INTEGER PRIMARY KEY AUTOINCREMENT,
+                           nome TEXT NOT NULL,
+                           telefone TEXT,
+                           data_cadastro TIMESTAMP DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)))''')
+    
+        # Tabela de produtos
+        cursor.execute('''CREATE TABLE IF NOT EXISTS produtos
+                          (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                           tipo TEXT NOT NULL,
+                           cor TEXT,
+                           tamanho TEXT,
+                           preco_custo REAL,
+                           preco_venda REAL,
+                           quantidade INTEGER)''')
+    
+        # Tabela de vendas
+        cursor.execute('''CREATE TABLE IF NOT EXISTS vendas
+                          (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                           cliente_id TEXT,
+                           valor_total REAL,
+                           data_venda TIMESTAMP DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
+                           valor_pago REAL NOT NULL DEFAULT 0,
+                           saldo REAL NOT NULL DEFAULT 0,
+                           FOREIGN KEY (cliente_id) REFERENCES clientes (codigo_cliente))''')
+    
+        # Tabela de itens de venda
+        cursor.execute('''CREATE TABLE IF NOT EXISTS itens_venda
+                          (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                           venda_id INTEGER,
+                           produto_id INTEGER,
+                           quantidade INTEGER,
+                           valor_unitario REAL,
+                           custo_unitario REAL,
+                           FOREIGN KEY (venda_id) REFERENCES vendas (id),
+                           FOREIGN KEY (produto_id) REFERENCES produtos (id))''')
+    
+        # Tabela de pagamentos
+        cursor.execute('''CREATE TABLE IF NOT EXISTS pagamentos
+                          (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                           cliente_id TEXT,
+                           venda_id INTEGER,
+                           valor_pago REAL,
+                           data_pagamento DATETIME,
+                           FOREIGN KEY (cliente_id) REFERENCES clientes (codigo_cliente),
+                           FOREIGN KEY (venda_id) REFERENCES vendas (id))''')
+
+        # Totais por dia, mantidos junto com as vendas e pagamentos (ver resumos.py)
+        cursor.execute('''CREATE TABLE IF NOT EXISTS resumo_diario
+                          (dia TEXT PRIMARY KEY,
+                           faturamento REAL NOT NULL DEFAULT 0,
+                           recebido REAL NOT NULL DEFAULT 0,
+                           lucro REAL NOT NULL DEFAULT 0,
+                           itens INTEGER NOT NULL DEFAULT 0,
+                           vendas INTEGER NOT NULL DEFAULT 0)''')
+
+def adicionar_coluna_data_cadastro():
+    """Adiciona a coluna data_cadastro na tabela clientes se ela não existir"""
+    cursor = obter_conexao().cursor()
+    
+    try:
+        # Verificar se a coluna existe
+        cursor.execute("PRAGMA table_info(clientes)")
+        colunas = [info[1] for info in cursor.fetchall()]
+        
+        if 'data_cadastro' not in colunas:
+            cursor.execute("""
+                ALTER TABLE clientes
+                ADD COLUMN data_cadastro TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            """)
+            print("Coluna data_cadastro adicionada com sucesso!")
+    except sqlite3.Error as e:
+        print(f"Erro ao adicionar coluna: {e}")
+
+def adicionar_colunas_promocao():
+    """Adiciona as colunas necessárias para promoções na tabela produtos"""
+    try:
+        with transacao("IMMEDIATE") as conn:
+            cursor = conn.cursor()
+            cursor.execute("PRAGMA table_info(produtos)")
+            colunas = [info[1] for info in cursor.fetchall()]
+            
+            if 'promocao' not in colunas:
+                cursor.execute("""
+                    ALTER TABLE produtos
+                    ADD COLUMN promocao INTEGER DEFAULT 0
+                """)
+            
+            if 'preco_promocional' not in colunas:
+                cursor.execute("""
+                    ALTER TABLE produtos
+                    ADD COLUMN preco_promocional REAL
+                """)
+    except sqlite3.Error:
+        pass
+
+def criar_indices():
+    """Cria os índices secundários que ainda não existirem"""
+    with transacao("IMMEDIATE") as conn:
+        for comando in INDICES:
+            conn.execute(comando)
+
+def adicionar_colunas_saldo():
+    """Adiciona valor_pago e saldo em vendas e preenche as vendas existentes"""
+    with transacao("IMMEDIATE") as conn:
+        cursor = conn.cursor()
+        cursor.execute("PRAGMA table_info(vendas)")
+        colunas = [info[1] for info in cursor.fetchall()]
+
+        if 'saldo' in colunas:
+            return
+
+        cursor.execute("ALTER TABLE vendas ADD COLUMN valor_pago REAL NOT NULL DEFAULT 0")
+        cursor.execute("ALTER TABLE vendas ADD COLUMN saldo REAL NOT NULL DEFAULT 0")
+
+        # Preenchimento único: uma agregação de pagamentos para todas as vendas
+        cursor.execute("""
+            UPDATE vendas
+            SET valor_pago = ROUND(t.total, 2)
+            FROM (SELECT venda_id, SUM(valor_pago) AS total
+                  FROM pagamentos
+                  GROUP BY venda_id) AS t
+            WHERE t.venda_id = vendas.id
+        """)
+        cursor.execute("UPDATE vendas SET saldo = ROUND(COALESCE(valor_total, 0) - valor_pago, 2)")
+        print("Colunas valor_pago e saldo adicionadas com sucesso!")
+
+def criar_gatilhos():
+    """Cria os gatilhos que mantêm as colunas desnormalizadas de vendas"""
+    with transacao("IMMEDIATE") as conn:
+        for comando in GATILHOS:
+            conn.execute(comando)
+
+def _gatilhos_busca(busca, tabela, chave, colunas):
+    """Retorna {nome: CREATE TRIGGER} dos gatilhos que mantêm a tabela de busca"""
+    lista = ", ".join(colunas)
+    novos = ", ".join(f"NEW.{coluna}" for coluna in colunas)
+    antigos = ", ".join(f"OLD.{coluna}" for coluna in colunas)
+    return {
+        f"trg_{busca}_inserir": f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{busca}_inserir AFTER INSERT ON {tabela}
+            BEGIN
+                INSERT INTO {busca} (rowid, {lista}) VALUES (NEW.{chave}, {novos});
+            END
+        """,
+        f"trg_{busca}_excluir": f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{busca}_excluir AFTER DELETE ON {tabela}
+            BEGIN
+                INSERT INTO {busca} ({busca}, rowid, {lista}) VALUES ('delete', OLD.{chave}, {antigos});
+            END
+        """,
+        f"trg_{busca}_atualizar": f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{busca}_atualizar AFTER UPDATE OF {lista} ON {tabela}
+            BEGIN
+                INSERT INTO {busca} ({busca}, rowid, {lista}) VALUES ('delete', OLD.{chave}, {antigos});
+                INSERT INTO {busca} (rowid, {lista}) VALUES (NEW.{chave}, {novos});
+            END
+        """,
+    }
+
+def criar_busca_textual():
+    """Cria os índices FTS5 de clientes e produtos e os gatilhos que os sincronizam"""
+    with transacao("IMMEDIATE") as conn:
+        for busca, tabela, chave, colunas in TABELAS_BUSCA:
+            existe = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                                  (busca,)).fetchone()
+            conn.execute(f"""
+                CREATE VIRTUAL TABLE IF NOT EXISTS {busca} USING fts5(
+                    {", ".join(colunas)}, content='{tabela}', content_rowid='{chave}',
+                    tokenize='unicode61 remove_diacritics 2', prefix='2 3')
+            """)
+            for gatilho in _gatilhos_busca(busca, tabela, chave, colunas).values():
+                conn.execute(gatilho)
+
+            # Tabela de busca nova em banco antigo: indexa as linhas que já existiam
+            if not existe:
+                conn.execute(f"INSERT INTO {busca} ({busca}) VALUES ('rebuild')")
+
+@dataclass(frozen=True)
+class IndexacaoBusca:
+    """Comandos para manter a busca textual de uma tabela sem os gatilhos.
+
+    `indexar_novos` recebe a maior chave anterior às inclusões; `remover`
+    (antes de alterar as linhas) e `indexar` (depois) recebem a lista de
+    chaves em JSON, para tratar o lote inteiro num só comando.
+    """
+    indexar_novos: str
+    remover: str
+    indexar: str
+
+@contextmanager
+def busca_em_lote(conn, tabela):
+    """Suspende os gatilhos de inclusão e alteração da busca textual de `tabela`.
+
+    Numa gravação em lote o gatilho, disparado linha a linha, custa várias
+    vezes a própria inclusão. Dentro do bloco quem grava mantém a busca com
+    os comandos do IndexacaoBusca retornado, em poucos comandos por lote; na
+    saída os gatilhos são recriados. Deve rodar dentro de uma transação
+    IMMEDIATE: as outras conexões nunca veem a tabela sem os gatilhos, e um
+    erro desfaz também a remoção deles.
+    """
+    busca, _, chave, colunas = next(item for item in TABELAS_BUSCA if item[1] == tabela)
+    gatilhos = _gatilhos_busca(busca, tabela, chave, colunas)
+    suspensos = (f"trg_{busca}_inserir", f"trg_{busca}_atualizar")
+    for nome in suspensos:
+        conn.execute(f"DROP TRIGGER IF EXISTS {nome}")
+
+    lista = ", ".join(colunas)
+    yield IndexacaoBusca(
+        indexar_novos=f"INSERT INTO {busca} (rowid, {lista}) SELECT {chave}, {lista} FROM {tabela} WHERE {chave} > ?",
+        remover=f"INSERT INTO {busca} ({busca}, rowid, {lista}) SELECT 'delete', {chave}, {lista} "
+                f"FROM {tabela} WHERE {chave} IN (SELECT value FROM json_each(?))",
+        indexar=f"INSERT INTO {busca} (rowid, {lista}) SELECT {chave}, {lista} "
+                f"FROM {tabela} WHERE {chave} IN (SELECT value FROM json_each(?))",
+    )
+
+    for nome in suspensos:
+        conn.execute(gatilhos[nome])
+
+# Resumos como a migração 9 os calculava quando foi escrita: só o banco
+# principal, e o lucro pelo custo atual do produto. A migração não pode usar
+# resumos.reconstruir_resumos, que lê colunas e visões criadas depois dela
+# (custo_unitario, na migração 10, que refaz os resumos ao final).
+SQL_RESUMOS_VENDAS_V9 = """
+    INSERT INTO resumo_diario (dia, faturamento, lucro, itens, vendas)
+    SELECT dia_local(v.data_venda),
+           ROUND(SUM(COALESCE(v.valor_total, 0)), 2),
+           ROUND(SUM(COALESCE(t.lucro, 0)), 2),
+           SUM(COALESCE(t.itens, 0)),
+           COUNT(*)
+    FROM main.vendas v
+    LEFT JOIN (SELECT iv.venda_id,
+                      SUM((iv.valor_unitario - p.preco_custo) * iv.quantidade) AS lucro,
+                      SUM(iv.quantidade) AS itens
+               FROM main.itens_venda iv
+               LEFT JOIN main.produtos p ON iv.produto_id = p.id
+               GROUP BY iv.venda_id) t ON t.venda_id = v.id
+    GROUP BY 1
+"""
+
+SQL_RESUMOS_RECEBIMENTOS_V9 = """
+    INSERT INTO resumo_diario (dia, recebido)
+    SELECT dia_local(data_pagamento), ROUND(SUM(valor_pago), 2)
+    FROM main.pagamentos
+    WHERE data_pagamento IS NOT NULL
+    GROUP BY 1
+    ON CONFLICT (dia) DO UPDATE SET
+        recebido = excluded.recebido
+"""
+
+def preencher_resumos():
+    """Gera os resumos diários de bancos que já tinham vendas antes da tabela existir"""
+    with transacao("IMMEDIATE") as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT EXISTS (SELECT 1 FROM resumo_diario)")
+        if cursor.fetchone()[0]:
+            return
+        cursor.execute("SELECT EXISTS (SELECT 1 FROM vendas) OR EXISTS (SELECT 1 FROM pagamentos)")
+        if cursor.fetchone()[0]:
+            cursor.execute(SQL_RESUMOS_VENDAS_V9)
+            cursor.execute(SQL_RESUMOS_RECEBIMENTOS_V9)
+            dias = cursor.execute("SELECT COUNT(*) FROM resumo_diario").fetchone()[0]
+            print(f"Resumos diários gerados para {dias} dia(s).")
+
+def adicionar_custo_unitario():
+    """Adiciona custo_unitario em itens_venda, preenche os itens existentes, cria o
+    índice de cobertura e refaz os resumos diários, agora a partir desse custo"""
+    with transacao("IMMEDIATE") as conn:
+        cursor = conn.cursor()
+        cursor.execute("PRAGMA table_info(itens_venda)")
+        colunas = [info[1] for info in cursor.fetchall()]
+
+        if 'custo_unitario' not in colunas:
+            cursor.execute("ALTER TABLE itens_venda ADD COLUMN custo_unitario REAL")
+            # Para os itens já vendidos o custo atual do produto é o único que
+            # se conhece; é o mesmo que o lucro usava até aqui
+            cursor.execute("""
+                UPDATE itens_venda
+                SET custo_unitario = p.preco_custo
+                FROM produtos p
+                WHERE p.id = itens_venda.produto_id
+            """)
+            print(f"Custo unitário preenchido em {cursor.rowcount} item(ns) de venda.")
+
+        cursor.execute("DROP INDEX IF EXISTS idx_itens_venda_venda_produto")
+        cursor.execute(INDICE_ITENS_VENDA)
+
+        # Só agora a coluna que resumos.py usa no lucro existe em todo banco
+        cursor.execute("SELECT EXISTS (SELECT 1 FROM vendas) OR EXISTS (SELECT 1 FROM pagamentos)")
+        if cursor.fetchone()[0]:
+            dias = reconstruir_resumos()
+            print(f"Resumos diários refeitos para {dias} dia(s).")
+
+def texto_para_epoch(texto):
+    """Converte uma data em texto das versões anteriores para segundos UTC.
+
+    Aceita o ISO com fuso gravado pelo antigo adapt_datetime e o formato
+    "AAAA-MM-DD HH:MM:SS.ffffff" sem fuso, que era exibido no fuso da loja.
+    Retorna None para textos que não são datas.
+    """
+    try:
+        dt = datetime.fromisoformat(texto)
+    except ValueError:
+        try:
+            dt = datetime.strptime(texto, "%Y-%m-%d %H:%M:%S.%f")
+        except ValueError:
+            return None
+    return para_epoch(dt)
+
+def converter_datas_para_epoch():
+    """Converte de uma vez as datas ainda gravadas como texto.
+
+    Textos que não são datas ficam nulos e são listados no console; a
+    migração preencher_datas_nulas dá uma data a essas linhas.
+    """
+    total = 0
+    with transacao("IMMEDIATE") as conn:
+        conn.create_function("texto_para_epoch", 1, texto_para_epoch, deterministic=True)
+        for tabela, coluna in COLUNAS_DATA:
+            # Todo número é menor que qualquer texto no SQLite, então ">= ''"
+            # seleciona só os textos e, nas colunas indexadas, pelo índice
+            invalidas = conn.execute(f"""
+                SELECT rowid, CAST({coluna} AS TEXT) FROM {tabela}
+                WHERE {coluna} >= '' AND texto_para_epoch({coluna}) IS NULL
+            """).fetchall()
+            for rowid, texto in invalidas:
+                print(f"Data inválida em {tabela}.{coluna}, linha {rowid}: {texto!r}")
+            cursor = conn.execute(f"""
+                UPDATE {tabela}
+                SET {coluna} = texto_para_epoch({coluna})
+                WHERE {coluna} >= ''
+            """)
+            total += cursor.rowcount
+    if total:
+        print(f"{total} data(s) convertida(s) para segundos UTC.")
+
+# Colunas de data que formam, com o id, a chave das consultas paginadas
+# (consultas.paginar_consulta). A comparação por valor de linha nunca é
+# verdadeira para uma data nula, então essas linhas sumiriam das páginas
+# seguintes à primeira.
+COLUNAS_DATA_PAGINADAS = (
+    ("vendas", "data_venda"),
+    ("pagamentos", "data_pagamento"),
+)
+
+def preencher_datas_nulas():
+    """Dá às vendas e pagamentos sem data a data da linha anterior (pelo id).
+
+    Os ids crescem com o tempo, então a linha anterior com data é a melhor
+    estimativa; sem ela, vale a seguinte. As linhas alteradas são listadas
+    no console e os resumos diários, que não as contavam, são refeitos.
+    """
+    total = 0
+    with transacao("IMMEDIATE") as conn:
+        for tabela, coluna in COLUNAS_DATA_PAGINADAS:
+            ids = [linha[0] for linha in conn.execute(f"SELECT id FROM {tabela} WHERE {coluna} IS NULL")]
+            if not ids:
+                continue
+            conn.execute(f"""
+                UPDATE {tabela}
+                SET {coluna} = COALESCE(
+                    (SELECT t.{coluna} FROM {tabela} t
+                     WHERE t.id < {tabela}.id AND t.{coluna} IS NOT NULL
+                     ORDER BY t.id DESC LIMIT 1),
+                    (SELECT t.{coluna} FROM {tabela} t
+                     WHERE t.id > {tabela}.id AND t.{coluna} IS NOT NULL
+                     ORDER BY t.id LIMIT 1),
+                    ?)
+                WHERE {coluna} IS NULL
+            """, (datetime.now(FUSO_HORARIO),))
+            print(f"{len(ids)} linha(s) de {tabela} sem data receberam a da linha vizinha: ids {ids}")
+            total += len(ids)
+
+    if total:
+        dias = reconstruir_resumos()
+        print(f"Resumos diários refeitos para {dias} dia(s).")
+
+# Registro de alterações de produtos: cada inclusão, alteração ou exclusão
+# grava o id do produto com uma versão maior que todas as anteriores. O
+# catálogo em memória (catalogo.py) relê só os produtos com versão acima da
+# última que viu, inclusive os gravados por outros processos.
+GATILHOS_ALTERACOES_PRODUTOS = tuple(
+    f"""CREATE TRIGGER IF NOT EXISTS trg_produtos_alteracoes_{nome} AFTER {evento} ON produtos
+        BEGIN
+            INSERT OR REPLACE INTO produtos_alteracoes (produto_id, versao)
+            VALUES ({linha}.id, (SELECT COALESCE(MAX(versao), 0) + 1 FROM produtos_alteracoes));
+        END"""
+    for nome, evento, linha in (("inserir", "INSERT", "NEW"),
+                                ("atualizar", "UPDATE", "NEW"),
+                                ("excluir", "DELETE", "OLD"))
+)
+
+def criar_registro_alteracoes():
+    """Cria a tabela produtos_alteracoes e os gatilhos que a mantêm"""
+    with transacao("IMMEDIATE") as conn:
+        conn.execute("""CREATE TABLE IF NOT EXISTS produtos_alteracoes
+                        (produto_id INTEGER PRIMARY KEY,
+                         versao INTEGER NOT NULL)""")
+        conn.execute("""CREATE INDEX IF NOT EXISTS idx_produtos_alteracoes_versao
+                        ON produtos_alteracoes (versao)""")
+        for comando in GATILHOS_ALTERACOES_PRODUTOS:
+            conn.execute(comando)
+
+# Migrações em ordem: (versão, função). O número da última gravada fica em
+# PRAGMA user_version. Bancos anteriores a este controle estão na versão 0
+# e passam por todas, por isso as mais antigas verificam o que já existe
+# antes de alterar. Uma mudança nova de esquema entra no fim da lista.
+MIGRACOES = (
+    (1, criar_banco_dados),
+    (2, adicionar_coluna_data_cadastro),
+    (3, adicionar_colunas_promocao),
+    (4, adicionar_colunas_saldo),
+    (5, converter_datas_para_epoch),
+    (6, criar_gatilhos),
+    (7, criar_busca_textual),
+    (8, criar_indices),
+    (9, preencher_resumos),
+    (10, adicionar_custo_unitario),
+    (11, preencher_datas_nulas),
+    (12, criar_registro_alteracoes),
+)
+VERSAO_ESQUEMA = MIGRACOES[-1][0]
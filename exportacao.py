@@ -0,0 +1,96 @@
+import csv
+import os
+from banco import obter_conexao
+from consultas import (montar_consulta_historico_vendas, montar_consulta_itens_vendas,
+                       montar_consulta_contas, montar_consulta_historico)
+from tempo import formatar_data_hora
+
+
+# Exportação para CSV, no formato que o Excel em português abre direto:
+# separador ";", vírgula decimal e UTF-8 com BOM. As consultas são as
+# mesmas das telas (consultas.py), sem LIMIT, lidas do cursor com fetchmany
+# de LOTE em LOTE linhas e gravadas à medida que chegam: a memória usada não
+# depende do tamanho do histórico (ver benchmarks/exportacao.py). Devem
+# rodar na thread do banco, fora da thread do Tk. Vendas, itens e
+# pagamentos são exportados com o histórico completo, incluindo o que o
+# arquivamento (arquivamento.py) já moveu para o banco de arquivo.
+LOTE = 1000
+
+def _valor(numero):
+    return "" if numero is None else f"{numero:.2f}".replace(".", ",")
+
+def _linhas_vendas(lote, datas):
+    for (venda_id, cliente, valor_total, _), data in zip(lote, datas):
+        yield venda_id, data, cliente, _valor(valor_total)
+
+def _linhas_itens(lote, datas):
+    for (venda_id, cliente, produto_id, tipo, cor, tamanho, quantidade, valor_unitario, _), data \
+            in zip(lote, datas):
+        yield (venda_id, data, cliente, produto_id, tipo or "", cor or "", tamanho or "",
+               quantidade, _valor(valor_unitario), _valor((quantidade or 0) * (valor_unitario or 0)))
+
+def _linhas_contas(lote, datas):
+    for (venda_id, cliente, valor_total, valor_pago, saldo, _), data in zip(lote, datas):
+        yield venda_id, data, cliente, _valor(valor_total), _valor(valor_pago), _valor(saldo)
+
+def _linhas_pagamentos(lote, datas):
+    for (pagamento_id, cliente, venda_id, valor_pago, _), data in zip(lote, datas):
+        yield pagamento_id, data, cliente, venda_id, _valor(valor_pago)
+
+def exportar(caminho, consulta, cabecalho, converter, ao_progredir=None):
+    """Grava o resultado de `consulta` (sql, parâmetros) em CSV e retorna o número de linhas.
+
+    A última coluna da consulta é a data em segundos UTC, formatada lote a
+    lote; `converter(lote, datas)` gera as linhas do CSV. O arquivo é
+    escrito com outro nome e só substitui `caminho` no fim, para que uma
+    falha não deixe um CSV pela metade. `ao_progredir(linhas)` é chamado a
+    cada lote.
+    """
+    sql, params = consulta
+    cursor = obter_conexao().cursor()
+    cursor.execute(sql, params)
+    temporario = caminho + ".parcial"
+    total = 0
+    try:
+        with open(temporario, "w", newline="", encoding="utf-8-sig") as arquivo:
+            escritor = csv.writer(arquivo, delimiter=";")
+            escritor.writerow(cabecalho)
+            while lote := cursor.fetchmany(LOTE):
+                datas = formatar_data_hora([linha[-1] for linha in lote])
+                escritor.writerows(converter(lote, datas))
+                total += len(lote)
+                if ao_progredir:
+                    ao_progredir(total)
+        os.replace(temporario, caminho)
+    except BaseException:
+        cursor.close()
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+    return total
+
+def exportar_vendas(caminho, codigo_cliente=None, data_inicial=None, data_final=None, ao_progredir=None):
+    """Exporta o histórico de vendas, da mais recente para a mais antiga"""
+    return exportar(caminho,
+                    montar_consulta_historico_vendas(codigo_cliente, data_inicial, data_final, completo=True),
+                    ("Venda", "Data", "Cliente", "Total"), _linhas_vendas, ao_progredir)
+
+def exportar_itens(caminho, codigo_cliente=None, data_inicial=None, data_final=None, ao_progredir=None):
+    """Exporta os itens de cada venda, com os mesmos filtros de exportar_vendas"""
+    return exportar(caminho,
+                    montar_consulta_itens_vendas(codigo_cliente, data_inicial, data_final, completo=True),
+                    ("Venda", "Data", "Cliente", "Produto", "Tipo", "Cor", "Tamanho",
+                     "Quantidade", "Valor Unitário", "Subtotal"),
+                    _linhas_itens, ao_progredir)
+
+def exportar_contas(caminho, codigo_cliente=None, ao_progredir=None):
+    """Exporta as contas a receber, com o filtro de cliente de filtrar_contas"""
+    return exportar(caminho, montar_consulta_contas(codigo_cliente),
+                    ("Venda", "Data", "Cliente", "Total Venda", "Valor Pago", "Saldo"),
+                    _linhas_contas, ao_progredir)
+
+def exportar_pagamentos(caminho, codigo_cliente=None, data_inicial=None, data_final=None, ao_progredir=None):
+    """Exporta o histórico de pagamentos, com os filtros de carregar_historico_pagamentos"""
+    return exportar(caminho, montar_consulta_historico(codigo_cliente, data_inicial, data_final, completo=True),
+                    ("Pagamento", "Data", "Cliente", "Venda", "Valor Pago"),
+                    _linhas_pagamentos, ao_progredir)
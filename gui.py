@@ -1,159 +1,87 @@
+import time
+# Marcado antes das outras importações: o resumo da inicialização inclui o tempo delas
+INICIO_PROGRAMA = time.perf_counter()
 import sqlite3
-from datetime import datetime, date, timedelta
-import pytz
-from tkinter import Tk, Canvas, Entry, Button, PhotoImage, ttk, messagebox, Toplevel, Label, Frame, StringVar, END, LEFT, RIGHT, BOTH
-
-
-FUSO_HORARIO = pytz.timezone('America/Sao_Paulo')
-
-# Definir adaptadores personalizados para datetime e date
-def adapt_datetime(dt):
-    """Converte datetime para string ISO com fuso horário"""
-    if dt.tzinfo is None:
-        dt = FUSO_HORARIO.localize(dt)
-    return dt.isoformat()
-
-def adapt_date(d):
-    return d.isoformat()
-
-def convert_datetime(s):
-    """Converte string ISO para datetime com fuso horário"""
-    dt = datetime.fromisoformat(s.decode())
-    if dt.tzinfo is None:
-        dt = FUSO_HORARIO.localize(dt)
-    return dt
-
-def convert_date(s):
-    return date.fromisoformat(s.decode())
-
-def convert_timestamp(val):
-    """Converte timestamp para datetime com fuso horário"""
-    try:
-        # Tenta converter diretamente se estiver em formato ISO
-        dt = datetime.fromisoformat(val.decode())
-        if dt.tzinfo is None:
-            dt = FUSO_HORARIO.localize(dt)
-        return dt
-    except ValueError:
-        try:
-            # Tenta o formato antigo "YYYY-MM-DD HH:MM:SS.mmmmmm"
-            datepart, timepart = val.decode().split(" ")
-            year, month, day = map(int, datepart.split("-"))
-            timepart_full = timepart.split(".")
-            hours, minutes, seconds = map(int, timepart_full[0].split(":"))
-            if len(timepart_full) == 2:
-                microseconds = int(timepart_full[1])
-            else:
-                microseconds = 0
-            dt = datetime(year, month, day, hours, minutes, seconds, microseconds)
-            return FUSO_HORARIO.localize(dt)
-        except (ValueError, IndexError):
-            # Se falhar, tenta interpretar como data simples
-            try:
-                dt = datetime.strptime(val.decode(), "%Y-%m-%d")
-                return FUSO_HORARIO.localize(dt)
-            except ValueError:
-                # Se tudo falhar, retorna a data atual
-                return datetime.now(FUSO_HORARIO)
-
-# Registrar os adaptadores e conversores
-sqlite3.register_adapter(datetime, adapt_datetime)
-sqlite3.register_adapter(date, adapt_date)
-sqlite3.register_converter("datetime", convert_datetime)
-sqlite3.register_converter("date", convert_date)
-sqlite3.register_converter("timestamp", convert_timestamp)
-
-# Função para criar conexão com o banco de dados
-def create_connection():
-    return sqlite3.connect('loja_ju.db', 
-                         detect_types=sqlite3.PARSE_DECLTYPES|sqlite3.PARSE_COLNAMES)
+from datetime import datetime
+from tkinter import Tk, Canvas, Entry, Button, PhotoImage, ttk, messagebox, filedialog, Toplevel, Label, Frame, END, LEFT, RIGHT, BOTH
+from banco import (obter_conexao, resumo_estatisticas, resumo_rastreamento,
+                   fechar_conexoes)
+from esquema import preparar_banco
+from consultas import (SQL_OPCOES_CLIENTES, SQL_TOTAL_A_RECEBER, parametros_busca,
+                       montar_consulta_clientes, montar_consulta_produtos, montar_consulta_historico_vendas, montar_consulta_contas, montar_consulta_historico)
+from dashboard import ORCAMENTO_MS, calcular_indicadores
+from catalogo import catalogo
+from sugestoes import IndiceSugestoes, Autocompletar, resumo_latencias
+from carrinho import Carrinho, para_decimal
+from vendas import gravar_venda, gravar_pagamento, apagar_venda
+from cadastros import (pesquisar_clientes, pesquisar_produtos, listar_promocoes, gravar_cliente, apagar_cliente,
+                       gravar_produto, alterar_produto, apagar_produto, colocar_em_promocao, retirar_da_promocao)
+from importacao import importar_produtos, importar_clientes
+from exportacao import exportar_vendas, exportar_itens, exportar_contas, exportar_pagamentos
+from paginacao import paginar, recarregar, exibir_lista, sincronizar, atualizar_linhas, remover_linhas
+from tempo import formatar_data_hora
+from tarefas import ExecutorBanco
+from telas import GerenciadorTelas
 
 
 global combo_clientes, combo_produtos, entry_quantidade, entry_valor, label_estoque
 global tree_vendas, tree_itens_venda, label_total, tree_produtos, tree_clientes, entry_preco_venda
-itens_venda = []
+# Venda em andamento; tree_itens_venda apenas exibe o carrinho
+carrinho = Carrinho()
+
+# Etapas da inicialização: (nome, segundos desde INICIO_PROGRAMA), mostradas
+# no console depois da primeira pintura da janela
+etapas_inicio = [("importações", time.perf_counter() - INICIO_PROGRAMA)]
+
+def marcar_etapa(nome):
+    etapas_inicio.append((nome, time.perf_counter() - INICIO_PROGRAMA))
+
+def resumo_inicio():
+    """Texto com a duração de cada etapa da inicialização"""
+    anterior = 0.0
+    partes = []
+    for nome, instante in etapas_inicio:
+        partes.append(f"{nome} {(instante - anterior) * 1000:.0f} ms")
+        anterior = instante
+    return f"Inicialização em {anterior * 1000:.0f} ms: " + ", ".join(partes)
+
+# Criar ou atualizar a estrutura do banco no início do programa
+preparar_banco()
+marcar_etapa("banco")
+
+# Imagens de assets/, decodificadas só no primeiro uso. O fundo (o maior
+# arquivo) é desenhado logo depois da primeira pintura da janela.
+imagens = {}
+
+def imagem(nome):
+    """Retorna o PhotoImage de assets/<nome>.png, carregando-o uma única vez"""
+    foto = imagens.get(nome)
+    if foto is None:
+        foto = imagens[nome] = PhotoImage(file=f"assets/{nome}.png")
+    return foto
+
+def formatar_cadastros(linhas):
+    # A última coluna das listagens paginadas repete o id, como chave da página
+    return [linha[:-1] for linha in linhas]
 
-def criar_banco_dados():
-    conn = create_connection()
-    cursor = conn.cursor()
-    
-    # Tabela de clientes com código sequencial
-    cursor.execute('''CREATE TABLE IF NOT EXISTS clientes
-                      (codigo_cliente INTEGER PRIMARY KEY AUTOINCREMENT,
-                       nome TEXT NOT NULL,
-                       telefone TEXT,
-                       data_cadastro TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
-    
-    # Tabela de produtos
-    cursor.execute('''CREATE TABLE IF NOT EXISTS produtos
-                      (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                       tipo TEXT NOT NULL,
-                       cor TEXT,
-                       tamanho TEXT,
-                       preco_custo REAL,
-                       preco_venda REAL,
-                       quantidade INTEGER)''')
-    
-    # Tabela de vendas
-    cursor.execute('''CREATE TABLE IF NOT EXISTS vendas
-                      (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                       cliente_id TEXT,
-                       valor_total REAL,
-                       data_venda TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                       FOREIGN KEY (cliente_id) REFERENCES clientes (codigo_cliente))''')
-    
-    # Tabela de itens de venda
-    cursor.execute('''CREATE TABLE IF NOT EXISTS itens_venda
-                      (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                       venda_id INTEGER,
-                       produto_id INTEGER,
-                       quantidade INTEGER,
-                       valor_unitario REAL,
-                       FOREIGN KEY (venda_id) REFERENCES vendas (id),
-                       FOREIGN KEY (produto_id) REFERENCES produtos (id))''')
-    
-    # Tabela de pagamentos
-    cursor.execute('''CREATE TABLE IF NOT EXISTS pagamentos
-                      (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                       cliente_id TEXT,
-                       venda_id INTEGER,
-                       valor_pago REAL,
-                       data_pagamento DATETIME,
-                       FOREIGN KEY (cliente_id) REFERENCES clientes (codigo_cliente),
-                       FOREIGN KEY (venda_id) REFERENCES vendas (id))''')
-    
-    conn.commit()
-    conn.close()
+def atualizar_tabela_clientes():
+    """Exibe todos os clientes, dos mais novos aos mais antigos, em páginas.
 
-# Certifique-se de chamar esta função no início do seu programa
-criar_banco_dados()
+    Com a tabela já carregada, relê só as linhas exibidas e aplica as
+    diferenças: o custo não depende do número de clientes.
+    """
+    paginar(tree_clientes, montar_consulta_clientes, formatar_cadastros, executor)
 
-def atualizar_tabela_clientes():
-    """Atualiza a tabela de clientes com os dados do banco"""
-    # Limpar tabela
-    for item in tree_clientes.get_children():
-        tree_clientes.delete(item)
-    
-    # Buscar dados atualizados
-    conn = create_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute("""
-        SELECT codigo_cliente, nome, COALESCE(telefone, '-') as telefone
-        FROM clientes
-        ORDER BY codigo_cliente
-    """)
-    
-    # Inserir dados na tabela
-    for row in cursor.fetchall():
-        codigo, nome, telefone = row
-        tree_clientes.insert("", "end", values=(
-            codigo,  # Não precisa mais formatar como string
-            nome,
-            telefone
-        ))
-    
-    conn.close()
+def buscar_clientes(texto):
+    """Exibe os clientes que combinam com o texto, dos mais relevantes aos menos.
+
+    Sem texto, volta a exibir todos. A consulta roda na thread do banco; uma
+    nova busca cancela a anterior.
+    """
+    if parametros_busca(texto) is None:
+        atualizar_tabela_clientes()
+        return
+    exibir_lista(tree_clientes, list, executor, pesquisar_clientes, texto)
 
 def cadastrar_cliente():
     """Cadastra um novo cliente no banco de dados"""
@@ -166,32 +94,22 @@ def cadastrar_cliente():
     
     if not telefone:
         telefone = "-"
-    
-    conn = create_connection()
-    cursor = conn.cursor()
-    
-    try:
-        agora = datetime.now(FUSO_HORARIO)
-        cursor.execute("""
-            INSERT INTO clientes (nome, telefone, data_cadastro)
-            VALUES (?, ?, ?)
-        """, (nome, telefone, agora))
-        
-        conn.commit()
+
+    def concluido(_):
         messagebox.showinfo("Sucesso", "Cliente cadastrado com sucesso!")
         
         # Limpar campos
         entry_nome.delete(0, END)
         entry_telefone.delete(0, END)
         
-        # Atualizar tabela
+        # O novo cliente é o primeiro da listagem: só as linhas exibidas são relidas
         atualizar_tabela_clientes()
-        
-    except sqlite3.Error as e:
-        conn.rollback()
+
+    def falhou(e):
         messagebox.showerror("Erro", f"Erro ao cadastrar cliente: {str(e)}")
-    finally:
-        conn.close()
+
+    executor.executar(gravar_cliente, nome, telefone,
+                      ao_concluir=concluido, ao_falhar=falhou, cancelavel=False)
 
 def excluir_cliente(event=None):
     """Exclui um cliente selecionado"""
@@ -204,53 +122,62 @@ def excluir_cliente(event=None):
     if resposta:
         codigo_cliente = tree_clientes.item(selected_item)['values'][0]
 
-        conn = create_connection()
-        cursor = conn.cursor()
-        try:
-            # Verificar se o cliente tem vendas
-            cursor.execute("SELECT COUNT(*) FROM vendas WHERE cliente_id = ?", (codigo_cliente,))
-            if cursor.fetchone()[0] > 0:
-                messagebox.showerror("Erro", "Não é possível excluir um cliente que possui vendas registradas.")
-                return
-
-            cursor.execute("DELETE FROM clientes WHERE codigo_cliente = ?", (codigo_cliente,))
-            conn.commit()
-            tree_clientes.delete(selected_item)
+        def concluido(_):
+            remover_linhas(tree_clientes, [item for item in selected_item if tree_clientes.exists(item)])
             messagebox.showinfo("Sucesso", "Cliente excluído com sucesso.")
-        except sqlite3.Error as e:
-            conn.rollback()
-            messagebox.showerror("Erro", f"Ocorreu um erro ao excluir o cliente: {str(e)}")
-        finally:
-            conn.close()
+
+        # A verificação de vendas sai da transação como ValueError; o aviso
+        # só aparece aqui, com a trava de escrita já liberada
+        def falhou(e):
+            if isinstance(e, ValueError):
+                messagebox.showerror("Erro", str(e))
+            else:
+                messagebox.showerror("Erro", f"Ocorreu um erro ao excluir o cliente: {str(e)}")
+
+        executor.executar(apagar_cliente, codigo_cliente,
+                          ao_concluir=concluido, ao_falhar=falhou, cancelavel=False)
 
 def abrir_cadastro_clientes():
-    global entry_nome, entry_telefone, tree_clientes
+    mostrar_tela("clientes")
 
-    # Limpar canvas existente
-    canvas.delete("all")
-    canvas.create_image(0, 0, image=FotoBG, anchor="nw")
+def construir_tela_clientes(canvas):
+    global entry_nome, entry_telefone, tree_clientes
 
     # Criar formulário de cadastro
     canvas.create_text(700, 50, text="Cadastro de Clientes", font=("Arial", 24))
 
     canvas.create_text(550, 120, text="Nome:", anchor="e", font=("Arial", 12))
-    entry_nome = Entry(window, width=40, font=("Arial", 12))
+    entry_nome = Entry(canvas, width=40, font=("Arial", 12))
     canvas.create_window(560, 120, window=entry_nome, anchor="w")
 
     canvas.create_text(550, 160, text="Telefone:", anchor="e", font=("Arial", 12))
-    entry_telefone = Entry(window, width=40, font=("Arial", 12))
+    entry_telefone = Entry(canvas, width=40, font=("Arial", 12))
     canvas.create_window(560, 160, window=entry_telefone, anchor="w")
 
-    btn_cadastrar = Button(window, text="Cadastrar", command=cadastrar_cliente, 
+    btn_cadastrar = Button(canvas, text="Cadastrar", command=cadastrar_cliente, 
                           font=("Arial", 12), bg="#4CAF50", fg="white")
     canvas.create_window(650, 290, window=btn_cadastrar)
 
-    btn_excluir = Button(window, text="Excluir", command=excluir_cliente, 
+    btn_excluir = Button(canvas, text="Excluir", command=excluir_cliente, 
                         font=("Arial", 12), bg="#f44336", fg="white")
     canvas.create_window(750, 290, window=btn_excluir)
 
+    btn_importar = Button(canvas, text="Importar CSV",
+                          command=lambda: importar_csv(importar_clientes, atualizar_tabela_clientes),
+                          font=("Arial", 12), bg="#2196F3", fg="white")
+    canvas.create_window(870, 290, window=btn_importar)
+
+    # Busca por nome ou telefone
+    canvas.create_text(550, 330, text="Buscar:", anchor="e", font=("Arial", 12))
+    entry_busca = Entry(canvas, width=30, font=("Arial", 12))
+    canvas.create_window(560, 330, window=entry_busca, anchor="w")
+    entry_busca.bind("<Return>", lambda event: buscar_clientes(entry_busca.get()))
+    btn_buscar = Button(canvas, text="Buscar", command=lambda: buscar_clientes(entry_busca.get()),
+                        font=("Arial", 10), bg="#2196F3", fg="white")
+    canvas.create_window(880, 330, window=btn_buscar)
+
     # Adicionar tabela de clientes
-    tree_clientes = ttk.Treeview(window, columns=("Código", "Nome", "Telefone"), show="headings")
+    tree_clientes = ttk.Treeview(canvas, columns=("Código", "Nome", "Telefone"), show="headings")
     tree_clientes.heading("Código", text="Código")
     tree_clientes.heading("Nome", text="Nome")
     tree_clientes.heading("Telefone", text="Telefone")
@@ -259,13 +186,8 @@ def abrir_cadastro_clientes():
     # Adicionar evento de tecla para excluir cliente
     tree_clientes.bind("<Delete>", excluir_cliente)
 
-    # Preencher a tabela com os clientes cadastrados
-    conn = create_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT codigo_cliente, nome, telefone FROM clientes")
-    for cliente in cursor.fetchall():
-        tree_clientes.insert("", "end", values=cliente)
-    conn.close()
+    # Ao voltar para a tela, a busca digitada continua valendo
+    return lambda: buscar_clientes(entry_busca.get())
 
 def cadastrar_produto():
     global tree_produtos
@@ -277,29 +199,28 @@ def cadastrar_produto():
     preco_venda = float(entry_preco_venda.get())
     quantidade = int(entry_quantidade.get())
 
-    conn = create_connection()
-    cursor = conn.cursor()
-    cursor.execute("INSERT INTO produtos (tipo, cor, tamanho, preco_custo, preco_venda, quantidade) VALUES (?, ?, ?, ?, ?, ?)",
-                   (tipo, cor, tamanho, preco_custo, preco_venda, quantidade))
-    novo_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
+    def concluido(_):
+        # Limpar campos após cadastro
+        entry_tipo.delete(0, END)
+        entry_cor.delete(0, END)
+        entry_tamanho.delete(0, END)
+        entry_preco_custo.delete(0, END)
+        entry_preco_venda.delete(0, END)
+        entry_quantidade.delete(0, END)
 
-    # Limpar campos após cadastro
-    entry_tipo.delete(0, END)
-    entry_cor.delete(0, END)
-    entry_tamanho.delete(0, END)
-    entry_preco_custo.delete(0, END)
-    entry_preco_venda.delete(0, END)
-    entry_quantidade.delete(0, END)
+        # O novo produto é o primeiro da listagem: só as linhas exibidas são relidas
+        if 'tree_produtos' in globals() and tree_produtos:
+            atualizar_tabela_produtos()
+        else:
+            print("Erro: A tabela de produtos não foi encontrada.")
 
-    # Inserir novo produto na tabela
-    if 'tree_produtos' in globals() and tree_produtos:
-        tree_produtos.insert("", "end", values=(novo_id, tipo, cor, tamanho, preco_custo, preco_venda, quantidade))
-    else:
-        print("Erro: A tabela de produtos não foi encontrada.")
+        messagebox.showinfo("Sucesso", "Produto cadastrado com sucesso!")
+
+    def falhou(e):
+        messagebox.showerror("Erro", f"Erro ao cadastrar produto: {str(e)}")
 
-    messagebox.showinfo("Sucesso", "Produto cadastrado com sucesso!")
+    executor.executar(gravar_produto, tipo, cor, tamanho, preco_custo, preco_venda, quantidade,
+                      ao_concluir=concluido, ao_falhar=falhou, cancelavel=False)
 
 def excluir_produto(event=None):
     selected_item = tree_produtos.selection()
@@ -311,18 +232,26 @@ def excluir_produto(event=None):
     if resposta:
         produto_id = tree_produtos.item(selected_item)['values'][0]
 
-        conn = create_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute("DELETE FROM produtos WHERE id = ?", (produto_id,))
-            conn.commit()
-            tree_produtos.delete(selected_item)
+        def concluido(_):
+            remover_linhas(tree_produtos, [item for item in selected_item if tree_produtos.exists(item)])
             messagebox.showinfo("Sucesso", "Produto excluído com sucesso.")
-        except sqlite3.Error as e:
-            conn.rollback()
+
+        def falhou(e):
             messagebox.showerror("Erro", f"Ocorreu um erro ao excluir o produto: {str(e)}")
-        finally:
-            conn.close()
+
+        executor.executar(apagar_produto, produto_id,
+                          ao_concluir=concluido, ao_falhar=falhou, cancelavel=False)
+
+def buscar_produtos(texto):
+    """Exibe os produtos que combinam com o texto, dos mais relevantes aos menos.
+
+    Sem texto, volta a exibir todos (ver atualizar_tabela_produtos). A
+    consulta roda na thread do banco; uma nova busca cancela a anterior.
+    """
+    if parametros_busca(texto) is None:
+        atualizar_tabela_produtos()
+        return
+    exibir_lista(tree_produtos, list, executor, pesquisar_produtos, texto)
 
 def preencher_campos_produto(event):
     global entry_tipo, entry_cor, entry_tamanho, entry_preco_custo, entry_quantidade, tree_produtos, entry_preco_venda
@@ -347,53 +276,66 @@ def preencher_campos_produto(event):
     entry_quantidade.insert(0, valores[6])
 
 def abrir_cadastro_produtos():
-    global entry_tipo, entry_cor, entry_tamanho, entry_preco_custo, entry_quantidade, tree_produtos, entry_preco_venda
+    mostrar_tela("produtos")
 
-    # Limpar canvas existente
-    canvas.delete("all")
-    canvas.create_image(0, 0, image=FotoBG, anchor="nw")
+def construir_tela_produtos(canvas):
+    global entry_tipo, entry_cor, entry_tamanho, entry_preco_custo, entry_quantidade, tree_produtos, entry_preco_venda
 
     # Criar formulário de cadastro
     canvas.create_text(700, 50, text="Cadastro de Produtos", font=("Arial", 24))
 
     canvas.create_text(550, 120, text="Tipo:", anchor="e", font=("Arial", 12))
-    entry_tipo = Entry(window, width=40, font=("Arial", 12))
+    entry_tipo = Entry(canvas, width=40, font=("Arial", 12))
     canvas.create_window(560, 120, window=entry_tipo, anchor="w")
 
     canvas.create_text(550, 160, text="Cor:", anchor="e", font=("Arial", 12))
-    entry_cor = Entry(window, width=40, font=("Arial", 12))
+    entry_cor = Entry(canvas, width=40, font=("Arial", 12))
     canvas.create_window(560, 160, window=entry_cor, anchor="w")
 
     canvas.create_text(550, 200, text="Tamanho:", anchor="e", font=("Arial", 12))
-    entry_tamanho = Entry(window, width=40, font=("Arial", 12))
+    entry_tamanho = Entry(canvas, width=40, font=("Arial", 12))
     canvas.create_window(560, 200, window=entry_tamanho, anchor="w")
 
     canvas.create_text(550, 240, text="Preço de Custo:", anchor="e", font=("Arial", 12))
-    entry_preco_custo = Entry(window, width=40, font=("Arial", 12))
+    entry_preco_custo = Entry(canvas, width=40, font=("Arial", 12))
     canvas.create_window(560, 240, window=entry_preco_custo, anchor="w")
 
     canvas.create_text(550, 280, text="Preço de Venda: ", anchor="e", font=("Arial, 12"))
-    entry_preco_venda = Entry(window, width=40, font=("Arial", 12))
+    entry_preco_venda = Entry(canvas, width=40, font=("Arial", 12))
     canvas.create_window(560,280, window=entry_preco_venda, anchor="w")
 
     canvas.create_text(550, 320, text="Quantidade:", anchor="e", font=("Arial", 12))
-    entry_quantidade = Entry(window, width=40, font=("Arial", 12))
+    entry_quantidade = Entry(canvas, width=40, font=("Arial", 12))
     canvas.create_window(560, 320, window=entry_quantidade, anchor="w")
 
-    btn_cadastrar = Button(window, text="Cadastrar", command=cadastrar_produto, 
+    btn_cadastrar = Button(canvas, text="Cadastrar", command=cadastrar_produto, 
                           font=("Arial", 12), bg="#4CAF50", fg="white")
     canvas.create_window(650, 360, window=btn_cadastrar)
 
-    btn_atualizar = Button(window, text="Atualizar", command=atualizar_produto, 
+    btn_atualizar = Button(canvas, text="Atualizar", command=atualizar_produto, 
                           font=("Arial", 12), bg="#2196F3", fg="white")
     canvas.create_window(750, 360, window=btn_atualizar)
 
-    btn_excluir = Button(window, text="Excluir", command=excluir_produto, 
+    btn_excluir = Button(canvas, text="Excluir", command=excluir_produto, 
                         font=("Arial", 12), bg="#f44336", fg="white")
     canvas.create_window(850, 360, window=btn_excluir)
 
+    btn_importar = Button(canvas, text="Importar CSV",
+                          command=lambda: importar_csv(importar_produtos, atualizar_tabela_produtos),
+                          font=("Arial", 12), bg="#2196F3", fg="white")
+    canvas.create_window(970, 360, window=btn_importar)
+
+    # Busca por tipo, cor ou tamanho
+    canvas.create_text(550, 400, text="Buscar:", anchor="e", font=("Arial", 12))
+    entry_busca = Entry(canvas, width=30, font=("Arial", 12))
+    canvas.create_window(560, 400, window=entry_busca, anchor="w")
+    entry_busca.bind("<Return>", lambda event: buscar_produtos(entry_busca.get()))
+    btn_buscar = Button(canvas, text="Buscar", command=lambda: buscar_produtos(entry_busca.get()),
+                        font=("Arial", 10), bg="#2196F3", fg="white")
+    canvas.create_window(880, 400, window=btn_buscar)
+
     # Adicionar tabela de produtos
-    tree_produtos = ttk.Treeview(window, columns=("ID", "Tipo", "Cor", "Tamanho", "Preço Custo", "Preço Venda", "Quantidade"), show="headings")
+    tree_produtos = ttk.Treeview(canvas, columns=("ID", "Tipo", "Cor", "Tamanho", "Preço Custo", "Preço Venda", "Quantidade"), show="headings")
     tree_produtos.heading("ID", text="ID")
     tree_produtos.heading("Tipo", text="Tipo")
     tree_produtos.heading("Cor", text="Cor")
@@ -401,7 +343,7 @@ def abrir_cadastro_produtos():
     tree_produtos.heading("Preço Custo", text="Preço Custo")
     tree_produtos.heading("Preço Venda", text="Preço Venda")
     tree_produtos.heading("Quantidade", text="Quantidade")
-    canvas.create_window(700, 540, window=tree_produtos, width=800, height=300)
+    canvas.create_window(700, 570, window=tree_produtos, width=800, height=300)
 
     # Adicionar evento de clique duplo
     tree_produtos.bind("<Double-1>", preencher_campos_produto)
@@ -409,13 +351,53 @@ def abrir_cadastro_produtos():
     # Adicionar evento de tecla para excluir produto
     tree_produtos.bind("<Delete>", excluir_produto)
 
-    # Preencher a tabela com os produtos cadastrados
-    conn = create_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT id, tipo, cor, tamanho, preco_custo, preco_venda, quantidade FROM produtos")
-    for produto in cursor.fetchall():
-        tree_produtos.insert("", "end", values=produto)
-    conn.close()
+    # Ao voltar para a tela, a busca digitada continua valendo
+    return lambda: buscar_produtos(entry_busca.get())
+
+def atualizar_tabela_produtos():
+    """Exibe todos os produtos, dos mais novos aos mais antigos, em páginas
+    (ver atualizar_tabela_clientes)"""
+    paginar(tree_produtos, montar_consulta_produtos, formatar_cadastros, executor)
+
+def importar_csv(importar_tabela, ao_concluir):
+    """Importa um CSV escolhido pelo usuário na thread do banco (ver importacao.py)"""
+    caminho = filedialog.askopenfilename(title="Importar CSV",
+                                         filetypes=[("Arquivos CSV", "*.csv"), ("Todos os arquivos", "*.*")])
+    if not caminho:
+        return
+
+    atualizar = messagebox.askyesno(
+        "Importar CSV",
+        "Atualizar os cadastros que já existem?\n\n"
+        "Produtos são reconhecidos por tipo, cor e tamanho, e clientes pelo telefone. "
+        "Respondendo Não, todas as linhas viram cadastros novos.")
+
+    def concluida(resultado):
+        messagebox.showinfo("Importação concluída", resultado.resumo())
+        ao_concluir()
+
+    def falhou(e):
+        messagebox.showerror("Erro", f"Erro ao importar: {str(e)}")
+
+    executor.executar(importar_tabela, caminho, atualizar,
+                      ao_concluir=concluida, ao_falhar=falhou, cancelavel=False)
+
+def exportar_csv(exportar_tabela, nome_sugerido, *filtros):
+    """Exporta para um CSV escolhido pelo usuário, na thread do banco (ver exportacao.py)"""
+    caminho = filedialog.asksaveasfilename(title="Exportar CSV", defaultextension=".csv",
+                                           initialfile=nome_sugerido,
+                                           filetypes=[("Arquivos CSV", "*.csv")])
+    if not caminho:
+        return
+
+    def concluida(linhas):
+        messagebox.showinfo("Exportação concluída", f"{linhas} linha(s) exportada(s) para {caminho}")
+
+    def falhou(e):
+        messagebox.showerror("Erro", f"Erro ao exportar: {str(e)}")
+
+    executor.executar(exportar_tabela, caminho, *filtros,
+                      ao_concluir=concluida, ao_falhar=falhou, cancelavel=False)
 
 def atualizar_produto():
     global tree_produtos
@@ -433,57 +415,48 @@ def atualizar_produto():
     preco_venda = preco_custo * 2
     quantidade = int(entry_quantidade.get())
 
-    conn = create_connection()
-    cursor = conn.cursor()
-    cursor.execute("UPDATE produtos SET tipo=?, cor=?, tamanho=?, preco_custo=?, preco_venda=?, quantidade=? WHERE id=?",
-                   (tipo, cor, tamanho, preco_custo, preco_venda, quantidade, id_produto))
-    conn.commit()
-    conn.close()
+    def concluido(_):
+        # Atualizar a tabela
+        atualizar_linhas(tree_produtos, [(id_produto, tipo, cor, tamanho, preco_custo, preco_venda, quantidade)])
 
-    # Atualizar a tabela
-    tree_produtos.item(item_selecionado, values=(id_produto, tipo, cor, tamanho, preco_custo, preco_venda, quantidade))
+        messagebox.showinfo("Sucesso", "Produto atualizado com sucesso!")
 
-    messagebox.showinfo("Sucesso", "Produto atualizado com sucesso!")
+        # Limpar campos após atualização
+        entry_tipo.delete(0, END)
+        entry_cor.delete(0, END)
+        entry_tamanho.delete(0, END)
+        entry_preco_custo.delete(0, END)
+        entry_quantidade.delete(0, END)
 
-    # Limpar campos após atualização
-    entry_tipo.delete(0, END)
-    entry_cor.delete(0, END)
-    entry_tamanho.delete(0, END)
-    entry_preco_custo.delete(0, END)
-    entry_quantidade.delete(0, END)
+    def falhou(e):
+        messagebox.showerror("Erro", f"Erro ao atualizar produto: {str(e)}")
+
+    executor.executar(alterar_produto, id_produto, tipo, cor, tamanho, preco_custo, preco_venda, quantidade,
+                      ao_concluir=concluido, ao_falhar=falhou, cancelavel=False)
 
 def consultar_clientes():
-    """Retorna lista de clientes para combobox"""
-    conn = create_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT codigo_cliente, nome FROM clientes ORDER BY codigo_cliente")
+    """Retorna (rótulo, campos pesquisáveis) de cada cliente, para o combobox"""
+    cursor = obter_conexao().cursor()
+    cursor.execute(SQL_OPCOES_CLIENTES)
     clientes = cursor.fetchall()
-    conn.close()
-    return [f"{codigo} - {nome}" for codigo, nome in clientes]
+    return [(f"{codigo} - {nome}", (nome, telefone, codigo)) for codigo, nome, telefone in clientes]
 
 def consultar_produtos():
-    conn = create_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT id, tipo, cor, tamanho FROM produtos")
-    produtos = cursor.fetchall()
-    conn.close()
-    return [f"{id} - {tipo} {cor} {tamanho}" for id, tipo, cor, tamanho in produtos]
+    """Retorna (rótulo, campos pesquisáveis) de cada produto, lidos do catálogo em memória"""
+    return [(f"{produto.id} - {produto.descricao}", (produto.tipo, produto.cor, produto.tamanho, produto.id))
+            for produto in catalogo.listar()]
 
 def atualizar_info_produto(*args):
-    produto_selecionado = combo_produtos.get().split(' - ')[0]
-    conn = create_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT quantidade, preco_venda FROM produtos WHERE id = ?", (produto_selecionado,))
-    quantidade, preco_venda = cursor.fetchone()
-    conn.close()
+    produto = catalogo.obter(combo_produtos.get().split(' - ')[0])
+    if produto is None:
+        return
     
-    label_estoque.config(text=f"Estoque: {quantidade}")
+    label_estoque.config(text=f"Estoque: {produto.quantidade}")
     entry_valor.delete(0, 'end')
-    entry_valor.insert(0, f"{preco_venda:.2f}")
+    entry_valor.insert(0, f"{produto.preco:.2f}")
 
 def consultar_vendas():
-    conn = create_connection()
-    cursor = conn.cursor()
+    cursor = obter_conexao().cursor()
     cursor.execute("""
         SELECT v.id, c.nome, p.tipo, p.cor, p.tamanho, v.quantidade, v.valor_total, v.data_venda
         FROM vendas v
@@ -492,7 +465,6 @@ def consultar_vendas():
         ORDER BY v.data_venda DESC
     """)
     vendas = cursor.fetchall()
-    conn.close()
     return vendas
 
 def excluir_venda(event=None):
@@ -505,77 +477,39 @@ def excluir_venda(event=None):
     if resposta:
         venda_id = tree_vendas.item(selected_item)['values'][0]
 
-        conn = create_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute("DELETE FROM vendas WHERE id = ?", (venda_id,))
-            conn.commit()
-            tree_vendas.delete(selected_item)
+        def concluido(_):
+            remover_linhas(tree_vendas, [item for item in selected_item if tree_vendas.exists(item)])
             messagebox.showinfo("Sucesso", "Venda excluída com sucesso.")
-        except sqlite3.Error as e:
-            conn.rollback()
-            messagebox.showerror("Erro", f"Ocorreu um erro ao excluir o produto: {str(e)}")
-        finally:
-            conn.close()
+
+        def falhou(e):
+            messagebox.showerror("Erro", f"Ocorreu um erro ao excluir a venda: {str(e)}")
+
+        executor.executar(apagar_venda, venda_id,
+                          ao_concluir=concluido, ao_falhar=falhou, cancelavel=False)
+
+def formatar_vendas(vendas):
+    datas = formatar_data_hora([venda[3] for venda in vendas])
+    return [(venda_id, cliente, f"R$ {valor_total:.2f}", data)
+            for (venda_id, cliente, valor_total, _), data in zip(vendas, datas)]
 
 def atualizar_tabela_vendas():
-    global tree_vendas
-    # Limpar a tabela
-    for i in tree_vendas.get_children():
-        tree_vendas.delete(i)
-    
-    # Preencher com os dados atualizados
-    conn = create_connection()
-    cursor = conn.cursor()
+    """Recarrega o histórico de vendas a partir da primeira página"""
     try:
-        cursor.execute("""
-            SELECT v.id, c.nome, v.valor_total, v.data_venda
-            FROM vendas v
-            JOIN clientes c ON v.cliente_id = c.codigo_cliente
-            ORDER BY v.data_venda DESC
-        """)
-        vendas = cursor.fetchall()
-        
-        for venda in vendas:
-            # Formatar o valor e a data
-            valor_formatado = f"R$ {venda[2]:.2f}"
-            # Garantir que a data seja um objeto datetime
-            if isinstance(venda[3], datetime):
-                data_venda = venda[3]
-            else:
-                data_venda = convert_timestamp(venda[3].encode())
-            data_formatada = data_venda.strftime("%d/%m/%Y %H:%M")
-            
-            tree_vendas.insert("", "end", values=(
-                venda[0],
-                venda[1],
-                valor_formatado,
-                data_formatada
-            ))
+        paginar(tree_vendas, montar_consulta_historico_vendas, formatar_vendas, executor)
     except Exception as e:
         print(f"Erro ao atualizar tabela de vendas: {e}")
-    finally:
-        conn.close()
 
 def atualizar_estoque_e_valor(produto_id):
-    """Retorna a quantidade em estoque e preço de venda de um produto"""
-    conn = create_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT quantidade, preco_venda FROM produtos WHERE id = ?", (produto_id,))
-    resultado = cursor.fetchone()
-    conn.close()
+    """Retorna a quantidade em estoque e o preço efetivo de um produto"""
+    produto = catalogo.obter(produto_id)
     
-    if resultado is None:
+    if produto is None:
         return 0, 0.0  # Retorna valores padrão se o produto não for encontrado
-    return resultado
+    return produto.quantidade, produto.preco
 
 def calcular_total_venda():
-    """Calcula o total da venda atual baseado nos itens da tree_itens_venda"""
-    total = 0.0
-    for item in tree_itens_venda.get_children():
-        valores = tree_itens_venda.item(item)['values']
-        total += float(valores[4])  # Soma o subtotal de cada item
-    return total
+    """Retorna o total da venda atual, mantido pelo carrinho"""
+    return carrinho.total
 
 def atualizar_label_total():
     """Atualiza o label com o total da venda"""
@@ -583,6 +517,15 @@ def atualizar_label_total():
     total = calcular_total_venda()
     label_total.config(text=f"R$ {total:.2f}")
 
+def exibir_item_carrinho(item):
+    """Insere ou atualiza a linha do item na tabela da venda; a linha tem o id do produto"""
+    valores = (item.produto_id, item.descricao, item.quantidade, f"{item.preco:.2f}", f"{item.subtotal:.2f}")
+    linha = str(item.produto_id)
+    if tree_itens_venda.exists(linha):
+        tree_itens_venda.item(linha, values=valores)
+    else:
+        tree_itens_venda.insert("", "end", iid=linha, values=valores)
+
 def adicionar_item_venda():
     """Adiciona um item à venda atual"""
     if not combo_produtos.get():
@@ -600,61 +543,22 @@ def adicionar_item_venda():
     # Obter ID do produto (primeira parte antes do hífen)
     produto_id = combo_produtos.get().split(' - ')[0]
     
-    conn = create_connection()
-    cursor = conn.cursor()
-    
     try:
-        # Verificar estoque e preços (normal e promocional)
-        cursor.execute("""
-            SELECT tipo, cor, tamanho, quantidade, preco_venda, promocao, preco_promocional 
-            FROM produtos 
-            WHERE id = ?
-        """, (produto_id,))
-        
-        produto = cursor.fetchone()
+        # Estoque e preço efetivo (normal ou promocional) vêm do catálogo
+        produto = catalogo.obter(produto_id)
         if not produto:
             messagebox.showerror("Erro", "Produto não encontrado.")
             return
             
-        tipo, cor, tamanho, estoque, preco_normal, em_promocao, preco_promocional = produto
-        
-        if estoque < quantidade:
+        # Conta também o que já está no carrinho para o mesmo produto
+        estoque = produto.quantidade
+        if carrinho.quantidade_de(produto.id) + quantidade > estoque:
             messagebox.showerror("Erro", f"Estoque insuficiente. Disponível: {estoque}")
             return
         
-        # Determinar qual preço usar
-        preco_venda = preco_promocional if em_promocao and preco_promocional is not None else preco_normal
-        
-        # Calcular subtotal
-        subtotal = quantidade * preco_venda
-        
-        # Verificar se o produto já está na lista
-        for item in tree_itens_venda.get_children():
-            valores = tree_itens_venda.item(item)['values']
-            if valores[0] == produto_id:  # Se encontrar o mesmo produto
-                nova_qtd = valores[2] + quantidade
-                if nova_qtd > estoque:
-                    messagebox.showerror("Erro", f"Estoque insuficiente. Disponível: {estoque}")
-                    return
-                    
-                novo_subtotal = nova_qtd * preco_venda
-                tree_itens_venda.item(item, values=(
-                    produto_id,
-                    f"{tipo} - {cor} - {tamanho}",
-                    nova_qtd,
-                    f"{preco_venda:.2f}",
-                    f"{novo_subtotal:.2f}"
-                ))
-                break
-        else:  # Se não encontrar o produto na lista
-            # Adicionar novo item
-            tree_itens_venda.insert("", "end", values=(
-                produto_id,
-                f"{tipo} - {cor} - {tamanho}",
-                quantidade,
-                f"{preco_venda:.2f}",
-                f"{subtotal:.2f}"
-            ))
+        item = carrinho.adicionar(produto.id, f"{produto.tipo} - {produto.cor} - {produto.tamanho}",
+                                  quantidade, produto.preco)
+        exibir_item_carrinho(item)
         
         # Limpar campos
         entry_quantidade.delete(0, END)
@@ -666,8 +570,6 @@ def adicionar_item_venda():
         
     except sqlite3.Error as e:
         messagebox.showerror("Erro", f"Erro ao adicionar item: {str(e)}")
-    finally:
-        conn.close()
 
 def finalizar_venda():
     """Finaliza a venda atual"""
@@ -675,76 +577,40 @@ def finalizar_venda():
         messagebox.showerror("Erro", "Por favor, selecione um cliente.")
         return
 
-    if not tree_itens_venda.get_children():
+    if not carrinho:
         messagebox.showerror("Erro", "Adicione pelo menos um item à venda.")
         return
 
-    try:
-        # Obter o código do cliente (primeira parte antes do hífen)
-        cliente_id = combo_clientes.get().split(' - ')[0]
-        valor_total = calcular_total_venda()
-        
-        conn = create_connection()
-        cursor = conn.cursor()
-        
-        # Iniciar transação
-        conn.execute("BEGIN TRANSACTION")
-        
-        try:
-            agora = datetime.now(FUSO_HORARIO)
-            cursor.execute("""
-                INSERT INTO vendas (cliente_id, valor_total, data_venda)
-                VALUES (?, ?, ?)
-            """, (cliente_id, valor_total, agora))
-            
-            venda_id = cursor.lastrowid
-
-            # Inserir itens da venda
-            for item in tree_itens_venda.get_children():
-                valores = tree_itens_venda.item(item)['values']
-                produto_id = valores[0]
-                quantidade = int(valores[2])
-                valor_unitario = float(valores[3])
-
-                # Verificar estoque antes de finalizar
-                estoque_atual, _ = atualizar_estoque_e_valor(produto_id)
-                if estoque_atual < quantidade:
-                    raise ValueError(f"Estoque insuficiente para o produto ID {produto_id}")
-
-                cursor.execute("""
-                    INSERT INTO itens_venda (venda_id, produto_id, quantidade, valor_unitario)
-                    VALUES (?, ?, ?, ?)
-                """, (venda_id, produto_id, quantidade, valor_unitario))
-                
-                # Atualizar estoque
-                cursor.execute("""
-                    UPDATE produtos 
-                    SET quantidade = quantidade - ? 
-                    WHERE id = ?
-                """, (quantidade, produto_id))
-
-            conn.commit()
+    # Obter o código do cliente (primeira parte antes do hífen)
+    cliente_id = combo_clientes.get().split(' - ')[0]
+    # Cópia dos itens: o carrinho continua sendo da thread do Tk
+    valor_exibido = calcular_total_venda()
+    itens = carrinho.itens_para_gravar()
+
+    def concluida(resultado):
+        _, valor_total = resultado
+        if para_decimal(valor_total) != valor_exibido:
+            # Outro caixa mudou algum preço depois que o item entrou na venda
+            messagebox.showinfo("Sucesso", "Venda finalizada com sucesso!\n"
+                                f"Preços atualizados: total de R$ {valor_total:.2f}.")
+        else:
             messagebox.showinfo("Sucesso", "Venda finalizada com sucesso!")
-            
-            # Limpar a tela de vendas
-            limpar_venda()
-            # Atualizar a tabela de vendas
-            atualizar_tabela_vendas()
-            
-        except sqlite3.Error as e:
-            conn.rollback()
+        
+        # Limpar a tela de vendas
+        limpar_venda()
+        # Atualizar a tabela de vendas
+        atualizar_tabela_vendas()
+
+    def falhou(e):
+        if isinstance(e, sqlite3.Error):
             messagebox.showerror("Erro", f"Erro ao finalizar venda: {str(e)}")
-            return
-        except ValueError as e:
-            conn.rollback()
+        elif isinstance(e, ValueError):
             messagebox.showerror("Erro", str(e))
-            return
-        finally:
-            conn.close()
+        else:
+            messagebox.showerror("Erro", f"Erro inesperado: {str(e)}")
 
-    except Exception as e:
-        messagebox.showerror("Erro", f"Erro inesperado: {str(e)}")
-        return
+    executor.executar(gravar_venda, cliente_id, itens,
+                      ao_concluir=concluida, ao_falhar=falhou, cancelavel=False)
 
 def limpar_venda():
     """Limpa todos os campos e a tabela de itens da venda atual"""
@@ -754,58 +620,64 @@ def limpar_venda():
     entry_valor.delete(0, 'end')
     label_estoque.config(text="Estoque: ")
     
-    # Limpar tabela de itens
-    for item in tree_itens_venda.get_children():
-        tree_itens_venda.delete(item)
+    # Esvaziar o carrinho e a tabela que o exibe
+    carrinho.limpar()
+    tree_itens_venda.delete(*tree_itens_venda.get_children())
     
     # Atualizar total
     atualizar_label_total()
 
 
-def limpar_tela():
-    for widget in canvas.winfo_children():
-        widget.destroy()
-    canvas.delete("all")
+def cliente_combobox(frame, opcoes_fixas=(), width=40):
+    """Cria e retorna um combobox de clientes que sugere por nome, telefone ou código.
 
-def cliente_combobox(frame):
-    """Cria e retorna um combobox para seleção de clientes."""
-    cliente_var = StringVar()
-    combobox = ttk.Combobox(frame, textvariable=cliente_var, width=30)
-    return combobox, cliente_var
-
-def produto_combobox(frame):
-    """Cria e retorna um combobox para seleção de produtos."""
-    produto_var = StringVar()
-    combobox = ttk.Combobox(frame, textvariable=produto_var, width=30)
-    return combobox, produto_var
+    As opções chegam com recarregar_sugestoes, chamada ao exibir a tela.
+    """
+    combobox = ttk.Combobox(frame, width=width)
+    combobox.autocompletar = Autocompletar(combobox, IndiceSugestoes([], opcoes_fixas))
+    combobox.consultar_opcoes = consultar_clientes
+    return combobox
+
+def produto_combobox(frame, width=40):
+    """Cria e retorna um combobox de produtos que sugere por tipo, cor, tamanho ou código."""
+    combobox = ttk.Combobox(frame, width=width)
+    combobox.autocompletar = Autocompletar(combobox, IndiceSugestoes([]))
+    combobox.consultar_opcoes = consultar_produtos
+    return combobox
+
+def recarregar_sugestoes(*comboboxes):
+    """Relê as opções dos comboboxes e refaz os índices de sugestões na thread do banco"""
+    for combobox in comboboxes:
+        fixas = combobox.autocompletar.indice.fixas
+        executor.executar(lambda consultar=combobox.consultar_opcoes, fixas=fixas:
+                          IndiceSugestoes(consultar(), fixas),
+                          chave=combobox, ao_concluir=combobox.autocompletar.trocar_indice)
 
 def abrir_cadastro_vendas():
+    mostrar_tela("vendas")
+
+def construir_tela_vendas(canvas):
     global combo_clientes, combo_produtos, entry_quantidade, entry_valor, label_estoque, tree_itens_venda, label_total, tree_vendas
-    # Limpar canvas e configurar background
-    canvas.delete("all")
-    canvas.create_image(0, 0, image=FotoBG, anchor="nw")
     canvas.create_text(700, 30, text="Cadastro de Vendas", font=("Arial", 24))
 
     # Frame principal para a venda
-    frame_venda = Frame(window)
+    frame_venda = Frame(canvas)
     canvas.create_window(700, 80, window=frame_venda, width=800)
 
     # Seleção do cliente
     Label(frame_venda, text="Cliente:", font=("Arial", 12)).grid(row=0, column=0, sticky="e", padx=5, pady=5)
     global combo_clientes
-    combo_clientes = ttk.Combobox(frame_venda, width=40)
-    combo_clientes['values'] = consultar_clientes()
+    combo_clientes = cliente_combobox(frame_venda)
     combo_clientes.grid(row=0, column=1, columnspan=2, sticky="w", padx=5, pady=5)
 
     # Frame para adicionar itens
-    frame_itens = Frame(window)
+    frame_itens = Frame(canvas)
     canvas.create_window(700, 180, window=frame_itens, width=800)
 
     # Seleção do produto
     Label(frame_itens, text="Produto:", font=("Arial", 12)).grid(row=0, column=0, sticky="e", padx=5, pady=5)
     global combo_produtos
-    combo_produtos = ttk.Combobox(frame_itens, width=40)
-    combo_produtos['values'] = consultar_produtos()
+    combo_produtos = produto_combobox(frame_itens)
     combo_produtos.grid(row=0, column=1, columnspan=2, sticky="w", padx=5, pady=5)
     combo_produtos.bind('<<ComboboxSelected>>', atualizar_info_produto)
 
@@ -829,20 +701,22 @@ def abrir_cadastro_vendas():
 
     # Tabela de itens da venda atual
     global tree_itens_venda
-    tree_itens_venda = ttk.Treeview(window, columns=("ID", "Produto", "Quantidade", "Valor Unit.", "Subtotal"), 
+    tree_itens_venda = ttk.Treeview(canvas, columns=("ID", "Produto", "Quantidade", "Valor Unit.", "Subtotal"), 
                                    show="headings", height=5)
     for col in ("ID", "Produto", "Quantidade", "Valor Unit.", "Subtotal"):
         tree_itens_venda.heading(col, text=col)
     canvas.create_window(700, 350, window=tree_itens_venda, width=800)
 
     # Frame para totalização e finalização
-    frame_total = Frame(window)
+    frame_total = Frame(canvas)
     canvas.create_window(700, 450, window=frame_total, width=800)
 
     Label(frame_total, text="Total da Venda:", font=("Arial", 14, "bold")).pack(side=LEFT, padx=10)
     label_total = Label(frame_total, text="R$ 0,00", font=("Arial", 14, "bold"))
     label_total.pack(side=LEFT, padx=10)
 
+    atualizar_label_total()
+
     # Botões de finalização (ajustados para melhor visibilidade)
     btn_finalizar = Button(frame_total, text="Finalizar Venda", command=finalizar_venda, 
                           font=("Arial", 12), bg="#2196F3", fg="white")
@@ -853,9 +727,18 @@ def abrir_cadastro_vendas():
     btn_cancelar.pack(side=RIGHT, padx=10)
 
     # Histórico de vendas
-    Label(window, text="Histórico de Vendas", font=("Arial", 14, "bold")).place(x=700, y=500, anchor="center")
-    
-    tree_vendas = ttk.Treeview(window, columns=("ID", "Cliente", "Total", "Data"), 
+    Label(canvas, text="Histórico de Vendas", font=("Arial", 14, "bold")).place(x=700, y=500, anchor="center")
+
+    btn_exportar_vendas = Button(canvas, text="Exportar Vendas",
+                                 command=lambda: exportar_csv(exportar_vendas, "vendas.csv"),
+                                 font=("Arial", 10), bg="#2196F3", fg="white")
+    canvas.create_window(960, 500, window=btn_exportar_vendas)
+    btn_exportar_itens = Button(canvas, text="Exportar Itens",
+                                command=lambda: exportar_csv(exportar_itens, "itens_vendas.csv"),
+                                font=("Arial", 10), bg="#2196F3", fg="white")
+    canvas.create_window(1070, 500, window=btn_exportar_itens)
+    
+    tree_vendas = ttk.Treeview(canvas, columns=("ID", "Cliente", "Total", "Data"), 
                               show="headings", height=6)
     tree_vendas.heading("ID", text="ID")
     tree_vendas.heading("Cliente", text="Cliente")
@@ -874,19 +757,24 @@ def abrir_cadastro_vendas():
     tree_itens_venda.bind("<Double-1>", editar_item_venda)
     tree_vendas.bind("<Delete>", excluir_venda)
 
-    # Carregar vendas existentes
-    atualizar_tabela_vendas()
+    # A venda em andamento continua na tela; ao voltar, recarrega o
+    # histórico e as opções de clientes e produtos
+    def atualizar():
+        atualizar_tabela_vendas()
+        recarregar_sugestoes(combo_clientes, combo_produtos)
+
+    return atualizar
 
 
 def abrir_dashboard():
     """Abre a tela de dashboard com indicadores de desempenho"""
-    # Limpar canvas e configurar background
-    canvas.delete("all")
-    canvas.create_image(0, 0, image=FotoBG, anchor="nw")
+    mostrar_tela("dashboard")
+
+def construir_tela_dashboard(canvas):
     canvas.create_text(700, 30, text="Dashboard", font=("Arial", 24))
 
     # Frame principal
-    frame_dashboard = Frame(window)
+    frame_dashboard = Frame(canvas)
     canvas.create_window(700, 350, window=frame_dashboard, width=800)
 
     # Estilo para os frames de indicadores
@@ -900,8 +788,8 @@ def abrir_dashboard():
     
     Label(frame_clientes, text="Clientes", **style_titulo).pack()
     
-    total_clientes = obter_dados_clientes()
-    Label(frame_clientes, text=f"Total de Clientes: {total_clientes}", **style_valor).pack()
+    label_total_clientes = Label(frame_clientes, text="Total de Clientes: ...", **style_valor)
+    label_total_clientes.pack()
 
     # Frame Vendas
     frame_vendas = Frame(frame_dashboard, **style_frame)
@@ -909,9 +797,10 @@ def abrir_dashboard():
     
     Label(frame_vendas, text="Vendas", **style_titulo).pack()
     
-    vendas_mes, vendas_trimestre = obter_dados_vendas()
-    Label(frame_vendas, text=f"Vendas (Mês Atual): R$ {vendas_mes:.2f}", **style_valor).pack()
-    Label(frame_vendas, text=f"Vendas (3 Meses): R$ {vendas_trimestre:.2f}", **style_valor).pack()
+    label_vendas_mes = Label(frame_vendas, text="Vendas (Mês Atual): ...", **style_valor)
+    label_vendas_mes.pack()
+    label_vendas_trimestre = Label(frame_vendas, text="Vendas (3 Meses): ...", **style_valor)
+    label_vendas_trimestre.pack()
 
     # Frame Recebimentos
     frame_recebimentos = Frame(frame_dashboard, **style_frame)
@@ -919,9 +808,10 @@ def abrir_dashboard():
     
     Label(frame_recebimentos, text="Recebimentos", **style_titulo).pack()
     
-    recebido_mes, recebido_trimestre = obter_dados_recebimentos()
-    Label(frame_recebimentos, text=f"Recebido (Mês Atual): R$ {recebido_mes:.2f}", **style_valor).pack()
-    Label(frame_recebimentos, text=f"Recebido (3 Meses): R$ {recebido_trimestre:.2f}", **style_valor).pack()
+    label_recebido_mes = Label(frame_recebimentos, text="Recebido (Mês Atual): ...", **style_valor)
+    label_recebido_mes.pack()
+    label_recebido_trimestre = Label(frame_recebimentos, text="Recebido (3 Meses): ...", **style_valor)
+    label_recebido_trimestre.pack()
 
     # Frame Lucro
     frame_lucro = Frame(frame_dashboard, **style_frame)
@@ -929,216 +819,46 @@ def abrir_dashboard():
     
     Label(frame_lucro, text="Lucro Líquido", **style_titulo).pack()
     
-    lucro_mes, lucro_trimestre = obter_dados_lucro()
-    Label(frame_lucro, text=f"Lucro (Mês Atual): R$ {lucro_mes:.2f}", **style_valor).pack()
-    Label(frame_lucro, text=f"Lucro (3 Meses): R$ {lucro_trimestre:.2f}", **style_valor).pack()
+    label_lucro_mes = Label(frame_lucro, text="Lucro (Mês Atual): ...", **style_valor)
+    label_lucro_mes.pack()
+    label_lucro_trimestre = Label(frame_lucro, text="Lucro (3 Meses): ...", **style_valor)
+    label_lucro_trimestre.pack()
 
     # Configurar grid
     frame_dashboard.grid_columnconfigure(0, weight=1)
     frame_dashboard.grid_columnconfigure(1, weight=1)
 
-def obter_dados_clientes():
-
-    conn = create_connection()
-    cursor = conn.cursor()
-    
-    # Total de clientes
-    cursor.execute("SELECT COUNT(*) FROM clientes")
-    total_clientes = cursor.fetchone()[0]
-    
-   
-    conn.close()
-    return total_clientes
-
-def obter_dados_vendas():
-    """Retorna o total de vendas do mês atual e dos últimos 3 meses"""
-    conn = create_connection()
-    cursor = conn.cursor()
-    
-    hoje = datetime.now()
-    primeiro_dia_mes = hoje.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    primeiro_dia_tres_meses = (hoje - timedelta(days=90)).replace(hour=0, minute=0, second=0, microsecond=0)
-    
-    # Vendas do mês atual
-    cursor.execute("""
-        SELECT COALESCE(SUM(valor_total), 0) FROM vendas 
-        WHERE data_venda >= ?
-    """, (primeiro_dia_mes,))
-    vendas_mes = cursor.fetchone()[0]
-    
-    # Vendas dos últimos 3 meses
-    cursor.execute("""
-        SELECT COALESCE(SUM(valor_total), 0) FROM vendas 
-        WHERE data_venda >= ?
-    """, (primeiro_dia_tres_meses,))
-    vendas_trimestre = cursor.fetchone()[0]
-    
-    conn.close()
-    return vendas_mes, vendas_trimestre
-
-def obter_dados_recebimentos():
-    """Retorna o total recebido no mês atual e nos últimos 3 meses"""
-    conn = create_connection()
-    cursor = conn.cursor()
-    
-    hoje = datetime.now()
-    primeiro_dia_mes = hoje.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    primeiro_dia_tres_meses = (hoje - timedelta(days=90)).replace(hour=0, minute=0, second=0, microsecond=0)
-    
-    # Recebimentos do mês atual
-    cursor.execute("""
-        SELECT COALESCE(SUM(valor_pago), 0) FROM pagamentos 
-        WHERE data_pagamento >= ?
-    """, (primeiro_dia_mes,))
-    recebido_mes = cursor.fetchone()[0]
-    
-    # Recebimentos dos últimos 3 meses
-    cursor.execute("""
-        SELECT COALESCE(SUM(valor_pago), 0) FROM pagamentos 
-        WHERE data_pagamento >= ?
-    """, (primeiro_dia_tres_meses,))
-    recebido_trimestre = cursor.fetchone()[0]
-    
-    conn.close()
-    return recebido_mes, recebido_trimestre
-
-def obter_dados_lucro():
-    """Retorna o lucro líquido do mês atual e dos últimos 3 meses"""
-    conn = create_connection()
-    cursor = conn.cursor()
-    
-    hoje = datetime.now()
-    primeiro_dia_mes = hoje.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    primeiro_dia_tres_meses = (hoje - timedelta(days=90)).replace(hour=0, minute=0, second=0, microsecond=0)
-    
-    # Query para calcular o lucro líquido
-    query_lucro = """
-        SELECT COALESCE(SUM((iv.valor_unitario - p.preco_custo) * iv.quantidade), 0) as lucro_liquido
-        FROM vendas v
-        JOIN itens_venda iv ON v.id = iv.venda_id
-        JOIN produtos p ON iv.produto_id = p.id
-        WHERE v.data_venda >= ?
-    """
-    
-    # Lucro do mês atual
-    cursor.execute(query_lucro, (primeiro_dia_mes,))
-    lucro_mes = cursor.fetchone()[0]
-    
-    # Lucro dos últimos 3 meses
-    cursor.execute(query_lucro, (primeiro_dia_tres_meses,))
-    lucro_trimestre = cursor.fetchone()[0]
-    
-    # Debug: imprimir detalhes do cálculo
-    cursor.execute("""
-        SELECT 
-            v.id as venda_id,
-            v.data_venda,
-            p.id as produto_id,
-            p.tipo,
-            iv.quantidade,
-            p.preco_custo,
-            iv.valor_unitario,
-            (iv.valor_unitario - p.preco_custo) * iv.quantidade as lucro_item
-        FROM vendas v
-        JOIN itens_venda iv ON v.id = iv.venda_id
-        JOIN produtos p ON iv.produto_id = p.id
-        WHERE v.data_venda >= ?
-        ORDER BY v.data_venda DESC
-    """, (primeiro_dia_mes,))
-    
-
-    conn.close()
-    return lucro_mes, lucro_trimestre
+    # Os indicadores são calculados na thread do banco e exibidos ao chegar
+    def calcular():
+        inicio = time.perf_counter()
+        indicadores = calcular_indicadores()
+        duracao_ms = (time.perf_counter() - inicio) * 1000
+        if duracao_ms > ORCAMENTO_MS:
+            print(f"Dashboard calculado em {duracao_ms:.0f} ms (orçamento: {ORCAMENTO_MS} ms)")
+        return indicadores
+
+    def exibir(indicadores):
+        label_total_clientes.config(text=f"Total de Clientes: {indicadores.total_clientes}")
+        label_vendas_mes.config(text=f"Vendas (Mês Atual): R$ {indicadores.vendas_mes:.2f}")
+        label_vendas_trimestre.config(text=f"Vendas (3 Meses): R$ {indicadores.vendas_trimestre:.2f}")
+        label_recebido_mes.config(text=f"Recebido (Mês Atual): R$ {indicadores.recebido_mes:.2f}")
+        label_recebido_trimestre.config(text=f"Recebido (3 Meses): R$ {indicadores.recebido_trimestre:.2f}")
+        label_lucro_mes.config(text=f"Lucro (Mês Atual): R$ {indicadores.lucro_mes:.2f}")
+        label_lucro_trimestre.config(text=f"Lucro (3 Meses): R$ {indicadores.lucro_trimestre:.2f}")
+
+    # Recalculados a cada visita à tela
+    return lambda: executor.executar(calcular, ao_concluir=exibir,
+                                     ao_falhar=lambda e: print(f"Erro ao calcular o dashboard: {e}"))
 
 def abrir_contas_receber():
-    canvas.delete("all")
-    canvas.create_image(0, 0, image=FotoBG, anchor="nw")
-    canvas.create_text(700, 30, text="Contas a Receber", font=("Arial", 24))
-
-    # Frame para filtros
-    frame_filtros = Frame(window)
-    canvas.create_window(700, 80, window=frame_filtros, width=800)
-
-    # Combobox de clientes
-    Label(frame_filtros, text="Filtrar por Cliente:", font=("Arial", 12)).pack(side=LEFT, padx=5)
-    combo_filtro_clientes = ttk.Combobox(frame_filtros, width=40)
-    combo_filtro_clientes['values'] = ['Todos os Clientes'] + consultar_clientes()
-    combo_filtro_clientes.set('Todos os Clientes')
-    combo_filtro_clientes.pack(side=LEFT, padx=5)
+    mostrar_tela("contas")
 
-    # Botão de filtrar
-    btn_filtrar = Button(frame_filtros, text="Filtrar", 
-                        command=lambda: filtrar_contas(tree_contas, combo_filtro_clientes.get()),
-                        font=("Arial", 12), bg="#2196F3", fg="white")
-    btn_filtrar.pack(side=LEFT, padx=5)
-
-    # Tabela de contas a receber
-    tree_contas = ttk.Treeview(window, 
-                              columns=("ID", "Data", "Cliente", "Total", "Pago", "Saldo"),
-                              show="headings", 
-                              height=10)
-
-    # Configuração das colunas
-    tree_contas.heading("ID", text="ID")
-    tree_contas.heading("Data", text="Data")
-    tree_contas.heading("Cliente", text="Cliente")
-    tree_contas.heading("Total", text="Total Venda")
-    tree_contas.heading("Pago", text="Valor Pago")
-    tree_contas.heading("Saldo", text="Saldo")
-
-    tree_contas.column("ID", width=50, anchor="center")
-    tree_contas.column("Data", width=100, anchor="center")
-    tree_contas.column("Cliente", width=200)
-    tree_contas.column("Total", width=100, anchor="e")
-    tree_contas.column("Pago", width=100, anchor="e")
-    tree_contas.column("Saldo", width=100, anchor="e")
-
-    canvas.create_window(700, 250, window=tree_contas, width=800)
-
-    # Frame para pagamentos
-    frame_pagamento = Frame(window)
-    canvas.create_window(700, 400, window=frame_pagamento, width=800)
-
-    Label(frame_pagamento, text="Registrar Pagamento", 
-          font=("Arial", 14, "bold")).pack(pady=10)
-
-    frame_campos = Frame(frame_pagamento)
-    frame_campos.pack()
-
-    # Campo para valor do pagamento
-    Label(frame_campos, text="Valor do Pagamento: R$", 
-          font=("Arial", 12)).grid(row=0, column=0, padx=5, pady=5)
-    entry_valor = Entry(frame_campos, width=15, font=("Arial", 12))
-    entry_valor.grid(row=0, column=1, padx=5, pady=5)
-
-    # Botão de registrar pagamento
-    btn_registrar = Button(frame_campos, 
-                          text="Registrar Pagamento",
-                          command=lambda: registrar_pagamento(tree_contas, entry_valor),
-                          font=("Arial", 12), 
-                          bg="#4CAF50", 
-                          fg="white")
-    btn_registrar.grid(row=0, column=2, padx=20, pady=5)
-
-    # Frame para resumo
-    frame_resumo = Frame(window)
-    canvas.create_window(700, 500, window=frame_resumo, width=800)
-
-    Label(frame_resumo, text="Resumo Financeiro", 
-          font=("Arial", 14, "bold")).pack(pady=10)
-
-    # Alteração aqui: criar label_total como global
+def construir_tela_contas(canvas):
     global label_total_receber
-    label_total_receber = Label(frame_resumo, 
-                               text=f"Total a Receber: R$ {calcular_total_receber():.2f}",
-                               font=("Arial", 12))
-    label_total_receber.pack(pady=5)
-
-    # Carregar dados iniciais
-    carregar_contas(tree_contas)
+    canvas.create_text(700, 30, text="Contas a Receber", font=("Arial", 24))
 
     # Criar notebook (sistema de abas)
-    notebook = ttk.Notebook(window)
+    notebook = ttk.Notebook(canvas)
     canvas.create_window(700, 350, window=notebook, width=800, height=600)
 
     # Aba de Contas a Receber
@@ -1155,8 +875,7 @@ def abrir_contas_receber():
 
     # Combobox de clientes
     Label(frame_filtros, text="Filtrar por Cliente:", font=("Arial", 12)).pack(side=LEFT, padx=5)
-    combo_filtro_clientes = ttk.Combobox(frame_filtros, width=40)
-    combo_filtro_clientes['values'] = ['Todos os Clientes'] + consultar_clientes()
+    combo_filtro_clientes = cliente_combobox(frame_filtros, ['Todos os Clientes'])
     combo_filtro_clientes.set('Todos os Clientes')
     combo_filtro_clientes.pack(side=LEFT, padx=5)
 
@@ -1165,6 +884,12 @@ def abrir_contas_receber():
                         font=("Arial", 12), bg="#2196F3", fg="white")
     btn_filtrar.pack(side=LEFT, padx=5)
 
+    btn_exportar = Button(frame_filtros, text="Exportar CSV",
+                          command=lambda: exportar_csv(exportar_contas, "contas_a_receber.csv",
+                                                       ler_filtros(combo_filtro_clientes.get())[0]),
+                          font=("Arial", 12), bg="#2196F3", fg="white")
+    btn_exportar.pack(side=LEFT, padx=5)
+
     # Tabela de contas a receber
     tree_contas = ttk.Treeview(tab_contas, 
                               columns=("ID", "Data", "Cliente", "Total", "Pago", "Saldo"),
@@ -1211,8 +936,7 @@ def abrir_contas_receber():
     frame_filtros_historico.pack(pady=10)
 
     Label(frame_filtros_historico, text="Filtrar por Cliente:", font=("Arial", 12)).pack(side=LEFT, padx=5)
-    combo_filtro_historico = ttk.Combobox(frame_filtros_historico, width=40)
-    combo_filtro_historico['values'] = ['Todos os Clientes'] + consultar_clientes()
+    combo_filtro_historico = cliente_combobox(frame_filtros_historico, ['Todos os Clientes'])
     combo_filtro_historico.set('Todos os Clientes')
     combo_filtro_historico.pack(side=LEFT, padx=5)
 
@@ -1235,6 +959,14 @@ def abrir_contas_receber():
                                  font=("Arial", 12), bg="#2196F3", fg="white")
     btn_filtrar_historico.pack(side=LEFT, padx=5)
 
+    btn_exportar_historico = Button(frame_filtros_historico, text="Exportar CSV",
+                                    command=lambda: exportar_csv(
+                                        exportar_pagamentos, "pagamentos.csv",
+                                        *ler_filtros(combo_filtro_historico.get(),
+                                                     data_inicial.get(), data_final.get())),
+                                    font=("Arial", 12), bg="#2196F3", fg="white")
+    btn_exportar_historico.pack(side=LEFT, padx=5)
+
     # Tabela de histórico de pagamentos
     tree_historico = ttk.Treeview(tab_historico, 
                                  columns=("ID", "Data Pagamento", "Cliente", "Venda", "Valor Pago"),
@@ -1255,105 +987,57 @@ def abrir_contas_receber():
 
     tree_historico.pack(pady=10, padx=10, fill=BOTH, expand=True)
 
-    # Carregar dados iniciais
-    carregar_contas(tree_contas)
-    carregar_historico_pagamentos(tree_historico)
+    # Resumo abaixo das abas
+    frame_resumo = Frame(canvas)
+    canvas.create_window(700, 690, window=frame_resumo, width=800)
+    label_total_receber = Label(frame_resumo, text="Total a Receber: ...", font=("Arial", 12))
+    label_total_receber.pack(pady=5)
 
-def carregar_historico_pagamentos(tree, cliente_filtro=None, data_inicial=None, data_final=None):
-    """Carrega o histórico de pagamentos na tabela"""
-    for item in tree.get_children():
-        tree.delete(item)
-
-    conn = create_connection()
-    cursor = conn.cursor()
-
-    query = """
-        SELECT 
-            p.id,
-            p.data_pagamento,
-            c.nome,
-            p.venda_id,
-            p.valor_pago
-        FROM pagamentos p
-        JOIN clientes c ON p.cliente_id = c.codigo_cliente
-        WHERE 1=1
-    """
-    params = []
+    # Ao voltar para a tela, os filtros escolhidos continuam valendo
+    def atualizar():
+        filtrar_contas(tree_contas, combo_filtro_clientes.get())
+        filtrar_historico_pagamentos(tree_historico, combo_filtro_historico.get(),
+                                     data_inicial.get(), data_final.get())
+        recarregar_sugestoes(combo_filtro_clientes, combo_filtro_historico)
+
+    return atualizar
 
+def formatar_pagamentos(pagamentos):
+    datas = formatar_data_hora([pagamento[4] for pagamento in pagamentos])
+    return [(pagamento_id, data, cliente, f"#{venda_id}", f"R$ {valor:.2f}")
+            for (pagamento_id, cliente, venda_id, valor, _), data in zip(pagamentos, datas)]
+
+def ler_filtros(cliente_filtro, data_inicial=None, data_final=None):
+    """Converte os filtros da tela em (codigo_cliente, data_inicial, data_final)"""
+    codigo_cliente = None
     if cliente_filtro and cliente_filtro != 'Todos os Clientes':
         codigo_cliente = cliente_filtro.split(' - ')[0]
-        query += " AND c.codigo_cliente = ?"
-        params.append(codigo_cliente)
 
+    # Datas inválidas são ignoradas, como se o campo estivesse vazio
     if data_inicial:
         try:
-            data_inicial = datetime.strptime(data_inicial, "%d/%m/%Y")
-            query += " AND date(p.data_pagamento) >= date(?)"
-            params.append(data_inicial.strftime("%Y-%m-%d"))
+            data_inicial = datetime.strptime(data_inicial, "%d/%m/%Y").date()
         except ValueError:
-            pass
+            data_inicial = None
 
     if data_final:
         try:
-            data_final = datetime.strptime(data_final, "%d/%m/%Y")
-            query += " AND date(p.data_pagamento) <= date(?)"
-            params.append(data_final.strftime("%Y-%m-%d"))
+            data_final = datetime.strptime(data_final, "%d/%m/%Y").date()
         except ValueError:
-            pass
-
-    query += " ORDER BY p.data_pagamento DESC"
+            data_final = None
 
-    cursor.execute(query, params)
-    for row in cursor.fetchall():
-        pagamento_id, data_pagamento, cliente, venda_id, valor = row
-        tree.insert("", "end", values=(
-            pagamento_id,
-            data_pagamento.strftime("%d/%m/%Y %H:%M") if isinstance(data_pagamento, datetime) 
-            else convert_timestamp(data_pagamento.encode()).strftime("%d/%m/%Y %H:%M"),
-            cliente,
-            f"#{venda_id}",
-            f"R$ {valor:.2f}"
-        ))
+    return codigo_cliente, data_inicial or None, data_final or None
 
-    conn.close()
+def carregar_historico_pagamentos(tree, cliente_filtro=None, data_inicial=None, data_final=None):
+    """Carrega o histórico de pagamentos na tabela"""
+    codigo_cliente, data_inicial, data_final = ler_filtros(cliente_filtro, data_inicial, data_final)
+    paginar(tree, montar_consulta_historico, formatar_pagamentos, executor,
+            codigo_cliente=codigo_cliente, data_inicial=data_inicial, data_final=data_final)
 
 def filtrar_historico_pagamentos(tree, cliente_filtro, data_inicial, data_final):
     """Filtra o histórico de pagamentos"""
     carregar_historico_pagamentos(tree, cliente_filtro, data_inicial, data_final)
 
-def verificar_estrutura_banco():
-    """Verifica se as tabelas necessárias existem e estão corretas"""
-    conn = create_connection()
-    cursor = conn.cursor()
-    
-    # Verificar tabela de vendas
-    cursor.execute("""
-        SELECT name FROM sqlite_master 
-        WHERE type='table' AND name='vendas'
-    """)
-    if not cursor.fetchone():
-        print("Tabela de vendas não encontrada!")
-        return False
-    
-    # Verificar tabela de pagamentos
-    cursor.execute("""
-        SELECT name FROM sqlite_master 
-        WHERE type='table' AND name='pagamentos'
-    """)
-    if not cursor.fetchone():
-        print("Tabela de pagamentos não encontrada!")
-        return False
-    
-    # Verificar se existem vendas
-    cursor.execute("SELECT COUNT(*) FROM vendas")
-    num_vendas = cursor.fetchone()[0]
-    
-    conn.close()
-    return True
-
-# Chamar esta função no início do programa
-verificar_estrutura_banco()
-
 def remover_item_venda(event=None):
     """Remove um item selecionado da venda atual"""
     selected_item = tree_itens_venda.selection()
@@ -1363,7 +1047,9 @@ def remover_item_venda(event=None):
 
     resposta = messagebox.askyesno("Confirmar exclusão", "Tem certeza que deseja remover este item?")
     if resposta:
-        tree_itens_venda.delete(selected_item)
+        for linha in selected_item:
+            carrinho.remover(linha)
+        tree_itens_venda.delete(*selected_item)
         atualizar_label_total()  # Atualiza o total da venda após remover o item
 
 def editar_item_venda(event=None):
@@ -1373,10 +1059,9 @@ def editar_item_venda(event=None):
         messagebox.showwarning("Aviso", "Por favor, selecione um item para editar.")
         return
 
-    # Obter valores atuais
-    valores = tree_itens_venda.item(selected_item)['values']
-    produto_id = valores[0]
-    quantidade_atual = valores[2]
+    # Obter valores atuais; a linha tem o id do produto
+    produto_id = int(selected_item[0])
+    quantidade_atual = carrinho.quantidade_de(produto_id)
 
     # Criar janela de edição
     janela_edicao = Toplevel()
@@ -1396,32 +1081,14 @@ def editar_item_venda(event=None):
                 raise ValueError("A quantidade deve ser maior que zero")
 
             # Verificar estoque e preço atual
-            conn = create_connection()
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT quantidade, preco_venda, promocao, preco_promocional 
-                FROM produtos 
-                WHERE id = ?
-            """, (produto_id,))
-            estoque_atual, preco_normal, em_promocao, preco_promocional = cursor.fetchone()
-            conn.close()
+            estoque_atual, preco_venda = atualizar_estoque_e_valor(produto_id)
 
             if estoque_atual < nova_quantidade:
                 messagebox.showerror("Erro", f"Estoque insuficiente. Disponível: {estoque_atual}")
                 return
 
-            # Determinar qual preço usar
-            preco_venda = preco_promocional if em_promocao and preco_promocional is not None else preco_normal
-
-            # Atualizar item na tabela
-            subtotal = nova_quantidade * preco_venda
-            tree_itens_venda.item(selected_item, values=(
-                produto_id,
-                valores[1],  # Nome do produto permanece o mesmo
-                nova_quantidade,
-                f"{preco_venda:.2f}",
-                f"{subtotal:.2f}"
-            ))
+            # Atualizar item no carrinho e na tabela
+            exibir_item_carrinho(carrinho.alterar(produto_id, nova_quantidade, preco_venda))
 
             atualizar_label_total()
             janela_edicao.destroy()
@@ -1432,68 +1099,28 @@ def editar_item_venda(event=None):
     Button(janela_edicao, text="Salvar", command=salvar_edicao,
            bg="#4CAF50", fg="white").pack(pady=10)
 
-def adicionar_coluna_data_cadastro():
-    """Adiciona a coluna data_cadastro na tabela clientes se ela não existir"""
-    conn = create_connection()
-    cursor = conn.cursor()
-    
-    try:
-        # Verificar se a coluna existe
-        cursor.execute("PRAGMA table_info(clientes)")
-        colunas = [info[1] for info in cursor.fetchall()]
-        
-        if 'data_cadastro' not in colunas:
-            cursor.execute("""
-                ALTER TABLE clientes
-                ADD COLUMN data_cadastro TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            """)
-            conn.commit()
-            print("Coluna data_cadastro adicionada com sucesso!")
-    except sqlite3.Error as e:
-        print(f"Erro ao adicionar coluna: {e}")
-    finally:
-        conn.close()
-
-# Chamar esta função ao iniciar o programa
-adicionar_coluna_data_cadastro()
-
 def calcular_total_receber():
     """Calcula o total de valores a receber"""
-    conn = create_connection()
-    cursor = conn.cursor()
+    cursor = obter_conexao().cursor()
     
     try:
-        # Calcula o total de vendas
-        cursor.execute("""
-            SELECT COALESCE(SUM(valor_total), 0)
-            FROM vendas
-        """)
-        total_vendas = cursor.fetchone()[0]
-        
-        # Calcula o total já pago
-        cursor.execute("""
-            SELECT COALESCE(SUM(valor_pago), 0)
-            FROM pagamentos
-        """)
-        total_pago = cursor.fetchone()[0]
-        
-        # O total a receber é a diferença
-        total_receber = total_vendas - total_pago
+        # Soma os saldos mantidos pelos gatilhos de pagamentos
+        cursor.execute(SQL_TOTAL_A_RECEBER)
+        total_receber = cursor.fetchone()[0]
         
         return total_receber
         
     except sqlite3.Error as e:
         print(f"Erro ao calcular total a receber: {e}")
         return 0.0
-    finally:
-        conn.close()
 
 def atualizar_total_receber():
     """Atualiza o label com o total a receber"""
     global label_total_receber
     if 'label_total_receber' in globals():
-        total = calcular_total_receber()
-        label_total_receber.config(text=f"Total a Receber: R$ {total:.2f}")
+        executor.executar(calcular_total_receber, chave='total_receber',
+                          ao_concluir=lambda total: label_total_receber.config(
+                              text=f"Total a Receber: R$ {total:.2f}"))
 
 def registrar_pagamento(tree, entry_valor):
     """Registra um novo pagamento"""
@@ -1511,148 +1138,50 @@ def registrar_pagamento(tree, entry_valor):
         return
 
     venda_id = tree.item(selected_item)['values'][0]
-    
-    conn = create_connection()
-    cursor = conn.cursor()
-    
-    try:
-        # Obter informações da venda
-        cursor.execute("""
-            SELECT v.cliente_id, v.valor_total, 
-                   (SELECT COALESCE(SUM(valor_pago), 0) FROM pagamentos WHERE venda_id = v.id)
-            FROM vendas v
-            WHERE v.id = ?
-        """, (venda_id,))
-        
-        cliente_id, valor_total, valor_ja_pago = cursor.fetchone()
-        saldo = valor_total - valor_ja_pago
 
-        if valor > saldo:
-            messagebox.showerror("Erro", f"Valor excede o saldo devedor (R$ {saldo:.2f})")
-            return
-
-        # Registrar o pagamento
-        agora = datetime.now(FUSO_HORARIO)
-        cursor.execute("""
-            INSERT INTO pagamentos (cliente_id, venda_id, valor_pago, data_pagamento)
-            VALUES (?, ?, ?, ?)
-        """, (cliente_id, venda_id, valor, agora))
-
-        conn.commit()
+    def concluido(_):
         messagebox.showinfo("Sucesso", "Pagamento registrado com sucesso!")
         
         # Limpar campo de valor
         entry_valor.delete(0, END)
         
-        # Atualizar as tabelas
-        carregar_contas(tree)
+        # Relê só as linhas exibidas: a paga some ou muda de saldo, o resto fica como está
+        recarregar(tree)
         atualizar_total_receber()
-        
 
-            
-    except sqlite3.Error as e:
-        conn.rollback()
-        messagebox.showerror("Erro", f"Erro ao registrar pagamento: {str(e)}")
-    finally:
-        conn.close()
-
-def carregar_contas(tree):
-    """Carrega as contas a receber na tabela"""
-    for item in tree.get_children():
-        tree.delete(item)
-
-    conn = create_connection()
-    cursor = conn.cursor()
-    
-    try:
-        cursor.execute("""
-            SELECT 
-                v.id,
-                v.data_venda,
-                c.nome,
-                v.valor_total,
-                COALESCE((SELECT SUM(valor_pago) FROM pagamentos WHERE venda_id = v.id), 0) as valor_pago,
-                v.valor_total - COALESCE((SELECT SUM(valor_pago) FROM pagamentos WHERE venda_id = v.id), 0) as saldo
-            FROM vendas v
-            JOIN clientes c ON v.cliente_id = c.codigo_cliente
-            WHERE v.valor_total > COALESCE((SELECT SUM(valor_pago) FROM pagamentos WHERE venda_id = v.id), 0)
-            ORDER BY v.data_venda DESC
-        """)
-        
-        for row in cursor.fetchall():
-            venda_id, data_venda, cliente, valor_total, valor_pago, saldo = row
-            
-            # Converter e formatar a data
-            if isinstance(data_venda, datetime):
-                data_formatada = data_venda.strftime("%d/%m/%Y %H:%M")
-            else:
-                data_formatada = convert_timestamp(data_venda.encode()).strftime("%d/%m/%Y %H:%M")
-            
-            tree.insert("", "end", values=(
-                venda_id,
-                data_formatada,
-                cliente,
-                f"R$ {valor_total:.2f}",
-                f"R$ {valor_pago:.2f}",
-                f"R$ {saldo:.2f}"
-            ))
-            
-    except sqlite3.Error as e:
-        print(f"Erro ao carregar contas: {e}")
-    finally:
-        conn.close()
+    def falhou(e):
+        if isinstance(e, ValueError):
+            messagebox.showerror("Erro", str(e))
+        else:
+            messagebox.showerror("Erro", f"Erro ao registrar pagamento: {str(e)}")
+
+    executor.executar(gravar_pagamento, venda_id, valor,
+                      ao_concluir=concluido, ao_falhar=falhou, cancelavel=False)
+
+def formatar_contas(contas):
+    datas = formatar_data_hora([conta[5] for conta in contas])
+    return [
+        (
+            venda_id,
+            data,
+            cliente,
+            f"R$ {valor_total:.2f}",
+            f"R$ {valor_pago:.2f}",
+            f"R$ {saldo:.2f}"
+        )
+        for (venda_id, cliente, valor_total, valor_pago, saldo, _), data in zip(contas, datas)
+    ]
 
 def filtrar_contas(tree, cliente_filtro):
     """Filtra as contas a receber por cliente"""
-    for item in tree.get_children():
-        tree.delete(item)
-
-    conn = create_connection()
-    cursor = conn.cursor()
-    
     try:
-        query = """
-            SELECT 
-                v.id,
-                v.data_venda,
-                c.nome,
-                v.valor_total,
-                COALESCE((SELECT SUM(valor_pago) FROM pagamentos WHERE venda_id = v.id), 0) as valor_pago,
-                v.valor_total - COALESCE((SELECT SUM(valor_pago) FROM pagamentos WHERE venda_id = v.id), 0) as saldo
-            FROM vendas v
-            JOIN clientes c ON v.cliente_id = c.codigo_cliente
-            WHERE v.valor_total > COALESCE((SELECT SUM(valor_pago) FROM pagamentos WHERE venda_id = v.id), 0)
-        """
-        
-        params = []
+        codigo_cliente = None
         
         # Adicionar filtro de cliente se não for "Todos os Clientes"
         if cliente_filtro and cliente_filtro != 'Todos os Clientes':
             codigo_cliente = cliente_filtro.split(' - ')[0]
-            query += " AND c.codigo_cliente = ?"
-            params.append(codigo_cliente)
-            
-        query += " ORDER BY v.data_venda DESC"
-        
-        cursor.execute(query, params)
-        
-        for row in cursor.fetchall():
-            venda_id, data_venda, cliente, valor_total, valor_pago, saldo = row
             
-            # Converter e formatar a data
-            if isinstance(data_venda, datetime):
-                data_formatada = data_venda.strftime("%d/%m/%Y %H:%M")
-            else:
-                data_formatada = convert_timestamp(data_venda.encode()).strftime("%d/%m/%Y %H:%M")
-            
-            tree.insert("", "end", values=(
-                venda_id,
-                data_formatada,
-                cliente,
-                f"R$ {valor_total:.2f}",
-                f"R$ {valor_pago:.2f}",
-                f"R$ {saldo:.2f}"
-            ))
+        paginar(tree, montar_consulta_contas, formatar_contas, executor, codigo_cliente=codigo_cliente)
             
         # Atualizar o total após a filtragem
         atualizar_total_receber()
@@ -1660,42 +1189,18 @@ def filtrar_contas(tree, cliente_filtro):
     except sqlite3.Error as e:
         print(f"Erro ao filtrar contas: {e}")
         messagebox.showerror("Erro", f"Erro ao filtrar contas: {str(e)}")
-    finally:
-        conn.close()
-
-def adicionar_coluna_promocao():
-    """Adiciona a coluna promocao na tabela produtos se ela não existir"""
-    conn = create_connection()
-    cursor = conn.cursor()
-    
-    try:
-        # Verificar se a coluna existe
-        cursor.execute("PRAGMA table_info(produtos)")
-        colunas = [info[1] for info in cursor.fetchall()]
-        
-        if 'promocao' not in colunas:
-            cursor.execute("""
-                ALTER TABLE produtos
-                ADD COLUMN promocao INTEGER DEFAULT 0
-            """)
-            conn.commit()
-            print("Coluna promocao adicionada com sucesso!")
-    except sqlite3.Error as e:
-        print(f"Erro ao adicionar coluna: {e}")
-    finally:
-        conn.close()
 
 def abrir_promocoes():
     """Abre a tela de promoções"""
+    mostrar_tela("promocoes")
+
+def construir_tela_promocoes(canvas):
     global tree_promocoes
-    
-    # Limpar canvas e configurar background
-    canvas.delete("all")
-    canvas.create_image(0, 0, image=FotoBG, anchor="nw")
+
     canvas.create_text(700, 30, text="Promoções", font=("Arial", 24))
 
     # Frame principal
-    frame_promocoes = Frame(window)
+    frame_promocoes = Frame(canvas)
     canvas.create_window(700, 350, window=frame_promocoes, width=800)
 
     # Criar notebook para abas
@@ -1738,8 +1243,7 @@ def abrir_promocoes():
 
     # Combobox para selecionar produto
     Label(frame_gerenciar, text="Selecionar Produto:", font=("Arial", 12)).pack(pady=5)
-    combo_produtos = ttk.Combobox(frame_gerenciar, width=40)
-    combo_produtos['values'] = consultar_produtos()
+    combo_produtos = produto_combobox(frame_gerenciar)
     combo_produtos.pack(pady=5)
 
     # Campo para preço promocional
@@ -1767,8 +1271,11 @@ def abrir_promocoes():
                         fg="white")
     btn_remover.pack(side=LEFT, padx=5)
 
-    # Carregar produtos em promoção
-    carregar_produtos_promocao()
+    def atualizar():
+        carregar_produtos_promocao()
+        recarregar_sugestoes(combo_produtos)
+
+    return atualizar
 
 def adicionar_promocao(produto_info, preco_promo):
     """Adiciona um produto à lista de promoções"""
@@ -1782,37 +1289,26 @@ def adicionar_promocao(produto_info, preco_promo):
 
         if preco_promocional <= 0:
             raise ValueError("O preço promocional deve ser maior que zero")
+    except ValueError as e:
+        messagebox.showerror("Erro", f"Valor inválido: {str(e)}")
+        return
 
-        conn = create_connection()
-        cursor = conn.cursor()
-
-        # Verificar preço atual
-        cursor.execute("SELECT preco_venda FROM produtos WHERE id = ?", (produto_id,))
-        preco_atual = cursor.fetchone()[0]
-
-        if preco_promocional >= preco_atual:
-            messagebox.showerror("Erro", "O preço promocional deve ser menor que o preço normal.")
-            return
-
-        # Atualizar produto como em promoção
-        cursor.execute("""
-            UPDATE produtos 
-            SET promocao = 1, preco_promocional = ? 
-            WHERE id = ?
-        """, (preco_promocional, produto_id))
-
-        conn.commit()
+    def concluido(promocao):
         messagebox.showinfo("Sucesso", "Produto adicionado à promoção!")
         
-        # Atualizar a tabela
-        carregar_produtos_promocao()
+        # Só a linha do produto muda na tabela
+        atualizar_linhas(tree_promocoes, formatar_promocoes([promocao]))
 
-    except ValueError as e:
-        messagebox.showerror("Erro", f"Valor inválido: {str(e)}")
-    except sqlite3.Error as e:
-        messagebox.showerror("Erro", f"Erro ao adicionar promoção: {str(e)}")
-    finally:
-        conn.close()
+    # Os erros saem da transação como ValueError e só são mostrados depois
+    # de ela ser desfeita, sem segurar a trava de escrita
+    def falhou(e):
+        if isinstance(e, ValueError):
+            messagebox.showerror("Erro", str(e))
+        else:
+            messagebox.showerror("Erro", f"Erro ao adicionar promoção: {str(e)}")
+
+    executor.executar(colocar_em_promocao, produto_id, preco_promocional,
+                      ao_concluir=concluido, ao_falhar=falhou, cancelavel=False)
 
 def remover_promocao(produto_info):
     """Remove um produto da lista de promoções"""
@@ -1820,121 +1316,113 @@ def remover_promocao(produto_info):
         messagebox.showerror("Erro", "Por favor, selecione um produto.")
         return
 
-    try:
-        produto_id = produto_info.split(' - ')[0]
-        
-        conn = create_connection()
-        cursor = conn.cursor()
-
-        # Remover produto da promoção
-        cursor.execute("""
-            UPDATE produtos 
-            SET promocao = 0, preco_promocional = NULL 
-            WHERE id = ?
-        """, (produto_id,))
+    produto_id = produto_info.split(' - ')[0]
 
-        conn.commit()
+    def concluido(_):
         messagebox.showinfo("Sucesso", "Produto removido da promoção!")
         
-        # Atualizar a tabela
-        carregar_produtos_promocao()
+        # Só a linha do produto sai da tabela
+        if tree_promocoes.exists(produto_id):
+            remover_linhas(tree_promocoes, [produto_id])
 
-    except sqlite3.Error as e:
+    def falhou(e):
         messagebox.showerror("Erro", f"Erro ao remover promoção: {str(e)}")
-    finally:
-        conn.close()
 
-def carregar_produtos_promocao():
-    """Carrega os produtos em promoção na tabela"""
-    for item in tree_promocoes.get_children():
-        tree_promocoes.delete(item)
+    executor.executar(retirar_da_promocao, produto_id,
+                      ao_concluir=concluido, ao_falhar=falhou, cancelavel=False)
 
-    conn = create_connection()
-    cursor = conn.cursor()
+def formatar_promocoes(promocoes):
+    return [(produto_id, tipo, cor, tamanho, f"R$ {preco_normal:.2f}", f"R$ {preco_promo:.2f}")
+            for produto_id, tipo, cor, tamanho, preco_normal, preco_promo in promocoes]
 
-    try:
-        cursor.execute("""
-            SELECT id, tipo, cor, tamanho, preco_venda, preco_promocional
-            FROM produtos
-            WHERE promocao = 1
-            ORDER BY tipo, cor, tamanho
-        """)
-
-        for row in cursor.fetchall():
-            produto_id, tipo, cor, tamanho, preco_normal, preco_promo = row
-            tree_promocoes.insert("", "end", values=(
-                produto_id,
-                tipo,
-                cor,
-                tamanho,
-                f"R$ {preco_normal:.2f}",
-                f"R$ {preco_promo:.2f}"
-            ))
-
-    except sqlite3.Error as e:
-        print(f"Erro ao carregar produtos em promoção: {e}")
-    finally:
-        conn.close()
-
-def adicionar_colunas_promocao():
-    """Adiciona as colunas necessárias para promoções na tabela produtos"""
-    conn = create_connection()
-    cursor = conn.cursor()
-    
-    try:
-        cursor.execute("PRAGMA table_info(produtos)")
-        colunas = [info[1] for info in cursor.fetchall()]
-        
-        if 'promocao' not in colunas:
-            cursor.execute("""
-                ALTER TABLE produtos
-                ADD COLUMN promocao INTEGER DEFAULT 0
-            """)
-        
-        if 'preco_promocional' not in colunas:
-            cursor.execute("""
-                ALTER TABLE produtos
-                ADD COLUMN preco_promocional REAL
-            """)
-            
-        conn.commit()
-    except sqlite3.Error:
-        pass
-    finally:
-        conn.close()
+def carregar_produtos_promocao():
+    """Carrega os produtos em promoção na tabela, mexendo só nas linhas que mudaram.
 
-adicionar_colunas_promocao()
+    Lida pelo índice parcial: o custo acompanha o número de promoções, não o
+    de produtos. Depois de adicionar ou remover uma promoção, só a linha do
+    produto é refeita.
+    """
+    executor.executar(listar_promocoes, chave='tabela_promocoes',
+                      ao_concluir=lambda promocoes: sincronizar(tree_promocoes, formatar_promocoes(promocoes)),
+                      ao_falhar=lambda e: print(f"Erro ao carregar produtos em promoção: {e}"))
 
 window = Tk()
 window.geometry("1200x740")
 window.configure(bg = "#F8EBFF")
 
-FotoBG = PhotoImage(file=r"assets/Background.png")
-FotoClientes = PhotoImage(file=r"assets/Clientes.png")
-FotoProdutos = PhotoImage(file=r"assets/Produtos.png")
-FotoVendas = PhotoImage(file=r"assets/Vendas.png")
-FotoRelatorios = PhotoImage(file=r"assets/Relatorios.png")
-FotoContasAReceber = PhotoImage(file=r"assets/ContasAReceber.png")
-FotoPromocoes = PhotoImage(file=r"assets/Promocoes.png")
-
 canvas = Canvas(window, width=1200, height=740)
 canvas.pack(fill="both", expand=True)
-canvas.create_image(0, 0, image=FotoBG, anchor="nw")
 
-BtnClientes = Button(window, text='Clientes', image=FotoClientes, command=abrir_cadastro_clientes)
+# Indicador exibido enquanto houver consultas em andamento na thread do banco
+label_carregando = Label(window, text="Carregando...", font=("Arial", 10, "italic"), bg="#F8EBFF")
+
+def mostrar_carregando(ocupado):
+    if ocupado:
+        label_carregando.place(x=1190, y=730, anchor="se")
+    else:
+        label_carregando.place_forget()
+
+executor = ExecutorBanco(window, ao_mudar_ocupado=mostrar_carregando)
+
+# Cada tela é construída na primeira visita e depois só reexibida (telas.py)
+telas = GerenciadorTelas(canvas, fundo=lambda: imagem("Background"))
+telas.registrar("clientes", construir_tela_clientes)
+telas.registrar("produtos", construir_tela_produtos)
+telas.registrar("vendas", construir_tela_vendas)
+telas.registrar("contas", construir_tela_contas)
+telas.registrar("promocoes", construir_tela_promocoes)
+telas.registrar("dashboard", construir_tela_dashboard)
+
+def mostrar_tela(nome):
+    # Resultados pedidos pela tela anterior não são mais exibidos
+    executor.cancelar_pendentes()
+    telas.mostrar(nome)
+
+BtnClientes = Button(window, text='Clientes', image=imagem("Clientes"), command=abrir_cadastro_clientes)
 BtnClientes.place(x=52.0, y=80.0)
-BtnProdutos = Button(window, text='Produtos', image=FotoProdutos, command=abrir_cadastro_produtos)
+BtnProdutos = Button(window, text='Produtos', image=imagem("Produtos"), command=abrir_cadastro_produtos)
 BtnProdutos.place(x=52.0, y=180.0)
-BtnVendas = Button(window, text='Vendas', image=FotoVendas, command=abrir_cadastro_vendas)
+BtnVendas = Button(window, text='Vendas', image=imagem("Vendas"), command=abrir_cadastro_vendas)
 BtnVendas.place(x=52.0, y=280.0)
-BtnContasAReceber = Button(window, text='Contas a Receber', image=FotoContasAReceber, command=abrir_contas_receber)
+BtnContasAReceber = Button(window, text='Contas a Receber', image=imagem("ContasAReceber"), command=abrir_contas_receber)
 BtnContasAReceber.place(x=52.0, y=380.0)
-BtnPromocoes = Button(window, text='Promoções', image=FotoPromocoes, command=abrir_promocoes)
+BtnPromocoes = Button(window, text='Promoções', image=imagem("Promocoes"), command=abrir_promocoes)
 BtnPromocoes.place(x=52.0, y=480.0)
-BtnDashboard = Button(window, text='Dashboard', image=FotoRelatorios, command=abrir_dashboard)
+BtnDashboard = Button(window, text='Dashboard', image=imagem("Relatorios"), command=abrir_dashboard)
 BtnDashboard.place(x=52.0, y=580.0)
 
 window.resizable(False, False)
+marcar_etapa("janela")
+
+def desenhar_fundo():
+    """Desenha o fundo da tela inicial"""
+    marcar_etapa("primeira pintura")
+    canvas.create_image(0, 0, image=imagem("Background"), anchor="nw")
+    marcar_etapa("fundo")
+    print(resumo_inicio())
+
+# after_idle roda depois dos redesenhos já pendentes, ou seja, da primeira pintura
+window.after_idle(desenhar_fundo)
+
+def mostrar_rastreamento(event=None):
+    """F12: mostra no console os comandos SQL mais custosos até agora (com LOJA_RASTREAR=1)"""
+    resumo = resumo_rastreamento()
+    print(resumo or "Rastreamento de SQL desligado (LOJA_RASTREAR=1 para ligar)")
+
+window.bind_all("<F12>", mostrar_rastreamento)
+
+def fechar_janela():
+    """Encerra o programa exibindo o uso do banco na sessão"""
+    executor.encerrar()
+    print(resumo_estatisticas())
+    print(resumo_latencias())
+    rastreamento = resumo_rastreamento()
+    if rastreamento:
+        print(rastreamento)
+    fechar_conexoes()
+    window.destroy()
+
+window.protocol("WM_DELETE_WINDOW", fechar_janela)
 
 try:
     import pyi_splash
@@ -1943,6 +1431,3 @@ except ImportError:
     pass
 
 window.mainloop()
-
-#TODO - Criar a bag de produtos
-#TODO - Autocomplete no nome dos clientes e produtos no cadastro de vendas
\ No newline at end of file
@@ -0,0 +1,333 @@
+import csv
+import json
+import os
+import re
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Optional
+from banco import FUSO_HORARIO, transacao, resumo_estatisticas, fechar_conexoes
+from consultas import (SQL_CHAVES_PRODUTOS, SQL_CHAVES_PRODUTOS_NOVOS, SQL_ULTIMO_PRODUTO,
+                       SQL_CHAVES_CLIENTES, SQL_CHAVES_CLIENTES_NOVOS, SQL_ULTIMO_CLIENTE)
+from catalogo import catalogo
+from esquema import busca_em_lote
+from sugestoes import normalizar, palavras
+
+
+# Uso: python importacao.py produtos|clientes arquivo.csv [--atualizar]
+# Importa um CSV com cabeçalho, separado por vírgula ou ponto e vírgula.
+# Colunas de produtos: tipo, cor, tamanho, preco_custo, preco_venda,
+# quantidade. Colunas de clientes: nome, telefone. Maiúsculas, acentos e
+# "de" no cabeçalho não importam ("Preço de Custo" serve).
+#
+# O arquivo é lido em fluxo e gravado em lotes de LOTE linhas com
+# executemany, tudo numa única transação: ou o arquivo inteiro entra, ou
+# nada entra. Durante a importação a busca textual é atualizada por lote, e
+# não pelos gatilhos linha a linha (ver esquema.busca_em_lote). Linhas
+# inválidas não interrompem a importação; vão para <arquivo>.rejeitados.csv
+# com o número da linha e o motivo.
+#
+# Com --atualizar, uma linha cuja chave já existe atualiza o cadastro em vez
+# de criar outro: produtos pela combinação tipo, cor e tamanho (sem
+# diferenciar maiúsculas e acentos) e clientes pelo telefone (só os
+# dígitos). Clientes sem telefone sempre são incluídos.
+LOTE = 5000
+
+SQL_INSERIR_PRODUTO = """
+    INSERT INTO produtos (tipo, cor, tamanho, preco_custo, preco_venda, quantidade)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+SQL_ATUALIZAR_PRODUTO = """
+    UPDATE produtos
+    SET tipo = ?, cor = ?, tamanho = ?, preco_custo = ?, preco_venda = ?, quantidade = ?
+    WHERE id = ?
+"""
+
+SQL_INSERIR_CLIENTE = """
+    INSERT INTO clientes (nome, telefone, data_cadastro)
+    VALUES (?, ?, ?)
+"""
+
+SQL_ATUALIZAR_CLIENTE = """
+    UPDATE clientes
+    SET nome = ?, telefone = ?
+    WHERE codigo_cliente = ?
+"""
+
+_NAO_DIGITO = re.compile(r'\D')
+
+def ler_texto(valor, campo, obrigatorio=False):
+    texto = valor.strip()
+    if obrigatorio and not texto:
+        raise ValueError(f"{campo} vazio")
+    return texto
+
+def ler_numero(valor, campo):
+    """Aceita '10.50', '10,50', '1.234,56' e 'R$ 10,50'; não aceita negativos"""
+    texto = valor.strip().removeprefix("R$").strip()
+    if "," in texto:
+        texto = texto.replace(".", "").replace(",", ".")
+    try:
+        numero = float(texto)
+    except ValueError:
+        raise ValueError(f"{campo} inválido: '{valor}'") from None
+    if not numero >= 0:
+        raise ValueError(f"{campo} menor que zero: '{valor}'")
+    return round(numero, 2)
+
+def ler_inteiro(valor, campo):
+    try:
+        numero = int(valor.strip())
+    except ValueError:
+        raise ValueError(f"{campo} inválido: '{valor}'") from None
+    if numero < 0:
+        raise ValueError(f"{campo} menor que zero: '{valor}'")
+    return numero
+
+def validar_produto(campos):
+    return (ler_texto(campos["tipo"], "tipo", obrigatorio=True),
+            ler_texto(campos["cor"], "cor"),
+            ler_texto(campos["tamanho"], "tamanho"),
+            ler_numero(campos["preco_custo"], "preco_custo"),
+            ler_numero(campos["preco_venda"], "preco_venda"),
+            ler_inteiro(campos["quantidade"], "quantidade"))
+
+def chave_produto(tipo, cor, tamanho, *_):
+    return (normalizar(tipo).strip(), normalizar(cor or "").strip(), normalizar(tamanho or "").strip())
+
+def validar_cliente(campos):
+    telefone = ler_texto(campos["telefone"], "telefone") or "-"
+    return (ler_texto(campos["nome"], "nome", obrigatorio=True), telefone,
+            datetime.now(FUSO_HORARIO))
+
+def chave_cliente(nome, telefone, *_):
+    digitos = _NAO_DIGITO.sub("", telefone or "")
+    return digitos if len(digitos) >= 8 else None
+
+@dataclass(frozen=True)
+class Modelo:
+    """Como validar, identificar e gravar as linhas de uma tabela"""
+    tabela: str
+    obrigatorias: tuple
+    opcionais: tuple
+    validar: Callable
+    chave: Callable
+    sql_inserir: str
+    sql_atualizar: str
+    # Valores de sql_atualizar sem o id (que vai no fim)
+    valores_atualizacao: Callable
+    sql_chaves: str
+    sql_chaves_novas: str
+    sql_ultimo: str
+
+PRODUTOS = Modelo(
+    tabela="produtos",
+    obrigatorias=("tipo", "preco_custo", "preco_venda", "quantidade"),
+    opcionais=("cor", "tamanho"),
+    validar=validar_produto,
+    chave=chave_produto,
+    sql_inserir=SQL_INSERIR_PRODUTO,
+    sql_atualizar=SQL_ATUALIZAR_PRODUTO,
+    valores_atualizacao=lambda valores: valores,
+    sql_chaves=SQL_CHAVES_PRODUTOS,
+    sql_chaves_novas=SQL_CHAVES_PRODUTOS_NOVOS,
+    sql_ultimo=SQL_ULTIMO_PRODUTO,
+)
+
+CLIENTES = Modelo(
+    tabela="clientes",
+    obrigatorias=("nome",),
+    opcionais=("telefone",),
+    validar=validar_cliente,
+    chave=chave_cliente,
+    sql_inserir=SQL_INSERIR_CLIENTE,
+    sql_atualizar=SQL_ATUALIZAR_CLIENTE,
+    # A data de cadastro de quem já era cliente não muda
+    valores_atualizacao=lambda valores: valores[:2],
+    sql_chaves=SQL_CHAVES_CLIENTES,
+    sql_chaves_novas=SQL_CHAVES_CLIENTES_NOVOS,
+    sql_ultimo=SQL_ULTIMO_CLIENTE,
+)
+
+@dataclass
+class ResultadoImportacao:
+    lidas: int = 0
+    inseridas: int = 0
+    atualizadas: int = 0
+    rejeitadas: int = 0
+    arquivo_rejeitados: Optional[str] = None
+    segundos: float = 0.0
+
+    def resumo(self):
+        texto = (f"{self.lidas} linhas lidas em {self.segundos:.1f} s: {self.inseridas} incluídas, "
+                 f"{self.atualizadas} atualizadas, {self.rejeitadas} rejeitadas")
+        if self.arquivo_rejeitados:
+            texto += f" (ver {self.arquivo_rejeitados})"
+        return texto
+
+class Rejeitados:
+    """Grava as linhas rejeitadas num CSV ao lado do importado, criado só se preciso"""
+
+    def __init__(self, caminho, cabecalho, dialeto):
+        self.caminho = os.path.splitext(caminho)[0] + ".rejeitados.csv"
+        self.cabecalho = cabecalho
+        self.dialeto = dialeto
+        self._arquivo = None
+        self._escritor = None
+
+    def gravar(self, numero, linha, motivo):
+        if self._arquivo is None:
+            self._arquivo = open(self.caminho, "w", newline="", encoding="utf-8-sig")
+            self._escritor = csv.writer(self._arquivo, self.dialeto)
+            self._escritor.writerow(["linha", "motivo", *self.cabecalho])
+        self._escritor.writerow([numero, motivo, *linha])
+
+    def fechar(self):
+        if self._arquivo is not None:
+            self._arquivo.close()
+            return self.caminho
+        return None
+
+def ler_cabecalho(leitor, modelo):
+    """Retorna o cabeçalho original e a posição de cada coluna conhecida"""
+    cabecalho = next(leitor, None)
+    if not cabecalho:
+        raise ValueError("Arquivo vazio")
+    # "Preço de Custo" vira preco_custo
+    nomes = ["_".join(palavra for palavra in palavras(normalizar(nome)) if palavra not in ("de", "do", "da"))
+             for nome in cabecalho]
+    faltando = [coluna for coluna in modelo.obrigatorias if coluna not in nomes]
+    if faltando:
+        raise ValueError(f"Coluna(s) obrigatória(s) ausente(s): {', '.join(faltando)}")
+    posicoes = {coluna: nomes.index(coluna)
+                for coluna in modelo.obrigatorias + modelo.opcionais if coluna in nomes}
+    return cabecalho, posicoes
+
+def importar(caminho, modelo, atualizar=False, ao_progredir=None):
+    """Importa o CSV para a tabela do modelo e retorna um ResultadoImportacao.
+
+    `ao_progredir(linhas_lidas)` é chamado a cada lote gravado. Erros de
+    arquivo ou de cabeçalho levantam ValueError antes de gravar qualquer
+    linha; um erro de banco desfaz a importação inteira.
+    """
+    inicio = time.perf_counter()
+    resultado = ResultadoImportacao()
+    with open(caminho, newline="", encoding="utf-8-sig") as arquivo:
+        try:
+            dialeto = csv.Sniffer().sniff(arquivo.read(64 * 1024), delimiters=",;\t")
+        except csv.Error:
+            dialeto = csv.excel
+        arquivo.seek(0)
+        leitor = csv.reader(arquivo, dialeto)
+        cabecalho, posicoes = ler_cabecalho(leitor, modelo)
+        rejeitados = Rejeitados(caminho, cabecalho, dialeto)
+
+        try:
+            with transacao("IMMEDIATE") as conn, busca_em_lote(conn, modelo.tabela) as busca:
+                cursor = conn.cursor()
+                existentes = {}
+                if atualizar:
+                    cursor.execute(modelo.sql_chaves)
+                    for linha_id, *valores in cursor:
+                        existentes.setdefault(modelo.chave(*valores), linha_id)
+
+                inclusoes = []
+                # Id -> valores: a mesma linha alterada duas vezes no lote fica com a última
+                alteracoes = {}
+                # Chave -> posição em inclusoes das linhas novas do lote atual
+                pendentes = {}
+
+                def gravar_lote():
+                    if inclusoes:
+                        # A transação é IMMEDIATE: as linhas acima de `ultimo` são deste lote
+                        ultimo = cursor.execute(modelo.sql_ultimo).fetchone()[0]
+                        cursor.executemany(modelo.sql_inserir, inclusoes)
+                        cursor.execute(busca.indexar_novos, (ultimo,))
+                        if atualizar:
+                            cursor.execute(modelo.sql_chaves_novas, (ultimo,))
+                            for linha_id, *valores in cursor:
+                                existentes.setdefault(modelo.chave(*valores), linha_id)
+                    if alteracoes:
+                        ids = json.dumps(list(alteracoes))
+                        cursor.execute(busca.remover, (ids,))
+                        cursor.executemany(modelo.sql_atualizar,
+                                           [(*valores, linha_id) for linha_id, valores in alteracoes.items()])
+                        cursor.execute(busca.indexar, (ids,))
+                    inclusoes.clear()
+                    alteracoes.clear()
+                    pendentes.clear()
+                    if ao_progredir:
+                        ao_progredir(resultado.lidas)
+
+                for numero, linha in enumerate(leitor, start=2):
+                    if not any(campo.strip() for campo in linha):
+                        continue
+                    resultado.lidas += 1
+                    try:
+                        campos = {coluna: linha[posicao] if posicao < len(linha) else ""
+                                  for coluna, posicao in posicoes.items()}
+                        for coluna in modelo.opcionais:
+                            campos.setdefault(coluna, "")
+                        valores = modelo.validar(campos)
+                    except ValueError as e:
+                        resultado.rejeitadas += 1
+                        rejeitados.gravar(numero, linha, str(e))
+                        continue
+
+                    chave = modelo.chave(*valores) if atualizar else None
+                    if chave is not None and chave in existentes:
+                        alteracoes[existentes[chave]] = modelo.valores_atualizacao(valores)
+                        resultado.atualizadas += 1
+                    elif chave is not None and chave in pendentes:
+                        # Repetida no mesmo lote: vale a última linha
+                        inclusoes[pendentes[chave]] = valores
+                        resultado.atualizadas += 1
+                    else:
+                        if chave is not None:
+                            pendentes[chave] = len(inclusoes)
+                        inclusoes.append(valores)
+                        resultado.inseridas += 1
+
+                    if len(inclusoes) + len(alteracoes) >= LOTE:
+                        gravar_lote()
+                gravar_lote()
+        finally:
+            resultado.arquivo_rejeitados = rejeitados.fechar()
+
+    if modelo is PRODUTOS and (resultado.inseridas or resultado.atualizadas):
+        catalogo.invalidar()
+    resultado.segundos = time.perf_counter() - inicio
+    return resultado
+
+def importar_produtos(caminho, atualizar=False, ao_progredir=None):
+    """Importa produtos de um CSV (ver o início deste arquivo)"""
+    return importar(caminho, PRODUTOS, atualizar, ao_progredir)
+
+def importar_clientes(caminho, atualizar=False, ao_progredir=None):
+    """Importa clientes de um CSV (ver o início deste arquivo)"""
+    return importar(caminho, CLIENTES, atualizar, ao_progredir)
+
+def main(argumentos):
+    if len(argumentos) < 2 or argumentos[0] not in ("produtos", "clientes"):
+        print("Uso: python importacao.py produtos|clientes arquivo.csv [--atualizar]")
+        return 2
+    from esquema import preparar_banco
+
+    preparar_banco()
+    importar_tabela = importar_produtos if argumentos[0] == "produtos" else importar_clientes
+    try:
+        resultado = importar_tabela(argumentos[1], "--atualizar" in argumentos[2:],
+                                    ao_progredir=lambda lidas: print(f"\r{lidas} linhas...", end="", flush=True))
+    except (OSError, ValueError) as e:
+        print(f"Erro ao importar: {e}")
+        return 1
+    finally:
+        fechar_conexoes()
+    print("\r" + resultado.resumo())
+    print(resumo_estatisticas())
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
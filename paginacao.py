@@ -0,0 +1,323 @@
+import sqlite3
+from functools import partial
+from banco import obter_conexao
+
+
+# Linhas lidas do banco a cada página
+TAMANHO_PAGINA = 100
+# Máximo de linhas mantidas na tabela; o excesso do lado oposto à rolagem é
+# descartado e relido do banco se o usuário voltar até ele
+MAXIMO_LINHAS = 500
+# Fração da barra de rolagem, perto do fim ou do início, que dispara a
+# leitura da página seguinte ou anterior
+MARGEM_ROLAGEM = 0.1
+
+def _exibidas(tree):
+    """Valores de cada linha da tabela por iid, como foram gravados por estas funções"""
+    exibidas = getattr(tree, 'linhas_exibidas', None)
+    if exibidas is None:
+        exibidas = tree.linhas_exibidas = {}
+    return exibidas
+
+def _linha_do_topo(tree, itens):
+    if not itens:
+        return None
+    primeiro = float(tree.yview()[0])
+    return itens[min(int(primeiro * len(itens) + 0.5), len(itens) - 1)]
+
+def sincronizar(tree, linhas, manter_rolagem=True):
+    """Deixa na tabela exatamente `linhas`, na ordem dada, alterando só o que mudou.
+
+    A primeira coluna de cada linha é a chave primária e vira o iid do item.
+    Linhas iguais às exibidas não são tocadas, e as que continuam mantêm a
+    seleção; com `manter_rolagem`, a linha que estava no topo continua lá.
+    O trabalho na Treeview é proporcional às diferenças, não ao tamanho da
+    tabela. Itens inseridos ou removidos por fora destas funções são
+    refeitos.
+    """
+    exibidas = _exibidas(tree)
+    novas = {str(linha[0]): tuple(linha) for linha in linhas}
+    itens = tree.get_children()
+    topo = _linha_do_topo(tree, itens) if manter_rolagem else None
+
+    sobrando = [item for item in itens if item not in novas or item not in exibidas]
+    if sobrando:
+        tree.delete(*sobrando)
+    mantidos = [item for item in itens if item in novas and item in exibidas]
+    presentes = set(mantidos)
+    for iid in [iid for iid in exibidas if iid not in presentes]:
+        del exibidas[iid]
+
+    # Se as linhas que ficam não mudaram de ordem entre si, cada nova entra
+    # direto na posição final; senão, a ordem é refeita no fim
+    na_ordem = mantidos == [iid for iid in novas if iid in presentes]
+    for posicao, (iid, valores) in enumerate(novas.items()):
+        anteriores = exibidas.get(iid)
+        if anteriores is None:
+            tree.insert("", posicao if na_ordem else "end", iid=iid, values=valores)
+        elif anteriores != valores:
+            tree.item(iid, values=valores)
+        exibidas[iid] = valores
+    if not na_ordem:
+        for posicao, iid in enumerate(novas):
+            tree.move(iid, "", posicao)
+
+    if topo in novas and itens.index(topo) != list(novas).index(topo):
+        tree.yview_moveto(list(novas).index(topo) / len(novas))
+
+def atualizar_linhas(tree, linhas):
+    """Grava na tabela só as `linhas` dadas (chave na primeira coluna); as novas entram no fim"""
+    exibidas = _exibidas(tree)
+    for linha in linhas:
+        iid, valores = str(linha[0]), tuple(linha)
+        anteriores = exibidas.get(iid)
+        if anteriores is None:
+            tree.insert("", "end", iid=iid, values=valores)
+        elif anteriores != valores:
+            tree.item(iid, values=valores)
+        exibidas[iid] = valores
+
+def remover_linhas(tree, itens):
+    """Remove da tabela os itens dados"""
+    tree.delete(*itens)
+    exibidas = _exibidas(tree)
+    for item in itens:
+        exibidas.pop(item, None)
+
+class FontePaginada:
+    """Lê uma consulta em páginas, continuando pela chave (data, id).
+
+    `montar_consulta(apos=, antes=, limite=)` devolve (sql, parâmetros) de
+    uma consulta cuja primeira coluna é o id e a última é a data em
+    segundos UTC; as duas formam a chave. Listagens ordenadas só pelo id
+    repetem o id na última coluna.
+    """
+
+    def __init__(self, montar_consulta, tamanho_pagina=TAMANHO_PAGINA):
+        self.montar_consulta = montar_consulta
+        self.tamanho_pagina = tamanho_pagina
+
+    def _buscar(self, limite=None, **posicao):
+        query, params = self.montar_consulta(limite=limite or self.tamanho_pagina, **posicao)
+        cursor = obter_conexao().cursor()
+        cursor.execute(query, params)
+        return [((linha[-1], linha[0]), linha) for linha in cursor.fetchall()]
+
+    def primeira_pagina(self):
+        """Retorna [(chave, linha)] das linhas mais recentes"""
+        return self._buscar()
+
+    def pagina_seguinte(self, chave):
+        """Retorna as linhas logo abaixo da chave, na ordem de exibição"""
+        return self._buscar(apos=chave)
+
+    def pagina_anterior(self, chave):
+        """Retorna as linhas logo acima da chave, na ordem de exibição"""
+        return self._buscar(antes=chave)[::-1]
+
+    def janela(self, inicio, quantidade):
+        """Retorna `quantidade` linhas a partir da chave `inicio`, inclusive (None: do topo)"""
+        if inicio is None:
+            return self._buscar(quantidade)
+        data, id_ = inicio
+        # Na ordem (data, id) decrescente, nenhuma chave fica entre (data, id + 1) e (data, id)
+        return self._buscar(quantidade, apos=(data, id_ + 1))
+
+class GradePaginada:
+    """Mantém uma Treeview preenchida sob demanda conforme a rolagem.
+
+    Com um executor (ver tarefas.py), as páginas são lidas fora da thread do
+    Tk; sem ele, a leitura é feita na hora.
+    """
+
+    def __init__(self, tree, executor=None, maximo_linhas=MAXIMO_LINHAS):
+        self.tree = tree
+        self.executor = executor
+        self.maximo_linhas = maximo_linhas
+        self.fonte = None
+        self.formatar = None
+        self.chaves = {}
+        self.tem_anteriores = False
+        self.tem_seguintes = False
+        self.carregando = False
+        self.consulta = None
+        tree.configure(yscrollcommand=self._ao_rolar)
+
+    def _buscar(self, exibir, funcao, *args):
+        if self.executor is None:
+            try:
+                exibir(funcao(*args))
+            except sqlite3.Error as e:
+                self._falhou(e)
+        else:
+            # A própria grade é a chave: um novo pedido cancela o anterior
+            self.executor.executar(funcao, *args, ao_concluir=exibir,
+                                   ao_falhar=self._falhou, chave=self)
+
+    def _falhou(self, erro):
+        self.carregando = False
+        print(f"Erro ao carregar página: {erro}")
+
+    def exibir_lista(self, formatar, funcao, *args):
+        """Para de paginar e exibe a lista inteira que funcao(*args) retorna.
+
+        Para listas já limitadas, como o resultado de uma busca. Um pedido de
+        página ainda pendente é cancelado, e a próxima chamada de `paginar`
+        volta a paginar desde o topo.
+        """
+        self.fonte = None
+        self.consulta = None
+        self.chaves = {}
+        self.tem_anteriores = self.tem_seguintes = False
+        self.carregando = False
+        self._buscar(lambda linhas: sincronizar(self.tree, formatar(linhas), manter_rolagem=False),
+                     funcao, *args)
+
+    def carregar(self, fonte, formatar):
+        """Troca a consulta exibida e busca a primeira página"""
+        self.fonte = fonte
+        self.formatar = formatar
+        self.carregando = True
+        self._buscar(self._exibir_primeira, fonte.primeira_pagina)
+
+    def _exibir_primeira(self, linhas):
+        # Linhas que já estavam na tabela e não mudaram não são refeitas
+        sincronizar(self.tree, self.formatar([linha for _, linha in linhas]), manter_rolagem=False)
+        self.tree.yview_moveto(0)
+        self.chaves = {str(chave[1]): chave for chave, _ in linhas}
+        self.tem_anteriores = False
+        self.tem_seguintes = len(linhas) == self.fonte.tamanho_pagina
+        self.carregando = False
+
+    def atualizar(self):
+        """Relê as linhas já exibidas e aplica só as diferenças, mantendo rolagem e seleção.
+
+        O custo depende só de quantas linhas estão na tabela (no máximo
+        maximo_linhas), não do tamanho da consulta. No topo, linhas novas
+        aparecem; mais abaixo, ficam para quando a rolagem chegar até elas.
+        """
+        if self.fonte is None:
+            return
+        itens = self.tree.get_children()
+        if not itens:
+            self.carregar(self.fonte, self.formatar)
+            return
+        inicio = self.chaves.get(itens[0]) if self.tem_anteriores else None
+        # Com o fim da consulta já na tabela, uma página a mais: as linhas
+        # novas do topo não empurram as últimas para fora sem que haja
+        # página seguinte para trazê-las de volta
+        quantidade = len(itens) if self.tem_seguintes else len(itens) + self.fonte.tamanho_pagina
+        self.carregando = True
+        self._buscar(partial(self._exibir_atualizacao, quantidade), self.fonte.janela, inicio, quantidade)
+
+    def _exibir_atualizacao(self, quantidade, linhas):
+        sincronizar(self.tree, self.formatar([linha for _, linha in linhas]))
+        self.chaves = {str(chave[1]): chave for chave, _ in linhas}
+        self.tem_seguintes = len(linhas) == quantidade
+        self.carregando = False
+
+    def _inserir(self, linhas, posicao):
+        # A página é formatada de uma vez, não linha a linha
+        exibidas = _exibidas(self.tree)
+        valores = self.formatar([linha for _, linha in linhas])
+        for (chave, _), linha_formatada in zip(linhas, valores):
+            item = str(chave[1])
+            if item in exibidas:
+                continue
+            self.tree.insert("", posicao, iid=item, values=linha_formatada)
+            exibidas[item] = tuple(linha_formatada)
+            self.chaves[item] = chave
+            posicao += 1
+
+    def _descartar(self, itens):
+        remover_linhas(self.tree, itens)
+        for item in itens:
+            self.chaves.pop(item, None)
+
+    def _ao_rolar(self, primeiro, ultimo):
+        # Chamado pela Treeview sempre que a parte visível muda
+        if self.carregando or self.fonte is None:
+            return
+        if self.tem_seguintes and float(ultimo) >= 1 - MARGEM_ROLAGEM:
+            self.carregando = True
+            self.tree.after_idle(self.carregar_seguinte)
+        elif self.tem_anteriores and float(primeiro) <= MARGEM_ROLAGEM:
+            self.carregando = True
+            self.tree.after_idle(self.carregar_anterior)
+
+    def carregar_seguinte(self):
+        """Busca a página abaixo da última linha exibida"""
+        itens = self.tree.get_children()
+        if not itens:
+            self.carregando = False
+            return
+        self.carregando = True
+        self._buscar(self._exibir_seguinte, self.fonte.pagina_seguinte, self.chaves[itens[-1]])
+
+    def _exibir_seguinte(self, linhas):
+        # Acrescenta no fim e descarta o excesso do topo
+        self._inserir(linhas, len(self.tree.get_children()))
+        self.tem_seguintes = len(linhas) == self.fonte.tamanho_pagina
+
+        itens = self.tree.get_children()
+        excesso = len(itens) - self.maximo_linhas
+        if excesso > 0:
+            self._descartar(itens[:excesso])
+            # Mantém as mesmas linhas visíveis depois de encolher o topo
+            self.tree.yview_scroll(-excesso, "units")
+            self.tem_anteriores = True
+        self.carregando = False
+
+    def carregar_anterior(self):
+        """Busca a página acima da primeira linha exibida"""
+        itens = self.tree.get_children()
+        if not itens:
+            self.carregando = False
+            return
+        self.carregando = True
+        self._buscar(self._exibir_anterior, self.fonte.pagina_anterior, self.chaves[itens[0]])
+
+    def _exibir_anterior(self, linhas):
+        # Acrescenta no topo e descarta o excesso do fim
+        self._inserir(linhas, 0)
+        self.tree.yview_scroll(len(linhas), "units")
+        self.tem_anteriores = len(linhas) == self.fonte.tamanho_pagina
+
+        itens = self.tree.get_children()
+        excesso = len(itens) - self.maximo_linhas
+        if excesso > 0:
+            self._descartar(itens[-excesso:])
+            self.tem_seguintes = True
+        self.carregando = False
+
+def _grade(tree, executor):
+    grade = getattr(tree, 'grade_paginada', None)
+    if grade is None:
+        grade = tree.grade_paginada = GradePaginada(tree, executor)
+    return grade
+
+def paginar(tree, montar_consulta, formatar, executor=None, **filtros):
+    """Exibe a consulta paginada na tabela, reaproveitando a grade já ligada a ela.
+
+    `filtros` são repassados a `montar_consulta` em todas as páginas e
+    `formatar` converte a lista de linhas de uma página na lista de valores
+    das colunas da tabela.
+    """
+    grade = _grade(tree, executor)
+    # A mesma consulta com os mesmos filtros só relê as linhas exibidas
+    consulta = (montar_consulta, filtros)
+    if grade.fonte is not None and grade.consulta == consulta:
+        grade.atualizar()
+        return
+    grade.consulta = consulta
+    grade.carregar(FontePaginada(partial(montar_consulta, **filtros)), formatar)
+
+def recarregar(tree):
+    """Relê as linhas exibidas pela grade paginada ligada à tabela (ver GradePaginada.atualizar)"""
+    grade = getattr(tree, 'grade_paginada', None)
+    if grade is not None:
+        grade.atualizar()
+
+def exibir_lista(tree, formatar, executor, funcao, *args):
+    """Exibe na tabela a lista retornada por funcao(*args), sem paginação (ver GradePaginada.exibir_lista)"""
+    _grade(tree, executor).exibir_lista(formatar, funcao, *args)
@@ -0,0 +1,205 @@
+import logging
+import logging.handlers
+import os
+import re
+import sqlite3
+import sys
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+
+
+# Modo de rastreamento de SQL, ligado com LOJA_RASTREAR=1 (ver banco.py).
+# Cada comando é acompanhado do execute até a última linha lida: tempo,
+# linhas, quem chamou e os gatilhos disparados (set_trace_callback). Os
+# comandos acima de LOJA_LENTO_MS milissegundos vão para o log rotativo
+# LOJA_LOG_LENTAS, com o plano de execução. Desligado, nada disso roda.
+LIMIAR_PADRAO_MS = 50.0
+ARQUIVO_PADRAO = 'consultas_lentas.log'
+TAMANHO_LOG = 1_000_000
+ARQUIVOS_LOG = 3
+# Comandos exibidos no resumo
+LIMITE_RESUMO = 15
+
+# Arquivos que não contam como "quem chamou": a própria camada de banco
+_ARQUIVOS_IGNORADOS = {"banco.py", "rastreamento.py", "contextlib.py"}
+_COM_PLANO = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "REPLACE")
+
+_LITERAL_TEXTO = re.compile(r"'(?:[^']|'')*'")
+_NUMERO = re.compile(r"\b\d+(?:\.\d+)?\b")
+_LISTA_PARAMETROS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_ESPACOS = re.compile(r"\s+")
+
+def normalizar_sql(sql):
+    """Texto do comando sem valores fixos e com espaços uniformes, para agrupar iguais"""
+    sql = _LITERAL_TEXTO.sub("?", sql)
+    sql = _NUMERO.sub("?", sql)
+    sql = _LISTA_PARAMETROS.sub("(?, ...)", sql)
+    return _ESPACOS.sub(" ", sql).strip()
+
+def chamador():
+    """Retorna 'arquivo:linha função' do primeiro quadro fora da camada de banco"""
+    quadro = sys._getframe(2)
+    while quadro is not None:
+        arquivo = os.path.basename(quadro.f_code.co_filename)
+        if arquivo not in _ARQUIVOS_IGNORADOS:
+            return f"{arquivo}:{quadro.f_lineno} {quadro.f_code.co_name}"
+        quadro = quadro.f_back
+    return "?"
+
+@dataclass
+class Registro:
+    """Um comando em andamento: acumula o tempo e as linhas até ser concluído"""
+    sql: str
+    parametros: object
+    chamador: str
+    duracao: float = 0.0
+    linhas: int = 0
+    # Execuções informadas pelo set_trace_callback: o comando, cada
+    # comando de gatilho e, no executemany, cada conjunto de parâmetros
+    execucoes: int = 0
+    gatilhos: list = field(default_factory=list)
+
+@dataclass
+class Totais:
+    chamadas: int = 0
+    tempo_total: float = 0.0
+    tempo_maximo: float = 0.0
+    linhas: int = 0
+    lentas: int = 0
+    chamadores: Counter = field(default_factory=Counter)
+
+class Rastreador:
+    """Totais por comando normalizado e log dos comandos lentos.
+
+    Usado pelos cursores e conexões de banco.py em todas as threads, por
+    isso os totais são protegidos por um lock.
+    """
+
+    def __init__(self, limiar_ms=LIMIAR_PADRAO_MS, arquivo=ARQUIVO_PADRAO):
+        self.limiar = limiar_ms / 1000
+        self.arquivo = arquivo
+        self._totais = {}
+        self._trava = threading.Lock()
+        self._log = logging.getLogger(f"loja.sql_lentas.{id(self)}")
+        self._log.propagate = False
+        self._log.setLevel(logging.INFO)
+        self._manipulador = None
+
+    def instrumentar(self, conn):
+        """Liga o set_trace_callback da conexão, que anota os gatilhos de cada comando"""
+        conn.registro_atual = None
+
+        def ao_executar(texto):
+            registro = conn.registro_atual
+            if registro is None:
+                return
+            registro.execucoes += 1
+            # Até o Python 3.10 os comandos de gatilho chegam como "-- TRIGGER nome";
+            # a partir do 3.11, com o texto do comando que os disparou
+            if texto.startswith("-- TRIGGER "):
+                registro.gatilhos.append(texto[len("-- TRIGGER "):])
+
+        conn.set_trace_callback(ao_executar)
+
+    def iniciar(self, conn, sql, parametros=()):
+        registro = Registro(sql, parametros, chamador())
+        conn.registro_atual = registro
+        return registro
+
+    def concluir(self, conn, registro):
+        if conn.registro_atual is registro:
+            conn.registro_atual = None
+        lento = registro.duracao >= self.limiar
+        chave = normalizar_sql(registro.sql)
+        with self._trava:
+            totais = self._totais.get(chave)
+            if totais is None:
+                totais = self._totais[chave] = Totais()
+            totais.chamadas += 1
+            totais.tempo_total += registro.duracao
+            totais.tempo_maximo = max(totais.tempo_maximo, registro.duracao)
+            totais.linhas += max(registro.linhas, 0)
+            totais.chamadores[registro.chamador] += 1
+            totais.lentas += lento
+        if lento:
+            self._registrar_lento(conn, registro)
+
+    def registrar(self, conn, sql, duracao, linhas=0):
+        """Registra de uma vez um comando que não passa por cursor (COMMIT, ROLLBACK)"""
+        registro = Registro(sql, (), chamador(), duracao, linhas)
+        self.concluir(conn, registro)
+
+    def _registrar_lento(self, conn, registro):
+        if self._manipulador is None:
+            # Threads diferentes podem chegar aqui juntas; conferido de novo
+            # com a trava, para o arquivo ter um único manipulador
+            with self._trava:
+                if self._manipulador is None:
+                    manipulador = logging.handlers.RotatingFileHandler(
+                        self.arquivo, maxBytes=TAMANHO_LOG, backupCount=ARQUIVOS_LOG, encoding="utf-8")
+                    manipulador.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+                    self._log.addHandler(manipulador)
+                    self._manipulador = manipulador
+
+        linhas = [f"{registro.duracao * 1000:.1f} ms | {registro.linhas} linha(s) | {registro.chamador}",
+                  f"    {_ESPACOS.sub(' ', registro.sql).strip()}"]
+        if registro.parametros:
+            linhas.append(f"    parâmetros: {registro.parametros!r}"[:500])
+        if registro.gatilhos:
+            contagem = Counter(registro.gatilhos)
+            linhas.append("    gatilhos: " + ", ".join(f"{nome} ({n}x)" for nome, n in contagem.items()))
+        if registro.execucoes > 1:
+            linhas.append(f"    execuções no SQLite (com gatilhos): {registro.execucoes}")
+        linhas.extend(f"    {linha}" for linha in self.plano(conn, registro))
+        self._log.info("\n".join(linhas))
+
+    @staticmethod
+    def plano(conn, registro):
+        """Linhas do EXPLAIN QUERY PLAN do comando, indentadas como árvore"""
+        if not registro.sql.lstrip().upper().startswith(_COM_PLANO):
+            return []
+        try:
+            # Cursor comum: o EXPLAIN não deve ser contado nem rastreado
+            cursor = conn.cursor(sqlite3.Cursor)
+            cursor.execute("EXPLAIN QUERY PLAN " + registro.sql, registro.parametros or ())
+            nos = cursor.fetchall()
+        except sqlite3.Error as e:
+            return [f"plano indisponível: {e}"]
+        if not nos:
+            return []
+        profundidade = {0: -1}
+        linhas = ["plano:"]
+        for no, pai, _, detalhe in nos:
+            profundidade[no] = profundidade.get(pai, -1) + 1
+            linhas.append("  " * (profundidade[no] + 1) + detalhe)
+        return linhas
+
+    def resumo(self, limite=LIMITE_RESUMO):
+        """Texto com os comandos que mais somaram tempo desde o início"""
+        with self._trava:
+            totais = sorted(self._totais.items(), key=lambda item: item[1].tempo_total, reverse=True)
+            geral = sum(t.tempo_total for _, t in totais)
+            itens = [(sql, Totais(t.chamadas, t.tempo_total, t.tempo_maximo, t.linhas, t.lentas,
+                                  t.chamadores.copy()))
+                     for sql, t in totais[:limite]]
+
+        linhas = [f"Comandos SQL por tempo total ({len(totais)} distintos, {geral * 1000:.1f} ms no total):",
+                  f"{'total ms':>10} {'%':>5} {'vezes':>7} {'média ms':>9} {'máx ms':>8} "
+                  f"{'linhas':>8} {'lentas':>6}  chamador / comando"]
+        for sql, t in itens:
+            principal, _ = t.chamadores.most_common(1)[0]
+            outros = len(t.chamadores) - 1
+            linhas.append(f"{t.tempo_total * 1000:10.1f} {t.tempo_total / geral * 100 if geral else 0:5.1f} "
+                          f"{t.chamadas:7d} {t.tempo_total / t.chamadas * 1000:9.2f} "
+                          f"{t.tempo_maximo * 1000:8.1f} {t.linhas:8d} {t.lentas:6d}  "
+                          f"{principal}" + (f" (+{outros})" if outros else ""))
+            linhas.append(f"{'':>58}{sql[:110]}")
+        return "\n".join(linhas)
+
+    def fechar(self):
+        with self._trava:
+            if self._manipulador is not None:
+                self._log.removeHandler(self._manipulador)
+                self._manipulador.close()
+                self._manipulador = None
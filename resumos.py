@@ -0,0 +1,102 @@
+import sys
+import banco
+from banco import transacao
+
+
+# O dia é a data local "AAAA-MM-DD" do instante gravado (função dia_local,
+# registrada em cada conexão por banco.py).
+# Faturamento, lucro, itens e quantidade de vendas entram no dia da venda;
+# o recebido entra no dia do pagamento. O lucro usa o custo gravado em cada
+# item na venda (itens_venda.custo_unitario), e não o custo atual do produto:
+# editar o produto não muda o passado, e as somas leem só o índice de
+# cobertura dos itens, sem junção com produtos. A reconstrução lê as visões
+# do histórico completo (banco.TABELAS_ARQUIVADAS): as vendas arquivadas
+# continuam nos resumos.
+SQL_SOMAR_VENDA = """
+    INSERT INTO resumo_diario (dia, faturamento, lucro, itens, vendas)
+    SELECT dia_local(v.data_venda),
+           :sinal * COALESCE(v.valor_total, 0),
+           :sinal * COALESCE((SELECT SUM((iv.valor_unitario - iv.custo_unitario) * iv.quantidade)
+                              FROM itens_venda iv
+                              WHERE iv.venda_id = v.id), 0),
+           :sinal * COALESCE((SELECT SUM(iv.quantidade)
+                              FROM itens_venda iv
+                              WHERE iv.venda_id = v.id), 0),
+           :sinal
+    FROM vendas v
+    WHERE v.id = :venda_id
+    ON CONFLICT (dia) DO UPDATE SET
+        faturamento = ROUND(faturamento + excluded.faturamento, 2),
+        lucro = ROUND(lucro + excluded.lucro, 2),
+        itens = itens + excluded.itens,
+        vendas = vendas + excluded.vendas
+"""
+
+SQL_SOMAR_RECEBIMENTO = """
+    INSERT INTO resumo_diario (dia, recebido)
+    VALUES (dia_local(:data_pagamento), :valor)
+    ON CONFLICT (dia) DO UPDATE SET
+        recebido = ROUND(recebido + excluded.recebido, 2)
+"""
+
+SQL_RECONSTRUIR_VENDAS = """
+    INSERT INTO resumo_diario (dia, faturamento, lucro, itens, vendas)
+    SELECT dia_local(v.data_venda),
+           ROUND(SUM(COALESCE(v.valor_total, 0)), 2),
+           ROUND(SUM(COALESCE(t.lucro, 0)), 2),
+           SUM(COALESCE(t.itens, 0)),
+           COUNT(*)
+    FROM todas_vendas v
+    LEFT JOIN (SELECT iv.venda_id,
+                      SUM((iv.valor_unitario - iv.custo_unitario) * iv.quantidade) AS lucro,
+                      SUM(iv.quantidade) AS itens
+               FROM todos_itens_venda iv
+               GROUP BY iv.venda_id) t ON t.venda_id = v.id
+    GROUP BY 1
+"""
+
+SQL_RECONSTRUIR_RECEBIMENTOS = """
+    INSERT INTO resumo_diario (dia, recebido)
+    SELECT dia_local(data_pagamento), ROUND(SUM(valor_pago), 2)
+    FROM todos_pagamentos
+    WHERE data_pagamento IS NOT NULL
+    GROUP BY 1
+    ON CONFLICT (dia) DO UPDATE SET
+        recebido = excluded.recebido
+"""
+
+def registrar_venda(conn, venda_id):
+    """Soma a venda (já gravada com seus itens) ao resumo do dia dela"""
+    conn.execute(SQL_SOMAR_VENDA, {'sinal': 1, 'venda_id': venda_id})
+
+def estornar_venda(conn, venda_id):
+    """Retira a venda do resumo do dia. Deve ser chamada antes do DELETE."""
+    conn.execute(SQL_SOMAR_VENDA, {'sinal': -1, 'venda_id': venda_id})
+
+def registrar_recebimento(conn, valor, data_pagamento):
+    """Soma um pagamento ao resumo do dia em que foi recebido"""
+    conn.execute(SQL_SOMAR_RECEBIMENTO, {'data_pagamento': data_pagamento, 'valor': valor})
+
+def reconstruir_resumos():
+    """Apaga e recalcula todos os resumos diários a partir dos dados brutos"""
+    with transacao("IMMEDIATE") as conn:
+        conn.execute("DELETE FROM resumo_diario")
+        conn.execute(SQL_RECONSTRUIR_VENDAS)
+        conn.execute(SQL_RECONSTRUIR_RECEBIMENTOS)
+        return conn.execute("SELECT COUNT(*) FROM resumo_diario").fetchone()[0]
+
+def main(argumentos):
+    # Uso: python resumos.py [caminho do banco]
+    # Importado aqui porque esquema.py usa este módulo ao preparar o banco
+    from esquema import preparar_banco
+
+    caminho = argumentos[0] if argumentos else banco.CAMINHO_BANCO
+    banco.gerenciador = banco.GerenciadorConexoes(caminho)
+    preparar_banco()
+    dias = reconstruir_resumos()
+    print(f"Resumos diários reconstruídos: {dias} dia(s) em {caminho}.")
+    banco.fechar_conexoes()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,311 @@
+import asyncio
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, parse_qs
+from banco import obter_conexao, resumo_estatisticas, resumo_rastreamento, fechar_conexoes
+from esquema import preparar_banco
+from consultas import SQL_NOME_CLIENTE, SQL_BUSCAR_PRODUTOS, parametros_busca, montar_consulta_contas
+from catalogo import catalogo
+from carrinho import para_decimal
+from vendas import gravar_venda, gravar_pagamento
+from tempo import para_datetime
+
+
+# Uso: python servidor.py [porta]
+# Serviço HTTP/JSON local, opcional, para outros aparelhos da loja (um caixa
+# no tablet, um consultor de preços) usarem as mesmas regras da tela:
+#
+#   GET  /produtos/<id>                  produto do catálogo
+#   GET  /produtos?busca=<texto>         busca textual de produtos
+#   POST /vendas                         {"cliente": "12", "itens": [{"produto": 3, "quantidade": 2}]}
+#   POST /pagamentos                     {"venda": 40, "valor": 25.5}
+#   GET  /contas?cliente=<código>&apos=<data>,<id>&limite=<n>
+#
+# Só escuta em 127.0.0.1. Erros voltam como {"erro": "..."} com o status HTTP.
+ENDERECO = '127.0.0.1'
+PORTA = 8765
+
+# O trabalho de banco roda em TRABALHADORES threads, cada uma com sua
+# conexão persistente (banco.py). No máximo MAXIMO_PENDENTES pedidos ficam
+# esperando uma thread livre; além disso o servidor responde 503 na hora,
+# em vez de acumular memória e latência.
+TRABALHADORES = 4
+MAXIMO_PENDENTES = 64
+
+MAXIMO_CORPO = 64 * 1024
+TAMANHO_PAGINA_CONTAS = 100
+MAXIMO_PAGINA_CONTAS = 500
+
+MOTIVOS = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 409: "Conflict", 413: "Payload Too Large",
+           422: "Unprocessable Entity", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+class ErroHttp(Exception):
+    """Interrompe o atendimento de um pedido com o status e a mensagem dados"""
+
+    def __init__(self, status, mensagem):
+        super().__init__(mensagem)
+        self.status = status
+
+class ExecutorLimitado:
+    """Threads de banco com fila limitada, para uso a partir do laço asyncio"""
+
+    def __init__(self, trabalhadores=TRABALHADORES, maximo_pendentes=MAXIMO_PENDENTES):
+        self._threads = ThreadPoolExecutor(trabalhadores, thread_name_prefix="servidor-banco")
+        self._vagas = asyncio.Semaphore(trabalhadores + maximo_pendentes)
+
+    async def executar(self, funcao, *args):
+        if self._vagas.locked():
+            raise ErroHttp(503, "Servidor ocupado, tente novamente")
+        async with self._vagas:
+            return await asyncio.get_running_loop().run_in_executor(self._threads, funcao, *args)
+
+    def encerrar(self):
+        self._threads.shutdown(wait=True)
+
+# Funções abaixo rodam nas threads do banco
+
+def produto_para_json(produto):
+    return {"id": produto.id, "tipo": produto.tipo, "cor": produto.cor, "tamanho": produto.tamanho,
+            "descricao": produto.descricao, "quantidade": produto.quantidade,
+            "preco": round(produto.preco, 2)}
+
+def consultar_produto(produto_id):
+    produto = catalogo.obter(produto_id)
+    if produto is None:
+        raise ErroHttp(404, f"Produto {produto_id} não encontrado")
+    return produto_para_json(produto)
+
+def buscar_produtos(texto):
+    """Busca textual; estoque e preço efetivo vêm do catálogo"""
+    parametros = parametros_busca(texto)
+    if parametros is None:
+        return []
+    cursor = obter_conexao().cursor()
+    cursor.execute(SQL_BUSCAR_PRODUTOS, parametros)
+    produtos = (catalogo.obter(linha[0]) for linha in cursor.fetchall())
+    return [produto_para_json(produto) for produto in produtos if produto is not None]
+
+def finalizar_venda(cliente_id, pedidos):
+    """Mesmas regras de gui.finalizar_venda. O catálogo só confirma que os
+    produtos existem; estoque e preço são os do banco, conferidos dentro da
+    transação da venda (ver vendas.gravar_venda)"""
+    cursor = obter_conexao().cursor()
+    cursor.execute(SQL_NOME_CLIENTE, (cliente_id,))
+    if cursor.fetchone() is None:
+        raise ErroHttp(422, f"Cliente {cliente_id} não encontrado")
+
+    # Pedidos repetidos do mesmo produto viram um item só, como no carrinho
+    quantidades = {}
+    for produto_id, quantidade in pedidos:
+        if catalogo.obter(produto_id) is None:
+            raise ErroHttp(422, f"Produto {produto_id} não encontrado")
+        quantidades[produto_id] = quantidades.get(produto_id, 0) + quantidade
+
+    try:
+        venda_id, valor_total = gravar_venda(cliente_id, list(quantidades.items()))
+    except ValueError as e:
+        raise ErroHttp(409, str(e)) from None
+    return {"venda": venda_id, "total": valor_total}
+
+def registrar_pagamento(venda_id, valor):
+    try:
+        gravar_pagamento(venda_id, float(valor))
+    except ValueError as e:
+        raise ErroHttp(422, str(e)) from None
+    return {"venda": venda_id, "valor": float(valor)}
+
+def listar_contas(codigo_cliente, apos, limite):
+    """Uma página das contas a receber, da mais recente para a mais antiga"""
+    sql, params = montar_consulta_contas(codigo_cliente, apos=apos, limite=limite)
+    cursor = obter_conexao().cursor()
+    cursor.execute(sql, params)
+    contas = cursor.fetchall()
+    seguinte = None
+    if len(contas) == limite:
+        venda_id, *_, data_venda = contas[-1]
+        seguinte = f"{data_venda},{venda_id}"
+    return {
+        "contas": [{"venda": venda_id, "cliente": cliente, "valor_total": valor_total,
+                    "valor_pago": valor_pago, "saldo": saldo,
+                    "data_venda": para_datetime(data_venda).isoformat() if data_venda is not None else None}
+                   for venda_id, cliente, valor_total, valor_pago, saldo, data_venda in contas],
+        "seguinte": seguinte,
+    }
+
+# Validação dos pedidos, no laço asyncio
+
+def inteiro_positivo(valor, campo):
+    try:
+        if isinstance(valor, (bool, float)):
+            raise ValueError
+        numero = int(valor)
+    except (TypeError, ValueError):
+        raise ErroHttp(400, f"'{campo}' deve ser um número inteiro") from None
+    if numero <= 0:
+        raise ErroHttp(400, f"'{campo}' deve ser maior que zero")
+    return numero
+
+def ler_venda(dados):
+    cliente = dados.get("cliente")
+    if cliente is None or str(cliente).strip() == "":
+        raise ErroHttp(400, "Informe o 'cliente'")
+    itens = dados.get("itens")
+    if not isinstance(itens, list) or not itens:
+        raise ErroHttp(400, "Informe pelo menos um item em 'itens'")
+    pedidos = []
+    for item in itens:
+        if not isinstance(item, dict):
+            raise ErroHttp(400, "Cada item deve ter 'produto' e 'quantidade'")
+        pedidos.append((inteiro_positivo(item.get("produto"), "produto"),
+                        inteiro_positivo(item.get("quantidade", 1), "quantidade")))
+    return str(cliente).strip(), pedidos
+
+def ler_pagamento(dados):
+    venda_id = inteiro_positivo(dados.get("venda"), "venda")
+    try:
+        valor = para_decimal(dados.get("valor"))
+    except Exception:
+        raise ErroHttp(400, "'valor' deve ser um número") from None
+    if not valor.is_finite():
+        raise ErroHttp(400, "'valor' deve ser um número")
+    if valor <= 0:
+        raise ErroHttp(400, "'valor' deve ser maior que zero")
+    return venda_id, valor
+
+def ler_chave(texto):
+    """Converte 'data,id' (o campo 'seguinte' da página anterior) na chave da página"""
+    try:
+        data_venda, venda_id = texto.split(",")
+        return int(data_venda), int(venda_id)
+    except ValueError:
+        raise ErroHttp(400, "'apos' deve ser o valor de 'seguinte' da página anterior") from None
+
+class Servidor:
+    """Atende os pedidos HTTP e encaminha o trabalho de banco ao executor"""
+
+    def __init__(self, executor):
+        self.executor = executor
+
+    async def atender(self, metodo, caminho, consulta, corpo):
+        partes = [parte for parte in caminho.split("/") if parte]
+        parametros = {chave: valores[-1] for chave, valores in parse_qs(consulta).items()}
+
+        if partes == ["produtos"] and metodo == "GET":
+            return 200, await self.executor.executar(buscar_produtos, parametros.get("busca", ""))
+        if len(partes) == 2 and partes[0] == "produtos" and metodo == "GET":
+            return 200, await self.executor.executar(consultar_produto, inteiro_positivo(partes[1], "id"))
+        if partes == ["vendas"] and metodo == "POST":
+            return 201, await self.executor.executar(finalizar_venda, *ler_venda(self.ler_json(corpo)))
+        if partes == ["pagamentos"] and metodo == "POST":
+            return 201, await self.executor.executar(registrar_pagamento, *ler_pagamento(self.ler_json(corpo)))
+        if partes == ["contas"] and metodo == "GET":
+            apos = ler_chave(parametros["apos"]) if parametros.get("apos") else None
+            limite = min(inteiro_positivo(parametros.get("limite", TAMANHO_PAGINA_CONTAS), "limite"),
+                         MAXIMO_PAGINA_CONTAS)
+            return 200, await self.executor.executar(listar_contas, parametros.get("cliente"), apos, limite)
+
+        if partes and partes[0] in ("produtos", "vendas", "pagamentos", "contas"):
+            raise ErroHttp(405, f"Método {metodo} não permitido em {caminho}")
+        raise ErroHttp(404, f"Caminho {caminho} não encontrado")
+
+    @staticmethod
+    def ler_json(corpo):
+        try:
+            dados = json.loads(corpo or b"{}")
+        except ValueError:
+            raise ErroHttp(400, "Corpo do pedido não é JSON válido") from None
+        if not isinstance(dados, dict):
+            raise ErroHttp(400, "O corpo do pedido deve ser um objeto JSON")
+        return dados
+
+    async def conexao(self, leitor, escritor):
+        """Atende os pedidos de uma conexão, mantida aberta entre eles (HTTP/1.1)"""
+        try:
+            while True:
+                linha = await leitor.readline()
+                if not linha:
+                    break
+                try:
+                    metodo, alvo, versao = linha.decode("latin-1").split()
+                except ValueError:
+                    await self.responder(escritor, 400, {"erro": "Pedido inválido"}, manter=False)
+                    break
+
+                cabecalhos = {}
+                while True:
+                    linha = await leitor.readline()
+                    if linha in (b"\r\n", b"\n", b""):
+                        break
+                    nome, _, valor = linha.decode("latin-1").partition(":")
+                    cabecalhos[nome.strip().lower()] = valor.strip()
+
+                manter = (versao == "HTTP/1.1" and cabecalhos.get("connection", "").lower() != "close")
+                # Sem um tamanho válido não se sabe onde o corpo termina: a
+                # conexão é fechada, como num pedido mal formado
+                try:
+                    tamanho = int(cabecalhos.get("content-length") or 0)
+                    if tamanho < 0:
+                        raise ValueError(tamanho)
+                except ValueError:
+                    await self.responder(escritor, 400, {"erro": "Content-Length inválido"}, manter=False)
+                    break
+                if tamanho > MAXIMO_CORPO:
+                    await self.responder(escritor, 413, {"erro": "Corpo do pedido muito grande"}, manter=False)
+                    break
+                corpo = await leitor.readexactly(tamanho) if tamanho else b""
+
+                url = urlsplit(alvo)
+                try:
+                    status, resposta = await self.atender(metodo, url.path, url.query, corpo)
+                except ErroHttp as e:
+                    status, resposta = e.status, {"erro": str(e)}
+                except Exception as e:
+                    print(f"Erro ao atender {metodo} {alvo}: {e}")
+                    status, resposta = 500, {"erro": f"Erro inesperado: {e}"}
+                await self.responder(escritor, status, resposta, manter)
+                if not manter:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            escritor.close()
+
+    @staticmethod
+    async def responder(escritor, status, resposta, manter):
+        corpo = json.dumps(resposta, ensure_ascii=False).encode("utf-8")
+        cabecalho = (f"HTTP/1.1 {status} {MOTIVOS[status]}\r\n"
+                     f"Content-Type: application/json; charset=utf-8\r\n"
+                     f"Content-Length: {len(corpo)}\r\n"
+                     f"Connection: {'keep-alive' if manter else 'close'}\r\n\r\n")
+        escritor.write(cabecalho.encode("latin-1") + corpo)
+        await escritor.drain()
+
+async def servir(porta=PORTA, endereco=ENDERECO):
+    executor = ExecutorLimitado()
+    servidor = Servidor(executor)
+    try:
+        async with await asyncio.start_server(servidor.conexao, endereco, porta) as rede:
+            print(f"Servidor da loja em http://{endereco}:{porta}", flush=True)
+            await rede.serve_forever()
+    finally:
+        executor.encerrar()
+
+def main(argumentos):
+    porta = int(argumentos[0]) if argumentos else PORTA
+    preparar_banco()
+    try:
+        asyncio.run(servir(porta))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(resumo_estatisticas())
+        rastreamento = resumo_rastreamento()
+        if rastreamento:
+            print(rastreamento)
+        fechar_conexoes()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
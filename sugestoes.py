@@ -0,0 +1,178 @@
+import bisect
+import itertools
+import re
+import time
+import unicodedata
+
+
+# Opções exibidas de cada vez na lista do combobox
+LIMITE_SUGESTOES = 20
+# Espera depois da última tecla antes de buscar, em milissegundos
+ATRASO_MS = 120
+# Tempo máximo de uma busca por tecla, em milissegundos (um quadro de tela),
+# conferido por benchmarks/sugestoes.py
+ORCAMENTO_MS = 16
+
+# Teclas que não mudam o texto e não disparam nova busca
+TECLAS_IGNORADAS = {"Up", "Down", "Left", "Right", "Return", "KP_Enter", "Escape", "Tab",
+                    "Shift_L", "Shift_R", "Control_L", "Control_R", "Alt_L", "Alt_R"}
+
+# Duração, em milissegundos, de cada busca feita na sessão
+_latencias = []
+
+def normalizar(texto):
+    """Minúsculas e sem acentos, para comparar o que foi digitado com os nomes"""
+    texto = str(texto).casefold()
+    if texto.isascii():
+        return texto
+    # Separa as letras dos acentos e descarta o que não for ASCII
+    return unicodedata.normalize('NFKD', texto).encode('ascii', 'ignore').decode('ascii')
+
+_PALAVRA = re.compile(r'\w+')
+_NAO_DIGITO = re.compile(r'\D')
+
+def palavras(texto):
+    """Divide o texto normalizado em palavras, ignorando a pontuação"""
+    return _PALAVRA.findall(texto)
+
+class IndiceSugestoes:
+    """Índice ordenado, em memória, das opções de um combobox.
+
+    `opcoes` são pares (rótulo exibido, campos pesquisáveis). Cada palavra
+    dos campos, sem acentos, entra numa lista ordenada de onde os prefixos
+    saem por busca binária. Um número com pontuação (telefone) também entra
+    só com os dígitos. Se os prefixos não completarem o limite, os textos
+    completos são percorridos atrás de trechos no meio das palavras.
+    `fixas` são opções como "Todos os Clientes", sempre oferecidas primeiro.
+    """
+
+    def __init__(self, opcoes, fixas=()):
+        self.fixas = list(fixas)
+        self.rotulos = []
+        self.textos = []
+        entradas = []
+        for rotulo, campos in opcoes:
+            posicao = len(self.rotulos)
+            texto = normalizar(' '.join(str(campo) for campo in campos if campo is not None))
+            chaves = set(palavras(texto))
+            for campo in campos:
+                digitos = _NAO_DIGITO.sub('', str(campo))
+                if len(digitos) > 1 and digitos not in chaves:
+                    chaves.add(digitos)
+                    texto += ' ' + digitos
+            self.rotulos.append(rotulo)
+            self.textos.append(texto)
+            entradas.extend((chave, posicao) for chave in chaves)
+
+        entradas.sort()
+        self._chaves = [chave for chave, _ in entradas]
+        self._posicoes = [posicao for _, posicao in entradas]
+        # Os textos completos, também ordenados, dão as opções que começam
+        # pela consulta inteira
+        inicios = sorted((texto, posicao) for posicao, texto in enumerate(self.textos))
+        self._textos_ordenados = [texto for texto, _ in inicios]
+        self._posicoes_textos = [posicao for _, posicao in inicios]
+
+    @staticmethod
+    def _faixa(chaves, posicoes, prefixo):
+        inicio = bisect.bisect_left(chaves, prefixo)
+        fim = bisect.bisect_left(chaves, prefixo + '\U0010ffff', inicio)
+        return posicoes[inicio:fim]
+
+    def _com_prefixo(self, prefixo):
+        return set(self._faixa(self._chaves, self._posicoes, prefixo))
+
+    def buscar(self, consulta, limite=LIMITE_SUGESTOES):
+        """Retorna até `limite` rótulos que combinam com o texto digitado.
+
+        Todas as palavras digitadas precisam começar alguma palavra da
+        opção. As opções cujo texto começa pela consulta vêm primeiro; as
+        demais, na ordem original (por código).
+        """
+        consulta = normalizar(consulta).strip()
+        termos = palavras(consulta)
+        if not termos:
+            return (self.fixas + self.rotulos[:limite])[:limite]
+
+        fixas = [rotulo for rotulo in self.fixas if normalizar(rotulo).startswith(consulta)]
+
+        encontradas = None
+        for termo in termos:
+            posicoes = self._com_prefixo(termo)
+            encontradas = posicoes if encontradas is None else encontradas & posicoes
+            if not encontradas:
+                break
+
+        melhores = sorted(self._faixa(self._textos_ordenados, self._posicoes_textos, consulta))[:limite]
+        vistas = set(melhores)
+        if len(melhores) < limite:
+            restantes = (posicao for posicao in sorted(encontradas) if posicao not in vistas)
+            melhores.extend(itertools.islice(restantes, limite - len(melhores)))
+            vistas.update(melhores)
+
+        # Trechos no meio das palavras, só se ainda houver espaço
+        if len(melhores) < limite:
+            for posicao, texto in enumerate(self.textos):
+                if consulta in texto and posicao not in vistas:
+                    melhores.append(posicao)
+                    if len(melhores) == limite:
+                        break
+
+        return (fixas + [self.rotulos[posicao] for posicao in melhores])[:limite]
+
+class Autocompletar:
+    """Liga um IndiceSugestoes a um ttk.Combobox.
+
+    A cada tecla a busca é reagendada, de modo que só roda depois de uma
+    pausa na digitação, e a lista passa a ter só as melhores opções. Enter
+    completa com a primeira sugestão. A duração de cada busca é registrada
+    (ver resumo_latencias).
+    """
+
+    def __init__(self, combobox, indice, limite=LIMITE_SUGESTOES, atraso_ms=ATRASO_MS):
+        self.combobox = combobox
+        self.indice = indice
+        self.limite = limite
+        self.atraso_ms = atraso_ms
+        self._agendado = None
+        combobox['values'] = indice.buscar('', limite)
+        combobox.bind('<KeyRelease>', self._ao_digitar, add='+')
+        combobox.bind('<Return>', self._completar, add='+')
+
+    def trocar_indice(self, indice):
+        """Passa a sugerir a partir de `indice`, por exemplo depois de recarregar as opções"""
+        self.indice = indice
+        self.combobox['values'] = indice.buscar(self.combobox.get(), self.limite)
+
+    def _ao_digitar(self, evento):
+        if evento.keysym in TECLAS_IGNORADAS:
+            return
+        if self._agendado is not None:
+            self.combobox.after_cancel(self._agendado)
+        self._agendado = self.combobox.after(self.atraso_ms, self.sugerir)
+
+    def sugerir(self):
+        """Atualiza a lista do combobox com as opções para o texto atual"""
+        self._agendado = None
+        inicio = time.perf_counter()
+        sugestoes = self.indice.buscar(self.combobox.get(), self.limite)
+        _latencias.append((time.perf_counter() - inicio) * 1000)
+        self.combobox['values'] = sugestoes
+        return sugestoes
+
+    def _completar(self, evento=None):
+        texto = self.combobox.get()
+        sugestoes = self.indice.buscar(texto, self.limite)
+        if sugestoes and texto not in sugestoes:
+            self.combobox.set(sugestoes[0])
+            self.combobox.event_generate('<<ComboboxSelected>>')
+
+def resumo_latencias():
+    """Retorna um texto curto com a duração das buscas de sugestões na sessão"""
+    if not _latencias:
+        return "Sugestões: nenhuma busca"
+    ordenadas = sorted(_latencias)
+    p95 = ordenadas[min(len(ordenadas) - 1, int(len(ordenadas) * 0.95))]
+    return (f"Sugestões: {len(ordenadas)} buscas, "
+            f"média {sum(ordenadas) / len(ordenadas):.2f} ms, "
+            f"p95 {p95:.2f} ms, máxima {ordenadas[-1]:.2f} ms")
@@ -0,0 +1,135 @@
+import queue
+import threading
+from banco import fechar_conexao_da_thread
+
+
+# Intervalo, em milissegundos, com que a thread do Tk recolhe os resultados
+INTERVALO_MS = 30
+
+class Tarefa:
+    """Um pedido de trabalho de banco e os retornos que recebem o resultado"""
+
+    def __init__(self, funcao, args, ao_concluir, ao_falhar, chave, cancelavel):
+        self.funcao = funcao
+        self.args = args
+        self.ao_concluir = ao_concluir
+        self.ao_falhar = ao_falhar
+        self.chave = chave
+        self.cancelavel = cancelavel
+        self.cancelada = False
+
+    def cancelar(self):
+        """Descarta o resultado; se ainda não começou, a tarefa nem é executada"""
+        if self.cancelavel:
+            self.cancelada = True
+
+class ExecutorBanco:
+    """Executa o trabalho de banco em uma thread própria, fora da thread do Tk.
+
+    A thread tem sua conexão persistente (ver banco.py) e processa os pedidos
+    em ordem. Os resultados voltam por uma fila que a janela esvazia com
+    `after`, de modo que os retornos sempre rodam na thread do Tk e podem
+    mexer nos widgets. Só os métodos públicos devem ser chamados, e só da
+    thread do Tk.
+    """
+
+    def __init__(self, janela, ao_mudar_ocupado=None, intervalo_ms=INTERVALO_MS):
+        self.janela = janela
+        self.ao_mudar_ocupado = ao_mudar_ocupado
+        self.intervalo_ms = intervalo_ms
+        self._pedidos = queue.Queue()
+        self._resultados = queue.Queue()
+        self._pendentes = []
+        self._por_chave = {}
+        self._recolhendo = False
+        self._ocupado = False
+        self._thread = threading.Thread(target=self._trabalhar, name="executor-banco", daemon=True)
+        self._thread.start()
+
+    def executar(self, funcao, *args, ao_concluir=None, ao_falhar=None, chave=None, cancelavel=True):
+        """Agenda funcao(*args) na thread do banco.
+
+        `ao_concluir(resultado)` ou `ao_falhar(erro)` são chamados na thread
+        do Tk. Um novo pedido com a mesma `chave` cancela o anterior, que
+        ficou obsoleto. Escritas devem usar cancelavel=False, para que a
+        troca de tela não esconda o resultado de uma gravação.
+        """
+        if chave is not None and chave in self._por_chave:
+            self._por_chave[chave].cancelar()
+
+        tarefa = Tarefa(funcao, args, ao_concluir, ao_falhar, chave, cancelavel)
+        if chave is not None:
+            self._por_chave[chave] = tarefa
+        self._pendentes.append(tarefa)
+        self._pedidos.put(tarefa)
+
+        self._atualizar_ocupado()
+        if not self._recolhendo:
+            self._recolhendo = True
+            self.janela.after(self.intervalo_ms, self._recolher)
+        return tarefa
+
+    def cancelar_pendentes(self):
+        """Cancela tudo que ainda não foi entregue, por exemplo ao trocar de tela"""
+        for tarefa in self._pendentes:
+            tarefa.cancelar()
+        self._atualizar_ocupado()
+
+    def encerrar(self, espera=5.0):
+        """Termina a thread depois dos pedidos já enfileirados"""
+        self.cancelar_pendentes()
+        self._pedidos.put(None)
+        self._thread.join(espera)
+
+    def _trabalhar(self):
+        # Roda na thread do banco
+        while True:
+            tarefa = self._pedidos.get()
+            if tarefa is None:
+                break
+            resultado = erro = None
+            if not tarefa.cancelada:
+                try:
+                    resultado = tarefa.funcao(*tarefa.args)
+                except Exception as e:
+                    erro = e
+            self._resultados.put((tarefa, resultado, erro))
+        fechar_conexao_da_thread()
+
+    def _recolher(self):
+        # Roda na thread do Tk, chamado por after enquanto houver pendências
+        while True:
+            try:
+                tarefa, resultado, erro = self._resultados.get_nowait()
+            except queue.Empty:
+                break
+            self._pendentes.remove(tarefa)
+            if self._por_chave.get(tarefa.chave) is tarefa:
+                del self._por_chave[tarefa.chave]
+            if tarefa.cancelada:
+                continue
+
+            # Uma exceção no retorno não pode interromper o recolhimento
+            try:
+                if erro is None:
+                    if tarefa.ao_concluir:
+                        tarefa.ao_concluir(resultado)
+                elif tarefa.ao_falhar:
+                    tarefa.ao_falhar(erro)
+                else:
+                    print(f"Erro em tarefa de banco: {erro}")
+            except Exception as e:
+                print(f"Erro ao exibir resultado de tarefa de banco: {e}")
+
+        self._atualizar_ocupado()
+        if self._pendentes:
+            self.janela.after(self.intervalo_ms, self._recolher)
+        else:
+            self._recolhendo = False
+
+    def _atualizar_ocupado(self):
+        ocupado = any(not tarefa.cancelada for tarefa in self._pendentes)
+        if ocupado != self._ocupado:
+            self._ocupado = ocupado
+            if self.ao_mudar_ocupado:
+                self.ao_mudar_ocupado(ocupado)
@@ -0,0 +1,48 @@
+from tkinter import Canvas, Misc
+
+
+class GerenciadorTelas:
+    """Mantém as telas do programa, cada uma num Canvas construído uma única vez.
+
+    `registrar(nome, construir)` associa a tela à função que cria os seus
+    widgets no Canvas recebido e retorna a função que recarrega os dados
+    dela (ou None). A primeira visita constrói a tela; nas seguintes só o
+    Canvas exibido muda e os dados são recarregados. Como os widgets nunca
+    são recriados, a memória não cresce com a navegação.
+    """
+
+    def __init__(self, base, fundo=None):
+        # As telas cobrem o Canvas da tela inicial, mas ficam abaixo dos
+        # widgets colocados direto na janela (o menu lateral)
+        self.base = base
+        self.fundo = fundo
+        self._construtores = {}
+        self._telas = {}
+        self.atual = None
+
+    def registrar(self, nome, construir):
+        self._construtores[nome] = construir
+
+    def _construir(self, nome):
+        canvas = Canvas(self.base.master, width=self.base['width'], height=self.base['height'])
+        if self.fundo:
+            canvas.create_image(0, 0, image=self.fundo(), anchor="nw")
+        atualizar = self._construtores[nome](canvas)
+        self._telas[nome] = (canvas, atualizar)
+        return self._telas[nome]
+
+    def mostrar(self, nome):
+        """Exibe a tela `nome`, construindo-a na primeira vez, e recarrega os dados dela"""
+        canvas, atualizar = self._telas.get(nome) or self._construir(nome)
+        if self.atual != nome:
+            if self.atual is not None:
+                self._telas[self.atual][0].place_forget()
+            canvas.place(x=0, y=0, relwidth=1, relheight=1)
+            # Logo acima do Canvas base, e portanto abaixo do menu e do aviso
+            # "Carregando...", criados depois dele. Canvas.lift é o tag_raise
+            # dos itens desenhados, por isso a chamada de Misc.
+            Misc.tkraise(canvas, self.base)
+            self.atual = nome
+        if atualizar:
+            atualizar()
+        return canvas
@@ -0,0 +1,85 @@
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+
+FUSO_HORARIO = ZoneInfo('America/Sao_Paulo')
+
+SEGUNDOS_POR_HORA = 3600
+SEGUNDOS_POR_DIA = 86400
+EPOCA = date(1970, 1, 1)
+
+# Deslocamento UTC, em segundos, de cada dia UTC já visto: um inteiro quando
+# é o mesmo o dia inteiro, ou uma tupla com o de cada hora no dia em que o
+# horário muda (as mudanças acontecem sempre em hora cheia UTC)
+_deslocamentos = {}
+# Texto "dd/mm/aaaa " e "aaaa-mm-dd" de cada dia local já visto, pelo número
+# de dias desde 01/01/1970
+_dias_formatados = {}
+_dias_iso = {}
+# "hh:mm" de cada minuto do dia
+HORARIOS = [f"{hora:02d}:{minuto:02d}" for hora in range(24) for minuto in range(60)]
+
+def _deslocamento_no_instante(epoch):
+    return int(datetime.fromtimestamp(epoch, FUSO_HORARIO).utcoffset().total_seconds())
+
+def _deslocamentos_do_dia(dia):
+    inicio = dia * SEGUNDOS_POR_DIA
+    primeiro = _deslocamento_no_instante(inicio)
+    if primeiro == _deslocamento_no_instante(inicio + SEGUNDOS_POR_DIA - 1):
+        return primeiro
+    return tuple(_deslocamento_no_instante(inicio + hora * SEGUNDOS_POR_HORA) for hora in range(24))
+
+def deslocamento(epoch):
+    """Retorna o deslocamento UTC do fuso da loja no instante, em segundos"""
+    dia, segundos = divmod(epoch, SEGUNDOS_POR_DIA)
+    valor = _deslocamentos.get(dia)
+    if valor is None:
+        valor = _deslocamentos[dia] = _deslocamentos_do_dia(dia)
+    if type(valor) is int:
+        return valor
+    return valor[segundos // SEGUNDOS_POR_HORA]
+
+def para_epoch(dt):
+    """Converte datetime para segundos UTC; sem fuso, vale o fuso da loja"""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=FUSO_HORARIO)
+    return int(dt.timestamp())
+
+def para_datetime(epoch):
+    """Converte segundos UTC para datetime no fuso da loja"""
+    return datetime.fromtimestamp(epoch, FUSO_HORARIO)
+
+def dia_local(epoch):
+    """Retorna o dia 'AAAA-MM-DD' do instante no fuso da loja"""
+    if epoch is None:
+        return None
+    dia = (epoch + deslocamento(epoch)) // SEGUNDOS_POR_DIA
+    try:
+        return _dias_iso[dia]
+    except KeyError:
+        texto = _dias_iso[dia] = (EPOCA + timedelta(days=dia)).isoformat()
+        return texto
+
+def formatar_data_hora(epochs):
+    """Formata uma coluna inteira de segundos UTC como 'dd/mm/aaaa hh:mm'.
+
+    O deslocamento vem do cache por dia e os textos do dia e do horário de
+    tabelas prontas, então cada valor custa só aritmética inteira e uma
+    concatenação. Valores nulos viram '-'.
+    """
+    deslocamentos = _deslocamentos
+    dias_formatados = _dias_formatados
+    textos = []
+    for epoch in epochs:
+        if epoch is None:
+            textos.append('-')
+            continue
+        desloc = deslocamentos.get(epoch // SEGUNDOS_POR_DIA)
+        if type(desloc) is not int:
+            desloc = deslocamento(epoch)
+        dia, segundos = divmod(epoch + desloc, SEGUNDOS_POR_DIA)
+        texto_dia = dias_formatados.get(dia)
+        if texto_dia is None:
+            texto_dia = dias_formatados[dia] = (EPOCA + timedelta(days=dia)).strftime("%d/%m/%Y ")
+        textos.append(texto_dia + HORARIOS[segundos // 60])
+    return textos
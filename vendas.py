@@ -0,0 +1,120 @@
+import json
+from datetime import datetime
+from banco import FUSO_HORARIO, obter_conexao, transacao, repetir_se_ocupado
+from consultas import SQL_ESTOQUE_E_PRECO, SQL_SALDO_VENDA, SQL_PRECOS_EFETIVOS
+from catalogo import catalogo
+from resumos import registrar_venda, registrar_recebimento, estornar_venda
+
+
+# Baixa condicional: só altera a linha se houver estoque, de modo que o
+# número de linhas alteradas diz se todos os itens puderam ser atendidos
+SQL_BAIXAR_ESTOQUE = """
+    UPDATE produtos
+    SET quantidade = quantidade - ?
+    WHERE id = ? AND quantidade >= ?
+"""
+
+SQL_INSERIR_VENDA = """
+    INSERT INTO vendas (cliente_id, valor_total, data_venda)
+    VALUES (?, ?, ?)
+"""
+
+# O custo do produto é copiado para o item no momento da venda
+SQL_INSERIR_ITEM = """
+    INSERT INTO itens_venda (venda_id, produto_id, quantidade, valor_unitario, custo_unitario)
+    VALUES (?, ?, ?, ?, (SELECT preco_custo FROM produtos WHERE id = ?))
+"""
+
+SQL_INSERIR_PAGAMENTO = """
+    INSERT INTO pagamentos (cliente_id, venda_id, valor_pago, data_pagamento)
+    VALUES (?, ?, ?, ?)
+"""
+
+class _SemEstoque(Exception):
+    """Interrompe a transação da venda quando algum item não tem estoque"""
+
+def _mensagem_sem_estoque(itens):
+    # Só no caminho de falha, depois do ROLLBACK: aponta os produtos sem estoque
+    cursor = obter_conexao().cursor()
+    faltando = []
+    for produto_id, quantidade in itens:
+        cursor.execute(SQL_ESTOQUE_E_PRECO, (produto_id,))
+        resultado = cursor.fetchone()
+        disponivel = resultado[0] if resultado else 0
+        if disponivel < quantidade:
+            faltando.append(f"produto ID {produto_id} (disponível: {disponivel})")
+    if not faltando:
+        return "Estoque insuficiente"
+    return "Estoque insuficiente para o " + ", ".join(faltando)
+
+@repetir_se_ocupado
+def gravar_venda(cliente_id, itens):
+    """Grava a venda, seus itens e a baixa de estoque em uma única transação.
+
+    Roda na thread do banco; `itens` são pares (produto_id, quantidade), um
+    por produto. Estoque e preço efetivo são os do banco no momento da
+    gravação, não os do catálogo em memória, que pode estar atrás de outro
+    caixa. A baixa de estoque e os itens são gravados de uma vez com
+    executemany; se algum produto não tiver estoque suficiente, nada é
+    gravado e ValueError diz quais. Retorna (id da venda, valor total).
+
+    A transação é IMMEDIATE: a trava de escrita é pega já no BEGIN, e a
+    baixa condicional reserva o estoque atomicamente mesmo com outros
+    caixas vendendo o mesmo produto.
+    """
+    agora = datetime.now(FUSO_HORARIO)
+    try:
+        # A transação é desfeita automaticamente se algo falhar
+        with transacao("IMMEDIATE") as conn:
+            cursor = conn.cursor()
+            cursor.executemany(SQL_BAIXAR_ESTOQUE,
+                               [(quantidade, produto_id, quantidade) for produto_id, quantidade in itens])
+            if cursor.rowcount != len(itens):
+                raise _SemEstoque()
+
+            # Com a trava de escrita já pega, nenhum outro caixa muda o preço até o COMMIT
+            cursor.execute(SQL_PRECOS_EFETIVOS, (json.dumps([produto_id for produto_id, _ in itens]),))
+            precos = dict(cursor.fetchall())
+            valor_total = round(sum(precos[produto_id] * quantidade for produto_id, quantidade in itens), 2)
+
+            cursor.execute(SQL_INSERIR_VENDA, (cliente_id, valor_total, agora))
+            venda_id = cursor.lastrowid
+            cursor.executemany(SQL_INSERIR_ITEM,
+                               [(venda_id, produto_id, quantidade, precos[produto_id], produto_id)
+                                for produto_id, quantidade in itens])
+
+            registrar_venda(conn, venda_id)
+    except _SemEstoque:
+        raise ValueError(_mensagem_sem_estoque(itens)) from None
+    finally:
+        # Com ou sem sucesso, o estoque desses produtos é relido do banco
+        catalogo.invalidar(*(produto_id for produto_id, _ in itens))
+    return venda_id, valor_total
+
+@repetir_se_ocupado
+def gravar_pagamento(venda_id, valor):
+    """Grava um pagamento da venda. Roda na thread do banco."""
+    with transacao("IMMEDIATE") as conn:
+        cursor = conn.cursor()
+        # Obter informações da venda
+        cursor.execute(SQL_SALDO_VENDA, (venda_id,))
+        venda = cursor.fetchone()
+        if venda is None:
+            raise ValueError(f"Venda {venda_id} não encontrada")
+
+        cliente_id, saldo = venda
+
+        if valor > saldo:
+            raise ValueError(f"Valor excede o saldo devedor (R$ {saldo:.2f})")
+
+        # Registrar o pagamento
+        agora = datetime.now(FUSO_HORARIO)
+        cursor.execute(SQL_INSERIR_PAGAMENTO, (cliente_id, venda_id, valor, agora))
+        registrar_recebimento(conn, valor, agora)
+
+@repetir_se_ocupado
+def apagar_venda(venda_id):
+    """Exclui a venda, retirando-a antes do resumo do dia. Roda na thread do banco."""
+    with transacao("IMMEDIATE") as conn:
+        estornar_venda(conn, venda_id)
+        conn.execute("DELETE FROM vendas WHERE id = ?", (venda_id,))
@@ -0,0 +1,124 @@
+import os
+import sqlite3
+import sys
+import tempfile
+import banco
+from esquema import VERSAO_ESQUEMA, preparar_banco
+from consultas import montar_consulta_historico_vendas
+
+
+# Uso: python verificar_migracoes.py
+# Cria um banco com o esquema da primeira versão do programa (sem as colunas
+# e tabelas das migrações seguintes, datas gravadas como texto, uma delas
+# ilegível), com algumas vendas, e o leva à versão atual com
+# preparar_banco(). Confere a versão final, as datas convertidas, o custo
+# copiado para os itens, os resumos diários e se a paginação por (data, id)
+# alcança todas as vendas. Qualquer migração que dependa de algo criado só por uma
+# migração posterior falha aqui.
+ESQUEMA_ORIGINAL = """
+    CREATE TABLE clientes
+        (codigo_cliente INTEGER PRIMARY KEY AUTOINCREMENT,
+         nome TEXT NOT NULL,
+         telefone TEXT,
+         data_cadastro TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+    CREATE TABLE produtos
+        (id INTEGER PRIMARY KEY AUTOINCREMENT,
+         tipo TEXT NOT NULL,
+         cor TEXT,
+         tamanho TEXT,
+         preco_custo REAL,
+         preco_venda REAL,
+         quantidade INTEGER);
+    CREATE TABLE vendas
+        (id INTEGER PRIMARY KEY AUTOINCREMENT,
+         cliente_id TEXT,
+         valor_total REAL,
+         data_venda TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+    CREATE TABLE itens_venda
+        (id INTEGER PRIMARY KEY AUTOINCREMENT,
+         venda_id INTEGER,
+         produto_id INTEGER,
+         quantidade INTEGER,
+         valor_unitario REAL);
+    CREATE TABLE pagamentos
+        (id INTEGER PRIMARY KEY AUTOINCREMENT,
+         cliente_id TEXT,
+         venda_id INTEGER,
+         valor_pago REAL,
+         data_pagamento DATETIME);
+
+    INSERT INTO clientes (nome, telefone) VALUES ('Ana', '1111'), ('Bruno', '2222');
+    INSERT INTO produtos (tipo, cor, tamanho, preco_custo, preco_venda, quantidade)
+    VALUES ('Blusa', 'Azul', 'M', 10, 20, 5), ('Saia', 'Preta', 'P', 30, 60, 2);
+    INSERT INTO vendas (cliente_id, valor_total, data_venda)
+    VALUES ('1', 100, '2024-03-10T14:30:00-03:00'),
+           ('2', 60, '2024-03-11 09:15:00.000000'),
+           ('1', 60, 'ontem');
+    INSERT INTO itens_venda (venda_id, produto_id, quantidade, valor_unitario)
+    VALUES (1, 1, 2, 20), (1, 2, 1, 60), (2, 2, 1, 60), (3, 2, 1, 60);
+    INSERT INTO pagamentos (cliente_id, venda_id, valor_pago, data_pagamento)
+    VALUES ('1', 1, 100, '2024-03-10T14:31:00-03:00'),
+           ('2', 2, 20, '2024-03-12T10:00:00-03:00');
+"""
+
+# Lucro esperado por dia: (20 - 10) * 2 + (60 - 30) * 1 no dia 10 e (60 - 30)
+# nas duas vendas do dia 11, a segunda com a data ilegível trocada pela dela
+LUCRO_ESPERADO = {"2024-03-10": 50.0, "2024-03-11": 60.0}
+
+def verificar(conn):
+    """Retorna a lista de problemas encontrados no banco migrado"""
+    problemas = []
+    versao = conn.execute("PRAGMA user_version").fetchone()[0]
+    if versao != VERSAO_ESQUEMA:
+        problemas.append(f"versão {versao}, esperado {VERSAO_ESQUEMA}")
+    textos = conn.execute("""
+        SELECT (SELECT COUNT(*) FROM vendas WHERE typeof(data_venda) != 'integer')
+             + (SELECT COUNT(*) FROM pagamentos WHERE typeof(data_pagamento) != 'integer')
+    """).fetchone()[0]
+    if textos:
+        problemas.append(f"{textos} data(s) não convertida(s) para segundos UTC")
+    sem_custo = conn.execute("SELECT COUNT(*) FROM itens_venda WHERE custo_unitario IS NULL").fetchone()[0]
+    if sem_custo:
+        problemas.append(f"{sem_custo} item(ns) sem custo_unitario")
+    saldos = conn.execute("SELECT id, valor_pago, saldo FROM vendas ORDER BY id").fetchall()
+    if saldos != [(1, 100.0, 0.0), (2, 20.0, 40.0), (3, 0.0, 60.0)]:
+        problemas.append(f"valor_pago e saldo inesperados: {saldos}")
+    paginadas, apos = [], None
+    while True:
+        pagina = conn.execute(*montar_consulta_historico_vendas(apos=apos, limite=1)).fetchall()
+        if not pagina:
+            break
+        paginadas.append(pagina[0][0])
+        apos = (pagina[0][-1], pagina[0][0])
+    if sorted(paginadas) != [1, 2, 3]:
+        problemas.append(f"a paginação do histórico alcançou só as vendas {paginadas}")
+    lucro = dict(conn.execute("SELECT dia, lucro FROM resumo_diario WHERE vendas > 0").fetchall())
+    if lucro != LUCRO_ESPERADO:
+        problemas.append(f"lucro nos resumos {lucro}, esperado {LUCRO_ESPERADO}")
+    return problemas
+
+def main():
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, 'loja_ju.db')
+        original = sqlite3.connect(caminho)
+        original.executescript(ESQUEMA_ORIGINAL)
+        original.close()
+
+        banco.gerenciador = banco.GerenciadorConexoes(caminho)
+        try:
+            preparar_banco()
+            problemas = verificar(banco.obter_conexao())
+        except sqlite3.Error as e:
+            problemas = [f"migração falhou: {e}"]
+        finally:
+            banco.fechar_conexoes()
+
+    for problema in problemas:
+        print(f"[FALHA] {problema}")
+    if problemas:
+        return 1
+    print(f"Banco da primeira versão migrado até a versão {VERSAO_ESQUEMA}.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
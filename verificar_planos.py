@@ -0,0 +1,70 @@
+import re
+import sys
+import banco
+from consultas import consultas_verificadas
+from esquema import preparar_banco
+
+
+# "SCAN tabela" sem índice ou "SCAN tabela USING INDEX ..." percorrem a
+# tabela inteira; "SCAN (subquery-1)" e "SCAN CONSTANT ROW" não contam
+PADRAO_VARREDURA = re.compile(r"^SCAN (?!CONSTANT ROW)([^\s(]+)")
+PADRAO_INDICE = re.compile(r"USING (?:COVERING )?INDEX (\w+)")
+# Tabela FTS5 consultada com MATCH: o "M" no plano indica que a busca usa o
+# índice de palavras, e não que a tabela é percorrida
+PADRAO_FTS_MATCH = re.compile(r"VIRTUAL TABLE INDEX \d+:\S*M")
+
+def obter_plano(conn, sql, params):
+    """Retorna as linhas de detalhe do EXPLAIN QUERY PLAN da consulta"""
+    cursor = conn.execute("EXPLAIN QUERY PLAN " + sql, params)
+    return [linha[3] for linha in cursor.fetchall()]
+
+def indices_parciais(conn):
+    """Retorna os nomes dos índices parciais (com cláusula WHERE)"""
+    cursor = conn.execute("""
+        SELECT il.name
+        FROM sqlite_master m, pragma_index_list(m.name) il
+        WHERE m.type = 'table' AND il.partial
+    """)
+    return {linha[0] for linha in cursor.fetchall()}
+
+def verificar_planos(conn):
+    """Confere todas as consultas e retorna a lista de regressões encontradas"""
+    parciais = indices_parciais(conn)
+    problemas = []
+    for nome, sql, params, permitidas in consultas_verificadas():
+        plano = obter_plano(conn, sql, params)
+        for detalhe in plano:
+            achou = PADRAO_VARREDURA.match(detalhe)
+            if not achou or achou.group(1) in permitidas:
+                continue
+            # Percorrer um índice parcial só visita as linhas que ele contém
+            indice = PADRAO_INDICE.search(detalhe)
+            if indice and indice.group(1) in parciais:
+                continue
+            if PADRAO_FTS_MATCH.search(detalhe):
+                continue
+            problemas.append((nome, detalhe, plano))
+    return problemas
+
+def main(argumentos):
+    # Sem caminho, a estrutura é criada em um banco em memória
+    caminho = argumentos[0] if argumentos else ':memory:'
+    banco.gerenciador = banco.GerenciadorConexoes(caminho)
+    preparar_banco()
+    conn = banco.obter_conexao()
+
+    problemas = verificar_planos(conn)
+    for nome, detalhe, plano in problemas:
+        print(f"[FALHA] {nome}: {detalhe}")
+        for linha in plano:
+            print(f"        {linha}")
+
+    total = len(consultas_verificadas())
+    if problemas:
+        print(f"{len(problemas)} varredura(s) completa(s) inesperada(s) em {total} consultas.")
+        return 1
+    print(f"Todas as {total} consultas usam índice ou varreduras esperadas.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))